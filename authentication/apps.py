@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AuthConfig(AppConfig):
     name = 'authentication'
+
+    def ready(self) -> None:
+        # Connects the receivers dropping saved users from the user cache and their cached token epochs.
+        from authentication import backends, tokens  # noqa: F401
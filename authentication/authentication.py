@@ -0,0 +1,52 @@
+from typing import Any, Dict, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest
+from rest_framework.authentication import BaseAuthentication, BasicAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from authentication.credential_cache import get_credential_cache
+from authentication.tokens import InvalidToken, get_token_user, verify_access_token
+
+User = get_user_model()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    Basic authentication that only hashes the password the first time a pair of credentials is seen within the
+    credential cache timeout, later requests with the same credentials cost a lookup of the user by primary key.
+    """
+
+    def authenticate_credentials(self, userid: str, password: str,
+                                 request: Optional[HttpRequest] = None) -> Tuple[User, None]:
+        credential_cache = get_credential_cache()
+        user = credential_cache.get_user(userid, password)
+        if user is None:
+            # Raises AuthenticationFailed for invalid credentials, so only verified ones are cached.
+            user, _ = super().authenticate_credentials(userid, password, request)
+            credential_cache.add(userid, password, user)
+        return user, None
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates `Authorization: Bearer <token>` headers carrying an access token issued by the login endpoint.
+    Tokens are verified by their signature and the cached revocation epoch of their user, so authenticated requests
+    don't query the db unless they use fields of the user other than its primary key and username.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request: HttpRequest) -> Optional[Tuple[User, Dict[str, Any]]]:
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid bearer header, it must hold a single token.')
+        try:
+            payload = verify_access_token(auth[1].decode('latin-1'))
+        except InvalidToken as error:
+            raise AuthenticationFailed(f'Invalid token: {error}.')
+        return get_token_user(payload), payload
+
+    def authenticate_header(self, request: HttpRequest) -> str:
+        return f'{self.keyword} realm="api"'
@@ -0,0 +1,95 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pokemon.conf import lazy_setting_singleton
+
+User = get_user_model()
+
+
+class UserCache:
+    """
+    In-process LRU of active users by primary key and version, so session authenticated requests don't fetch their
+    user. Users saved or deleted through the ORM get a new version in the default cache, see get_user_version, so their
+    entries are dropped by every process sharing that cache, the other processes see the change once their entry
+    expires after `timeout` seconds, as do queryset updates. Every lookup returns its own copy of the cached user, so
+    changes made while handling a request don't leak into others.
+    """
+
+    def __init__(self, timeout: float, max_entries: int) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        # (expires_at, version, user) per user primary key.
+        self._entries: 'OrderedDict[Any, Tuple[float, Optional[str], User]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any, version: Optional[str]) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, cached_version, user = entry
+            if expires_at <= time.monotonic() or cached_version != version:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return copy.copy(user)
+
+    def set(self, user: User, version: Optional[str]) -> None:
+        if self.timeout <= 0:
+            return
+        with self._lock:
+            self._entries[user.pk] = (time.monotonic() + self.timeout, version, copy.copy(user))
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id: Any) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lazy_setting_singleton('USER_CACHE_TIMEOUT', 'USER_CACHE_MAX_ENTRIES')
+def get_user_cache() -> UserCache:
+    return UserCache(timeout=settings.USER_CACHE_TIMEOUT, max_entries=settings.USER_CACHE_MAX_ENTRIES)
+
+
+def get_user_version(user_id: Any) -> Optional[str]:
+    """Returns the version of the user in the default cache, None when it was not saved for USER_CACHE_TIMEOUT"""
+    return cache.get(f'user-version:{user_id}')
+
+
+@receiver([post_save, post_delete], sender=User)
+def discard_cached_user(sender: type, instance: User, **kwargs: Any) -> None:
+    get_user_cache().discard(instance.pk)
+    # An expired version is None and does not match the entries cached with this one either.
+    cache.set(f'user-version:{instance.pk}', uuid.uuid4().hex, settings.USER_CACHE_TIMEOUT)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend looking up the users of authenticated sessions in the per-process UserCache first"""
+
+    def get_user(self, user_id: Any) -> Optional[User]:
+        user_cache = get_user_cache()
+        # Read before fetching the user, so a user saved in between is cached with its former version.
+        version = get_user_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(user, version)
+        return user
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Sequence, Set
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from authentication.hashing import hash_passwords
+from authentication.serializers import BulkRegisterUserItemSerializer
+from pokemon.batches import exclude_taken, insert_reporting_taken, validate_items
+
+User = get_user_model()
+
+MAX_BULK_REGISTER_ITEMS: int = 1000
+
+EMAIL_TAKEN_ERRORS: Dict[str, List[str]] = {'email': ['Email already exists']}
+
+
+def bulk_register_users(items: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Registers the users described by the given items and returns one result per item, in the same order.
+    A result holds either the registered email with status 201, or the item errors with status 400.
+    Email uniqueness is validated with one query for the whole batch, passwords are hashed in parallel by
+    hash_passwords, then the users are inserted with a bulk insert. Items whose email is taken by a concurrent request
+    in the meantime are reported like the ones taken beforehand.
+    """
+    results, valid_items = validate_items(items, BulkRegisterUserItemSerializer)
+    items_to_create = exclude_taken(valid_items, results, 'email', _get_taken_emails(valid_items), EMAIL_TAKEN_ERRORS)
+    password_hashes = hash_passwords([data['password'] for data in items_to_create.values()])
+    users_to_create = {
+        index: User(email=data['email'], username=data['email'], password=password_hash)
+        for (index, data), password_hash in zip(items_to_create.items(), password_hashes)
+    }
+    # Emails are used as usernames, which are unique in the db.
+    insert_reporting_taken(users_to_create, results, _insert_users, 'username', EMAIL_TAKEN_ERRORS)
+
+    for index, user in users_to_create.items():
+        results[index] = {'status': 201, 'data': {'email': user.email}}
+    return results
+
+
+def _get_taken_emails(valid_items: Dict[int, Dict[str, Any]]) -> Set[str]:
+    emails = [data['email'] for data in valid_items.values()]
+    # Emails are used as usernames too.
+    taken_emails = set()
+    for email, username in User.objects.filter(Q(email__in=emails) | Q(username__in=emails)).values_list(
+            'email', 'username'):
+        taken_emails.update((email, username))
+    return taken_emails
+
+
+def _insert_users(users: List[User]) -> None:
+    # A savepoint, so a failed insert does not break the transaction of the request.
+    with transaction.atomic():
+        User.objects.bulk_create(users)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from pokemon.conf import lazy_setting_singleton
+
+User = get_user_model()
+
+
+class VerifiedCredentialCache:
+    """
+    In-process LRU of recently verified username and password pairs, so clients sending the same credentials with
+    every request don't pay for the password hash every time.
+    Entries are keyed by a keyed digest of the credentials, so neither passwords nor their plain hashes are kept in
+    memory. Each one also remembers the session auth hash of the user, which changes with the password, so changing
+    the password invalidates the entries of the old one in every process. Entries expire after `timeout` seconds and
+    the least recently used ones are evicted beyond `max_entries`. Failed verifications are never cached.
+    """
+
+    def __init__(self, timeout: float, max_entries: int) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        # (expires_at, user pk, session auth hash) per credentials digest.
+        self._entries: 'OrderedDict[bytes, Tuple[float, Any, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(username: str, password: str) -> bytes:
+        return salted_hmac('authentication.credential_cache', f'{username}\0{password}', algorithm='sha256').digest()
+
+    def get_user(self, username: str, password: str) -> Optional[User]:
+        """Returns the active user the credentials were verified for, unless they expired or the password changed"""
+        key = self.get_key(username, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user_pk, session_auth_hash = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        user = User._default_manager.filter(pk=user_pk).first()
+        if user is None or not user.is_active or not constant_time_compare(
+                user.get_session_auth_hash(), session_auth_hash):
+            self.discard(username, password)
+            return None
+        return user
+
+    def add(self, username: str, password: str, user: User) -> None:
+        if self.timeout <= 0:
+            return
+        key = self.get_key(username, password)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, user.pk, user.get_session_auth_hash())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, username: str, password: str) -> None:
+        with self._lock:
+            self._entries.pop(self.get_key(username, password), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lazy_setting_singleton('CREDENTIAL_CACHE_TIMEOUT', 'CREDENTIAL_CACHE_MAX_ENTRIES', 'SECRET_KEY')
+def get_credential_cache() -> VerifiedCredentialCache:
+    return VerifiedCredentialCache(
+        timeout=settings.CREDENTIAL_CACHE_TIMEOUT, max_entries=settings.CREDENTIAL_CACHE_MAX_ENTRIES)
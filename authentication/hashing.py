@@ -0,0 +1,35 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Sequence
+
+from django.conf import settings
+from django.contrib.auth.hashers import BasePasswordHasher, get_hasher, make_password
+
+from pokemon.conf import lazy_setting_singleton
+
+
+@lazy_setting_singleton('PASSWORD_HASHING_WORKERS', close=lambda pool: pool.shutdown(wait=False))
+def get_hashing_pool() -> ProcessPoolExecutor:
+    """
+    Workers are spawned rather than forked, as forking a threaded web worker with open db connections is unsafe, and
+    they don't need django to be set up since they get the hasher to use along with the passwords.
+    """
+    return ProcessPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def hash_password(password: str, hasher: BasePasswordHasher) -> str:
+    return make_password(password, hasher=hasher)
+
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Hashes the passwords with the default hasher, in parallel on the hashing pool when there are several workers"""
+    hasher = get_hasher()
+    workers = settings.PASSWORD_HASHING_WORKERS
+    if workers <= 1 or len(passwords) <= 1:
+        return [hash_password(password, hasher) for password in passwords]
+    # A few chunks per worker, so they are kept busy without pickling every password on its own.
+    chunk_size = math.ceil(len(passwords) / (workers * 4))
+    return list(get_hashing_pool().map(hash_password, passwords, repeat(hasher), chunksize=chunk_size))
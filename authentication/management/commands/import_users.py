@@ -0,0 +1,64 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterator, TextIO, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from authentication.bulk import MAX_BULK_REGISTER_ITEMS, bulk_register_users
+
+FORMATS = ('csv', 'ndjson')
+
+
+class Command(BaseCommand):
+    help = ('Registers the users of a csv file with email and password columns, or of a newline delimited json file '
+            'with an object per user, reporting the rows that could not be imported')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Format of the file, guessed from its extension by default')
+        parser.add_argument('--batch-size', type=int, default=MAX_BULK_REGISTER_ITEMS,
+                            help='Number of users registered at once')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError(f'Unknown format {file_format}, pass one of {", ".join(FORMATS)} with --format')
+
+        imported_count = failed_count = 0
+        with open(options['path'], newline='') as users_file:
+            rows = self.read_csv(users_file) if file_format == 'csv' else self.read_ndjson(users_file)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                line_numbers = [line_number for line_number, _ in batch]
+                results = bulk_register_users([item for _, item in batch])
+                for line_number, result in zip(line_numbers, results):
+                    if result['status'] == 201:
+                        imported_count += 1
+                    else:
+                        failed_count += 1
+                        self.stderr.write(f'Line {line_number}: {json.dumps(result["errors"])}')
+                self.stdout.write(f'Processed {imported_count + failed_count} users')
+
+        style = self.style.SUCCESS if not failed_count else self.style.WARNING
+        self.stdout.write(style(f'Imported {imported_count} users, {failed_count} could not be imported'))
+
+    @staticmethod
+    def read_csv(users_file: TextIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        reader = csv.DictReader(users_file)
+        for row in reader:
+            yield reader.line_num, row
+
+    @staticmethod
+    def read_ndjson(users_file: TextIO) -> Iterator[Tuple[int, Any]]:
+        """Lines that are not valid json are passed on as is, so they are reported like other invalid rows"""
+        for line_number, line in enumerate(users_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, line.strip()
@@ -1 +1,12 @@
-# Create your models here.
+from django.conf import settings
+from django.db import models
+
+
+class TokenEpoch(models.Model):
+    """
+    Revocation epoch of the bearer tokens of a user, tokens carry the epoch they were issued in and are only valid
+    while it is current. Users without a row are in epoch 0.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, primary_key=True, on_delete=models.CASCADE,
+                                related_name='token_epoch')
+    epoch = models.PositiveIntegerField(default=0)
@@ -3,30 +3,51 @@ from typing import Dict, Any
 from django.contrib.auth import authenticate, login, get_user_model
 from rest_framework import serializers
 
+from authentication.tokens import InvalidToken, issue_tokens, refresh_tokens
+
 User = get_user_model()
 
 
 class LoginSerializer(serializers.Serializer):
+    SESSION, TOKEN = 'session', 'token'
+
     email = serializers.EmailField()
     password = serializers.CharField(
         style={'input_type': 'password', 'placeholder': 'Password'},
         write_only=True)
+    mode = serializers.ChoiceField(choices=[SESSION, TOKEN], default=SESSION, write_only=True)
 
     def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """Keeps the authenticated user, so logging in does not hash the password a second time"""
         user = authenticate(request=self.context['request'], username=attrs['email'], password=attrs['password'])
         if user is None:
             raise serializers.ValidationError('Credentials does not match or email does not exist')
+        attrs['user'] = user
         return attrs
 
     def login_user(self) -> None:
         assert hasattr(self, '_errors'), (
             'You must call `.is_valid()` before calling `.login_user()`.'
         )
-        user = authenticate(
-            request=self.context['request'],
-            username=self.validated_data['email'],
-            password=self.validated_data['password'])
-        login(request=self.context['request'], user=user)
+        login(request=self.context['request'], user=self.validated_data['user'])
+
+    def issue_tokens(self) -> Dict[str, Any]:
+        """Token mode counterpart of login_user, the tokens replace the session"""
+        assert hasattr(self, '_errors'), (
+            'You must call `.is_valid()` before calling `.issue_tokens()`.'
+        )
+        return issue_tokens(self.validated_data['user'])
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            attrs['tokens'] = refresh_tokens(attrs['refresh'])
+        except InvalidToken as error:
+            raise serializers.ValidationError(f'Invalid refresh token: {error}')
+        return attrs
 
 
 class RegisterUserSerializer(serializers.Serializer):
@@ -58,3 +79,12 @@ class RegisterUserSerializer(serializers.Serializer):
         user.set_password(validated_data.get('password'))
         user.save()
         return user
+
+
+class BulkRegisterUserItemSerializer(serializers.Serializer):
+    """
+    Validates a single item of a bulk registration.
+    Emails are only checked to be valid here, their uniqueness is checked for the whole batch at once.
+    """
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True)
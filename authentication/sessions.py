@@ -0,0 +1,127 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class SessionWriteBehindBuffer:
+    """
+    Latest data of the sessions whose db writes are deferred, written by a daemon thread every
+    SESSION_WRITE_BEHIND_INTERVAL seconds and when the process exits, with a single query per flush.
+    Flushing only updates existing rows, so sessions deleted in the meantime, e.g. by a logout, are not brought back.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, Tuple[str, datetime]] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def add(self, session_key: str, session_data: str, expire_date: datetime) -> None:
+        with self._lock:
+            self._pending[session_key] = (session_data, expire_date)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_forever, name='session-write-behind', daemon=True)
+                self._flusher.start()
+
+    def discard(self, session_key: str) -> None:
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self) -> int:
+        """Writes the pending sessions to the db and returns how many there were"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            Session.objects.bulk_update([
+                Session(session_key=session_key, session_data=session_data, expire_date=expire_date)
+                for session_key, (session_data, expire_date) in pending.items()
+            ], ['session_data', 'expire_date'])
+        return len(pending)
+
+    def flush_at_exit(self) -> None:
+        # The db may be gone by then, e.g. the throwaway one of a benchmark, which must not fail the exit.
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Writing sessions to the db at exit failed, their latest changes are lost')
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(settings.SESSION_WRITE_BEHIND_INTERVAL)
+            try:
+                if self.flush():
+                    connection.close()
+            except Exception:
+                logger.exception('Writing sessions to the db failed, their latest changes are lost')
+
+
+write_behind_buffer = SessionWriteBehindBuffer()
+atexit.register(write_behind_buffer.flush_at_exit)
+
+
+def get_auth_state(session_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(session_data.get(key) for key in (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY))
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached db sessions, read from the SESSION_CACHE_ALIAS cache and written to it right away, but written to the db
+    behind, see SessionWriteBehindBuffer. Creating sessions and changing who they are logged in as are still written
+    to the db right away, only other changes are deferred, e.g. refreshing the expiry with SESSION_SAVE_EVERY_REQUEST.
+    Sessions stay cached for at most SESSION_CACHE_TIMEOUT seconds, which bounds how long other processes may see a
+    logged out session when the cache is not shared between them. Async saves are written to the db right away.
+    """
+    cache_key_prefix = 'authentication.sessions'
+
+    def __init__(self, session_key: Optional[str] = None) -> None:
+        super().__init__(session_key)
+        self._stored_auth_state: Optional[Tuple[Any, ...]] = None
+
+    def get_cache_timeout(self, expiry: Optional[datetime] = None) -> int:
+        return min(self.get_expiry_age(expiry=expiry), settings.SESSION_CACHE_TIMEOUT)
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            # Like cached_db, invalid cache keys reset the session.
+            data = None
+
+        if data is None:
+            stored_session = self._get_session_from_db()
+            if stored_session:
+                data = self.decode(stored_session.session_data)
+                self._cache.set(self.cache_key, data, self.get_cache_timeout(expiry=stored_session.expire_date))
+            else:
+                data = {}
+        self._stored_auth_state = get_auth_state(data)
+        return data
+
+    def save(self, must_create: bool = False) -> None:
+        session_data = self._get_session(no_load=must_create)
+        if must_create or self.session_key is None or get_auth_state(session_data) != self._stored_auth_state:
+            DBStore.save(self, must_create)
+            write_behind_buffer.discard(self.session_key)
+        else:
+            write_behind_buffer.add(self.session_key, self.encode(session_data), self.get_expiry_date())
+        self._stored_auth_state = get_auth_state(session_data)
+        try:
+            self._cache.set(self.cache_key, session_data, self.get_cache_timeout())
+        except Exception:
+            logger.exception('Error saving to cache (%s)', self._cache)
+
+    def delete(self, session_key: Optional[str] = None) -> None:
+        if session_key or self.session_key:
+            write_behind_buffer.discard(session_key or self.session_key)
+        super().delete(session_key)
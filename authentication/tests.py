@@ -1,11 +1,27 @@
-from unittest.mock import MagicMock
+import base64
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
 from django.contrib import auth
+from django.contrib.auth.hashers import check_password
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase, APIClient
 
+from authentication.backends import CachedModelBackend, UserCache, get_user_cache, get_user_version
+from authentication.credential_cache import VerifiedCredentialCache, get_credential_cache
+from authentication.hashing import hash_passwords
 from authentication.serializers import LoginSerializer
+from authentication.sessions import SessionStore, write_behind_buffer
 from pokemon.factories import UserFactory
+from pokemon.models import Pokemon
+from pokemon.names import pokemon_names
 
 User = auth.get_user_model()
 
@@ -72,6 +88,14 @@ class LoginSerializerTestSuite(APITestCase):
     def test_login_user_is_valid_not_called(self):
         self.assertRaises(Exception, self.serializer_instance.login_user)
 
+    @patch('authentication.serializers.authenticate', wraps=auth.authenticate)
+    def test_login_authenticates_once(self, authenticate):
+        self.serializer_instance.context['request'] = MagicMock()
+        self.serializer_instance.is_valid(raise_exception=True)
+        self.serializer_instance.login_user()
+
+        self.assertEqual(1, authenticate.call_count)
+
     def test_login_serializer_is_valid_called(self):
         self.serializer_instance.context['request'] = MagicMock()
         self.serializer_instance.is_valid()
@@ -144,3 +168,363 @@ class RegisterEndpointTestSuite(APITestCase):
 
         self.assertEqual(201, response.status_code)
         self.assertEqual(created_user.email, created_user.username)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'auth': '2/min'}},
+                   RATE_LIMIT_STORE={'BACKEND': 'pokemon.rate_limit.MemoryTokenBucketStore'})
+class AuthThrottleTestSuite(APITestCase):
+
+    def test_login_is_throttled(self):
+        data = {'username': 'user@example.com', 'password': 'password'}
+        statuses = [self.client.post(reverse('auth-login'), data).status_code for _ in range(2)]
+        response = self.client.post(reverse('auth-login'), data)
+
+        self.assertEqual([400, 400], statuses)
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('30', response['Retry-After'])
+
+    def test_register_and_refresh_share_the_bucket(self):
+        self.client.post(reverse('auth-register'), {})
+        self.client.post(reverse('auth-refresh'), {})
+        self.assertEqual(429, self.client.post(reverse('auth-register'), {}).status_code)
+
+    def test_logout_is_not_throttled(self):
+        self.client.force_authenticate(UserFactory())
+        for _ in range(3):
+            self.assertEqual(200, self.client.post(reverse('auth-logout')).status_code)
+
+
+@patch('django.contrib.auth.base_user.check_password', wraps=check_password)
+class CachedBasicAuthenticationTestSuite(APITestCase):
+
+    def setUp(self):
+        self.create_path = reverse('pokemon-list')
+        self.user = UserFactory()
+        self.user.set_password('password')
+        self.user.save()
+        get_credential_cache().clear()
+
+    def post_with_basic_auth(self, password='password'):
+        credentials = base64.b64encode(f'{self.user.username}:{password}'.encode()).decode()
+        # Authenticated requests get a 400 for the missing fields, anonymous ones a 401.
+        return self.client.post(self.create_path, {}, HTTP_AUTHORIZATION=f'Basic {credentials}').status_code
+
+    def test_password_is_hashed_once(self, hashed_check_password):
+        self.assertEqual([400, 400, 400], [self.post_with_basic_auth() for _ in range(3)])
+        self.assertEqual(1, hashed_check_password.call_count)
+
+    def test_wrong_password_is_not_cached(self, hashed_check_password):
+        self.assertEqual([401, 401], [self.post_with_basic_auth('wrong password') for _ in range(2)])
+        self.assertEqual(2, hashed_check_password.call_count)
+
+    def test_password_change_invalidates_cached_credentials(self, hashed_check_password):
+        self.post_with_basic_auth()
+        self.user.set_password('new password')
+        self.user.save()
+
+        self.assertEqual(401, self.post_with_basic_auth())
+        self.assertEqual(400, self.post_with_basic_auth('new password'))
+
+    def test_deactivated_user_is_rejected(self, hashed_check_password):
+        self.post_with_basic_auth()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(401, self.post_with_basic_auth())
+
+    @override_settings(CREDENTIAL_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self, hashed_check_password):
+        self.post_with_basic_auth()
+        self.post_with_basic_auth()
+
+        self.assertEqual(2, hashed_check_password.call_count)
+
+    def test_least_recently_used_credentials_are_evicted(self, hashed_check_password):
+        credential_cache = VerifiedCredentialCache(timeout=60, max_entries=1)
+        credential_cache.add('another user', 'password', UserFactory())
+        credential_cache.add(self.user.username, 'password', self.user)
+
+        self.assertIsNone(credential_cache.get_user('another user', 'password'))
+        self.assertEqual(self.user, credential_cache.get_user(self.user.username, 'password'))
+
+
+class TokenLoginTestSuite(APITestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.user.set_password('password')
+        self.user.save()
+        self.list_path = reverse('pokemon-list')
+        self.refresh_path = reverse('auth-refresh')
+        self.tokens = self.client.post(reverse('auth-login'), {
+            'email': self.user.email, 'password': 'password', 'mode': 'token'}).data
+
+    def get_with_token(self, path, token):
+        return self.client.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_issues_tokens_instead_of_a_session(self):
+        self.assertEqual({'access', 'refresh', 'token_type', 'expires_in'}, set(self.tokens))
+        self.assertFalse(get_user_from_session_info(self.client).is_authenticated)
+
+    def test_token_authentication_does_not_query_the_db(self):
+        self.client.get(self.list_path)
+        # Only the version of the collection, the page is cached by the anonymous request.
+        with self.assertNumQueries(1):
+            response = self.get_with_token(self.list_path, self.tokens['access'])
+        self.assertEqual(200, response.status_code)
+
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_token_user_creates_pokemons(self, retrieve_pokemon_abilities):
+        retrieve_pokemon_abilities.return_value = []
+        pokemon_names.set_names(['bulbasaur'])
+        response = self.client.post(self.list_path, {'name': 'bulbasaur', 'description': 'Seed', 'weight': 69},
+                                    HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(self.user, Pokemon.objects.get().creator)
+
+    def test_tampered_token_is_rejected(self):
+        self.assertEqual(401, self.get_with_token(self.list_path, self.tokens['access'][:-1]).status_code)
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired_token_is_rejected(self):
+        self.assertEqual(401, self.get_with_token(self.list_path, self.tokens['access']).status_code)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        self.assertEqual(401, self.get_with_token(self.list_path, self.tokens['refresh']).status_code)
+        response = self.client.post(self.refresh_path, {'refresh': self.tokens['access']})
+        self.assertEqual(400, response.status_code)
+
+    def test_refresh_issues_new_tokens(self):
+        response = self.client.post(self.refresh_path, {'refresh': self.tokens['refresh']},
+                                    HTTP_AUTHORIZATION='Bearer expired')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(200, self.get_with_token(self.list_path, response.data['access']).status_code)
+
+    def test_logout_revokes_tokens(self):
+        response = self.client.post(reverse('auth-logout'), HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(401, self.get_with_token(self.list_path, self.tokens['access']).status_code)
+        self.assertEqual(400, self.client.post(self.refresh_path, {'refresh': self.tokens['refresh']}).status_code)
+
+        new_tokens = self.client.post(reverse('auth-login'), {
+            'email': self.user.email, 'password': 'password', 'mode': 'token'}).data
+        self.assertEqual(200, self.get_with_token(self.list_path, new_tokens['access']).status_code)
+
+    def test_access_token_of_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.post(self.list_path, {'name': 'bulbasaur', 'description': 'Seed', 'weight': 69},
+                                    HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+        self.assertEqual(401, response.status_code)
+
+    def test_refresh_rejects_deactivated_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(400, self.client.post(self.refresh_path, {'refresh': self.tokens['refresh']}).status_code)
+
+
+class CachedSessionTestSuite(APITestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.user.set_password('password')
+        self.user.save()
+        get_user_cache().clear()
+
+    def test_authenticated_requests_do_not_query_session_and_user(self):
+        list_path = reverse('pokemon-list')
+        self.client.get(list_path)
+        self.client.login(username=self.user.username, password='password')
+        self.client.get(list_path)
+
+        # Only the version of the collection, the page is cached by the first request.
+        with self.assertNumQueries(1):
+            response = self.client.get(list_path)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.user, get_user_from_session_info(self.client))
+
+    def test_login_is_written_to_the_db_right_away(self):
+        self.client.login(username=self.user.username, password='password')
+
+        session = Session.objects.get(session_key=self.client.session.session_key)
+        self.assertEqual(str(self.user.pk), session.get_decoded()[auth.SESSION_KEY])
+
+    def test_session_changes_are_written_behind(self):
+        session = SessionStore()
+        session['color'] = 'red'
+        session.create()
+        session['color'] = 'blue'
+        session.save()
+
+        self.assertEqual('blue', SessionStore(session.session_key)['color'])
+        self.assertEqual('red', Session.objects.get(session_key=session.session_key).get_decoded()['color'])
+
+        self.assertEqual(1, write_behind_buffer.flush())
+        self.assertEqual('blue', Session.objects.get(session_key=session.session_key).get_decoded()['color'])
+
+    def test_deleted_sessions_are_not_written_back(self):
+        session = SessionStore()
+        session.create()
+        session['color'] = 'blue'
+        session.save()
+        Session.objects.filter(session_key=session.session_key).delete()
+
+        write_behind_buffer.flush()
+
+        self.assertFalse(Session.objects.exists())
+
+    def test_flush_at_exit_logs_db_errors(self):
+        session = SessionStore()
+        session.create()
+        session['color'] = 'blue'
+        session.save()
+
+        with patch.object(Session.objects, 'bulk_update', side_effect=DatabaseError('no such table: django_session')), \
+                self.assertLogs('authentication.sessions', level='ERROR'):
+            write_behind_buffer.flush_at_exit()
+
+
+class CachedModelBackendTestSuite(APITestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.backend = CachedModelBackend()
+        get_user_cache().clear()
+
+    def test_users_are_cached(self):
+        self.backend.get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            cached_user = self.backend.get_user(self.user.pk)
+        self.assertEqual(self.user, cached_user)
+        self.assertIsNot(cached_user, self.backend.get_user(self.user.pk))
+
+    def test_saved_users_are_dropped(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Ash'
+        self.user.save()
+
+        self.assertEqual('Ash', self.backend.get_user(self.user.pk).first_name)
+
+    def test_users_saved_by_other_processes_are_dropped(self):
+        self.backend.get_user(self.user.pk)
+        # Another process sharing the default cache saves the user, only the version is seen by this one.
+        with patch('authentication.backends.get_user_cache', return_value=UserCache(timeout=60, max_entries=10)):
+            self.user.first_name = 'Ash'
+            self.user.save()
+
+        self.assertEqual('Ash', self.backend.get_user(self.user.pk).first_name)
+
+    def test_inactive_users_are_not_cached(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+        self.assertIsNone(get_user_cache().get(self.user.pk, get_user_version(self.user.pk)))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], PASSWORD_HASHING_WORKERS=1)
+class BulkRegisterEndpointTestSuite(APITestCase):
+
+    def setUp(self):
+        self.bulk_register_path = reverse('auth-register-bulk')
+        self.client.force_authenticate(UserFactory(is_staff=True))
+        self.items = [
+            {'email': 'misty@example.com', 'password': 'starmie'},
+            {'email': 'brock@example.com', 'password': 'onix'},
+        ]
+
+    def test_bulk_register_as_non_staff_user(self):
+        self.client.force_authenticate(UserFactory())
+        response = self.client.post(self.bulk_register_path, self.items, format='json')
+        self.assertEqual(403, response.status_code)
+
+    def test_bulk_register_users(self):
+        # The email uniqueness check and the insert, within a savepoint.
+        with self.assertNumQueries(4):
+            response = self.client.post(self.bulk_register_path, self.items, format='json')
+
+        self.assertEqual(201, response.status_code)
+        misty = User.objects.get(email='misty@example.com')
+        self.assertEqual('misty@example.com', misty.username)
+        self.assertTrue(misty.check_password('starmie'))
+
+    def test_bulk_register_reports_errors_per_item(self):
+        UserFactory(email='misty@example.com')
+        items = self.items + [
+            {'email': 'brock@example.com', 'password': 'duplicate in batch'},
+            {'email': 'not an email', 'password': 'password'},
+        ]
+
+        response = self.client.post(self.bulk_register_path, items, format='json')
+
+        self.assertEqual(207, response.status_code)
+        self.assertEqual([400, 201, 400, 400], [result['status'] for result in response.data['results']])
+        self.assertEqual(['Email already exists'], response.data['results'][0]['errors']['email'])
+        self.assertTrue(User.objects.filter(email='brock@example.com').exists())
+
+    @patch('authentication.bulk.hash_passwords')
+    def test_bulk_register_reports_emails_taken_concurrently(self, hash_passwords):
+        def hash_while_misty_registers(passwords):
+            UserFactory(email='misty@example.com', username='misty@example.com')
+            return ['hash'] * len(passwords)
+        hash_passwords.side_effect = hash_while_misty_registers
+
+        response = self.client.post(self.bulk_register_path, self.items, format='json')
+
+        self.assertEqual(207, response.status_code)
+        self.assertEqual([400, 201], [result['status'] for result in response.data['results']])
+        self.assertEqual(['Email already exists'], response.data['results'][0]['errors']['email'])
+        self.assertTrue(User.objects.filter(email='brock@example.com').exists())
+
+    def test_bulk_register_with_non_list_data(self):
+        response = self.client.post(self.bulk_register_path, self.items[0], format='json')
+        self.assertEqual(400, response.status_code)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PasswordHashingTestSuite(APITestCase):
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_passwords_are_hashed_on_the_pool(self):
+        passwords = ['red', 'blue', 'yellow']
+        password_hashes = hash_passwords(passwords)
+
+        self.assertEqual(3, len(set(password_hashes)))
+        for password, password_hash in zip(passwords, password_hashes):
+            self.assertTrue(password_hash.startswith('md5$'))
+            self.assertTrue(check_password(password, password_hash))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], PASSWORD_HASHING_WORKERS=1)
+class ImportUsersCommandTestSuite(APITestCase):
+
+    def import_users(self, content, extension, *args):
+        with tempfile.NamedTemporaryFile('w', suffix=f'.{extension}', delete=False) as users_file:
+            users_file.write(content)
+        self.addCleanup(os.remove, users_file.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_users', users_file.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        UserFactory(email='misty@example.com')
+        content = 'email,password\nash@example.com,pikachu\nmisty@example.com,starmie\ngary@example.com,eevee\n'
+
+        stdout, stderr = self.import_users(content, 'csv', '--batch-size', '2')
+
+        self.assertIn('Imported 2 users, 1 could not be imported', stdout)
+        self.assertIn('Line 3: {"email": ["Email already exists"]}', stderr)
+        self.assertTrue(User.objects.get(email='gary@example.com').check_password('eevee'))
+
+    def test_import_ndjson(self):
+        content = '{"email": "ash@example.com", "password": "pikachu"}\n\nnot json\n{"email": "ash"}\n'
+
+        stdout, stderr = self.import_users(content, 'ndjson')
+
+        self.assertIn('Imported 1 users, 2 could not be imported', stdout)
+        self.assertIn('Line 3:', stderr)
+        self.assertIn('Line 4:', stderr)
+        self.assertTrue(User.objects.filter(email='ash@example.com').exists())
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import TokenEpoch
+
+User = get_user_model()
+
+ACCESS_TOKEN_SALT = 'authentication.tokens.access'
+REFRESH_TOKEN_SALT = 'authentication.tokens.refresh'
+
+
+class InvalidToken(Exception):
+    """The token is malformed, tampered with, expired or revoked"""
+
+
+def get_token_epoch(user_id: Any) -> Optional[int]:
+    """
+    Returns the current token epoch of the user from the default cache, so verifying tokens does not hit the db, or
+    None when the user is inactive or does not exist. Epochs are cached for TOKEN_EPOCH_CACHE_TIMEOUT seconds, which is
+    how long revoked tokens and deactivated users may still be accepted by other processes when the default cache is
+    not shared between them.
+    """
+    cache_key = f'token-epoch:{user_id}'
+    state = cache.get(cache_key)
+    if state is None:
+        row = User._default_manager.filter(pk=user_id).values_list('is_active', 'token_epoch__epoch').first()
+        # (is_active, epoch), users without a TokenEpoch row are in epoch 0.
+        state = (row[0], row[1] or 0) if row else (False, 0)
+        cache.set(cache_key, state, settings.TOKEN_EPOCH_CACHE_TIMEOUT)
+    is_active, epoch = state
+    return epoch if is_active else None
+
+
+def revoke_tokens(user: User) -> None:
+    """Invalidates all the tokens issued to the user so far, by moving them to the next epoch"""
+    if not TokenEpoch.objects.filter(user=user).update(epoch=F('epoch') + 1):
+        TokenEpoch.objects.get_or_create(user=user, defaults={'epoch': 1})
+    cache.delete(f'token-epoch:{user.pk}')
+
+
+def issue_tokens(user: User) -> Dict[str, Any]:
+    """Returns a short lived access token and a longer lived refresh token of the current epoch of the user"""
+    payload = {'uid': user.pk, 'username': user.get_username(), 'epoch': get_token_epoch(user.pk)}
+    return {
+        'access': signing.dumps(payload, salt=ACCESS_TOKEN_SALT),
+        'refresh': signing.dumps(payload, salt=REFRESH_TOKEN_SALT),
+        'token_type': 'Bearer',
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def verify_token(token: str, salt: str, max_age: int) -> Dict[str, Any]:
+    """Returns the payload of a valid token of the current epoch of its user, raises InvalidToken otherwise"""
+    try:
+        payload = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.BadSignature as error:
+        # SignatureExpired is a BadSignature too.
+        raise InvalidToken(str(error))
+    epoch = get_token_epoch(payload['uid'])
+    if epoch is None:
+        raise InvalidToken('User is inactive or does not exist')
+    if payload['epoch'] != epoch:
+        raise InvalidToken('Token has been revoked')
+    return payload
+
+
+def verify_access_token(token: str) -> Dict[str, Any]:
+    return verify_token(token, ACCESS_TOKEN_SALT, settings.ACCESS_TOKEN_LIFETIME)
+
+
+def refresh_tokens(refresh_token: str) -> Dict[str, Any]:
+    """Issues new tokens for a valid refresh token, as long as its user is still active"""
+    payload = verify_token(refresh_token, REFRESH_TOKEN_SALT, settings.REFRESH_TOKEN_LIFETIME)
+    user = User._default_manager.filter(pk=payload['uid'], is_active=True).first()
+    if user is None:
+        raise InvalidToken('User is inactive or does not exist')
+    return issue_tokens(user)
+
+
+def get_token_user(payload: Dict[str, Any]) -> User:
+    """
+    Builds the user of a verified token without querying the db, only its primary key and username are loaded.
+    Its other fields are deferred, so they are fetched on first access and saving it only writes the loaded ones.
+    """
+    field_values = {User._meta.pk.attname: payload['uid'], User.USERNAME_FIELD: payload['username']}
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in field_values]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [field_values[name] for name in field_names])
+
+
+@receiver([post_save, post_delete], sender=User)
+def discard_cached_token_epoch(sender: type, instance: User, **kwargs: Any) -> None:
+    # Deactivating or deleting a user rejects its tokens right away in this process.
+    cache.delete(f'token-epoch:{instance.pk}')
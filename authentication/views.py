@@ -1,30 +1,68 @@
 from django.contrib import auth
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from authentication.serializers import LoginSerializer, RegisterUserSerializer
+from authentication.authentication import SignedTokenAuthentication
+from authentication.bulk import MAX_BULK_REGISTER_ITEMS, bulk_register_users
+from authentication.serializers import LoginSerializer, RefreshTokenSerializer, RegisterUserSerializer
+from authentication.tokens import revoke_tokens
+from pokemon.rate_limit import AuthRateThrottle
 
 User = auth.get_user_model()
 
 
 @api_view(['POST'])
+@throttle_classes([AuthRateThrottle])
 def login(request: Request) -> Response:
     serializer = LoginSerializer(data=request.data, context={'request': request})
     serializer.is_valid(raise_exception=True)
+    if serializer.validated_data['mode'] == LoginSerializer.TOKEN:
+        return Response(status=200, data=serializer.issue_tokens())
     serializer.login_user()
     return Response(status=200, data={'Logged in successfully'})
 
 
+@api_view(['POST'])
+@authentication_classes([])
+@throttle_classes([AuthRateThrottle])
+def refresh(request: Request) -> Response:
+    """Exchanges a refresh token for new tokens, expired access tokens sent along are ignored"""
+    serializer = RefreshTokenSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return Response(status=200, data=serializer.validated_data['tokens'])
+
+
 @api_view(['POST'])
 def logout(request: Request) -> Response:
+    """Logging out with a bearer token revokes all the tokens of the user"""
+    if isinstance(request.successful_authenticator, SignedTokenAuthentication):
+        revoke_tokens(request.user)
     auth.logout(request)
     return Response(status=200, data={'Logged out successfully'})
 
 
 @api_view(['POST'])
+@throttle_classes([AuthRateThrottle])
 def register(request: Request) -> Response:
     serializer = RegisterUserSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     serializer.save()
     return Response(status=201, data={'User registered successfully'})
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_register(request: Request) -> Response:
+    """
+    Registers a list of users at once, for staff onboarding accounts. Every item gets its own result, so invalid items
+    don't fail the whole batch, and the response status is 207 unless all the users were registered.
+    """
+    if not isinstance(request.data, list):
+        return Response({'detail': 'Expected a list of users'}, status=400)
+    if len(request.data) > MAX_BULK_REGISTER_ITEMS:
+        return Response({'detail': f'At most {MAX_BULK_REGISTER_ITEMS} users can be registered at once'}, status=400)
+    results = bulk_register_users(request.data)
+    all_created = all(result['status'] == 201 for result in results)
+    return Response({'results': results}, status=201 if all_created else 207)
@@ -0,0 +1,32 @@
+from typing import Iterator
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolated_stores(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    """
+    Points the rate limits, the PokeAPI response cache, fetch lock and names snapshot away from the files of the
+    project directory, so tests neither read nor clear the state of a local server.
+    """
+    from django.conf import settings
+    from django.test import override_settings
+    directory = tmp_path_factory.mktemp('stores')
+    pokeapi_settings = getattr(settings, 'POKEAPI', {})
+    with override_settings(
+            RATE_LIMIT_STORE={'BACKEND': 'pokemon.rate_limit.MemoryTokenBucketStore'},
+            POKEAPI={
+                **pokeapi_settings,
+                'RESPONSE_CACHE': {**pokeapi_settings['RESPONSE_CACHE'],
+                                   'LOCATION': str(directory / 'pokeapi_cache.sqlite3')},
+                'FETCH_LOCK': {**pokeapi_settings['FETCH_LOCK'], 'LOCATION': str(directory / 'pokeapi_cache.sqlite3')},
+                'NAMES_SNAPSHOT_PATH': str(directory / 'pokemon_names.json'),
+            }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> None:
+    """Every test starts with full token buckets, the test client sends all its requests from the same ip"""
+    from pokemon.rate_limit import get_rate_limit_store
+    get_rate_limit_store().clear()
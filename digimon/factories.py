@@ -10,7 +10,8 @@ class DigimonFactory(factory.DjangoModelFactory):
     class Meta:
         model = Digimon
 
-    name = factory.Faker('word')
+    # Names are unique, faker words repeat.
+    name = factory.Sequence(lambda n: f'digimon-{n}')
     description = factory.Faker('paragraph')
     weight = round(random.uniform(1, 150), 1)
     creator = factory.SubFactory(UserFactory)
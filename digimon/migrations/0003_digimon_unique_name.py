@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_names(apps, schema_editor):
+    """
+    Names were not unique before, concurrent creations could insert the same one twice. The first digimon created with
+    a name keeps it, the others get their primary key appended, so the unique index can be added.
+    """
+    Digimon = apps.get_model('digimon', 'Digimon')
+    max_length = Digimon._meta.get_field('name').max_length
+    duplicate_names = Digimon.objects.order_by().values('name').annotate(count=Count('pk')).filter(
+        count__gt=1).values_list('name', flat=True)
+    for name in duplicate_names:
+        for digimon in Digimon.objects.filter(name=name).order_by('pk')[1:]:
+            suffix = f'-{digimon.pk}'
+            digimon.name = name[:max_length - len(suffix)] + suffix
+            digimon.save(update_fields=['name'])
+
+
+class Migration(migrations.Migration):
+    # The renames are committed before the index is added, postgres can't alter a table with pending updates.
+    atomic = False
+
+    dependencies = [
+        ('digimon', '0002_digimon_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='digimon',
+            name='name',
+            field=models.CharField(max_length=75, unique=True),
+        ),
+    ]
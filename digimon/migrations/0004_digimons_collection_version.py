@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def create_digimons_version(apps, schema_editor):
+    apps.get_model('pokemon', 'CollectionVersion').objects.get_or_create(name='digimons')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digimon', '0003_digimon_unique_name'),
+        ('pokemon', '0005_collection_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_digimons_version, migrations.RunPython.noop),
+    ]
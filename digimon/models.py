@@ -1,12 +1,25 @@
+from typing import Any
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pokemon.models import CollectionVersion
 
 User = get_user_model()
 
 
 class Digimon(models.Model):
+    COLLECTION = 'digimons'
+
     creator = models.ForeignKey(User, related_name='created_digimons', on_delete=models.SET_NULL, null=True)
 
-    name = models.CharField(max_length=75)
+    name = models.CharField(max_length=75, unique=True)
     description = models.CharField(max_length=250)
-    weight = models.DecimalField(max_digits=4, decimal_places=1)
+    weight = models.DecimalField(max_digits=4, decimal_places=1, db_index=True)
+
+
+@receiver([post_save, post_delete], sender=Digimon)
+def bump_digimons_version(**kwargs: Any) -> None:
+    CollectionVersion.bump(Digimon.COLLECTION)
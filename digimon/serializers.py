@@ -1,21 +1,40 @@
+from typing import Any, Dict
+
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 from digimon.models import Digimon
 
 
 class ReadCreateDigimonSerializer(serializers.ModelSerializer):
+    """Name uniqueness is enforced by the unique index instead of a query per validation"""
+
     class Meta:
         model = Digimon
         fields = ('pk', 'name', 'description', 'weight')
+        extra_kwargs = {'name': {'validators': []}}
 
-    @staticmethod
-    def validate_name(value: str) -> str:
-        if Digimon.objects.filter(name=value).exists():
-            raise serializers.ValidationError('Digimon with that name already exists')
-        return value
+    def create(self, validated_data: Dict[str, Any]) -> Digimon:
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Other constraints may fail too, e.g. the creator being deleted meanwhile.
+            if not Digimon.objects.filter(name=validated_data['name']).exists():
+                raise
+            raise serializers.ValidationError({'name': ['Digimon with that name already exists']})
 
 
 class UpdateDigimonSerializer(serializers.ModelSerializer):
     class Meta:
         model = Digimon
         fields = ('pk', 'description', 'weight')
+
+
+class DigimonFilterSerializer(serializers.Serializer):
+    """Validates the query params used to filter the digimons list"""
+    name = serializers.CharField(required=False)
+    name_prefix = serializers.CharField(required=False)
+    creator = serializers.IntegerField(required=False)
+    weight_min = serializers.DecimalField(required=False, max_digits=4, decimal_places=1)
+    weight_max = serializers.DecimalField(required=False, max_digits=4, decimal_places=1)
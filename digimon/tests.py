@@ -1,3 +1,8 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.test import override_settings
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
 
@@ -36,6 +41,16 @@ class DigimonCreateActionTestSuite(APITestCase):
         self.assertEqual(201, response.status_code)
         self.assertEqual(self.authenticated_user, Digimon.objects.first().creator)
 
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'create': '1/min'}},
+                       RATE_LIMIT_STORE={'BACKEND': 'pokemon.rate_limit.MemoryTokenBucketStore'})
+    def test_create_digimon_is_throttled(self):
+        self.assertEqual(201, self.client.post(path=self.create_path, data=self.valid_creation_data).status_code)
+        response = self.client.post(path=self.create_path, data={**self.valid_creation_data, 'name': 'Other'})
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('60', response['Retry-After'])
+        self.assertEqual(1, Digimon.objects.count())
+
     def test_create_digimon_with_duplicate_name(self):
         existing_digimon = DigimonFactory()
         data = {
@@ -46,6 +61,21 @@ class DigimonCreateActionTestSuite(APITestCase):
         response = self.client.post(path=self.create_path, data=data)
 
         self.assertEqual(400, response.status_code)
+        self.assertEqual(['Digimon with that name already exists'], response.data['name'])
+        self.assertEqual(1, Digimon.objects.count())
+
+    def test_create_digimon_integrity_errors_of_other_constraints_are_raised(self):
+        data = {'name': 'agumon', 'description': 'Super cool digimon', 'weight': 68}
+        with patch.object(Digimon.objects, 'create', side_effect=IntegrityError('FOREIGN KEY constraint failed')), \
+                self.assertRaises(IntegrityError):
+            self.client.post(path=self.create_path, data=data)
+
+    def test_create_digimon_does_not_query_for_duplicate_names(self):
+        # The savepoint pair around the insert, the insert and bumping the collection version.
+        with self.assertNumQueries(4):
+            response = self.client.post(path=self.create_path, data=self.valid_creation_data)
+
+        self.assertEqual(201, response.status_code)
 
 
 class UpdateDigimonActionTestSuite(APITestCase):
@@ -106,10 +136,53 @@ class ListActionTestSuite(APITestCase):
         response = self.client.get(self.list_path)
 
         self.assertEqual(200, response.status_code)
-        self.assertEqual(Digimon.objects.count(), len(response.data))
+        self.assertEqual(Digimon.objects.count(), len(response.data['results']))
 
     def test_list_as_anonymous_user(self):
         response = self.client.get(self.list_path)
 
         self.assertEqual(200, response.status_code)
-        self.assertEqual(Digimon.objects.count(), len(response.data))
+        self.assertEqual(Digimon.objects.count(), len(response.data['results']))
+
+    @override_settings(PAGE_SIZE=1)
+    def test_list_is_paginated(self):
+        first_page = self.client.get(self.list_path)
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertEqual(1, len(first_page.data['results']))
+        self.assertEqual(1, len(second_page.data['results']))
+        self.assertLess(first_page.data['results'][0]['pk'], second_page.data['results'][0]['pk'])
+        self.assertIsNone(second_page.data['next'])
+
+    def test_list_is_not_modified_until_a_digimon_is_created(self):
+        etag = self.client.get(self.list_path)['ETag']
+        self.assertEqual(304, self.client.get(self.list_path, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        DigimonFactory()
+        response = self.client.get(self.list_path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(response.data['results']))
+
+
+class FilterDigimonsTestSuite(APITestCase):
+
+    def setUp(self):
+        self.list_path = reverse('digimon-list')
+        self.agumon = DigimonFactory(name='agumon', weight=3)
+        self.angemon = DigimonFactory(name='angemon', weight=50)
+        self.gabumon = DigimonFactory(name='gabumon', weight=3, creator=self.agumon.creator)
+
+    def list_names(self, **params):
+        response = self.client.get(path=self.list_path, data=params)
+        self.assertEqual(200, response.status_code)
+        return [item['name'] for item in response.data['results']]
+
+    def test_filter_by_name(self):
+        self.assertEqual(['gabumon'], self.list_names(name='gabumon'))
+        self.assertEqual(['agumon', 'angemon'], self.list_names(name_prefix='a'))
+
+    def test_filter_by_creator_and_weight(self):
+        self.assertEqual(['agumon', 'gabumon'], self.list_names(creator=self.agumon.creator.pk))
+        self.assertEqual(['angemon'], self.list_names(weight_min=10))
+        self.assertEqual(['agumon', 'gabumon'], self.list_names(weight_max=10))
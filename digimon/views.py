@@ -5,16 +5,32 @@ from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
+from rest_framework.throttling import BaseThrottle
 from rest_framework.viewsets import GenericViewSet
 
 from digimon.models import Digimon
-from digimon.serializers import ReadCreateDigimonSerializer, UpdateDigimonSerializer
+from digimon.serializers import ReadCreateDigimonSerializer, UpdateDigimonSerializer, DigimonFilterSerializer
+from pokemon.conditional import ConditionalListMixin
+from pokemon.filters import QueryParamsFilterBackend
+from pokemon.pagination import KeysetPagination
+from pokemon.rate_limit import CreateRateThrottle
 
 
-class DigimonViewSet(GenericViewSet, CreateModelMixin, UpdateModelMixin, ListModelMixin):
+class DigimonViewSet(ConditionalListMixin, GenericViewSet, CreateModelMixin, UpdateModelMixin, ListModelMixin):
+    collection_name = Digimon.COLLECTION
     serializer_class = ReadCreateDigimonSerializer
     permission_classes = [IsAuthenticated]
     queryset = Digimon.objects.all()
+    pagination_class = KeysetPagination
+    filter_backends = [QueryParamsFilterBackend]
+    filter_serializer_class = DigimonFilterSerializer
+    filter_lookups = {
+        'name': 'name',
+        'name_prefix': 'name__startswith',
+        'creator': 'creator_id',
+        'weight_min': 'weight__gte',
+        'weight_max': 'weight__lte',
+    }
 
     def perform_create(self, serializer: BaseSerializer) -> None:
         serializer.save(creator=self.request.user)
@@ -33,6 +49,11 @@ class DigimonViewSet(GenericViewSet, CreateModelMixin, UpdateModelMixin, ListMod
             return [IsAuthenticated()]
         return []
 
+    def get_throttles(self) -> List[BaseThrottle]:
+        if self.action == 'create':
+            return [CreateRateThrottle()]
+        return []
+
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action in ['partial_update', 'update']:
             return UpdateDigimonSerializer
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from pokemon.async_pokeapi_client import get_async_client
+from pokemon.conf import pokeapi_setting
+from pokemon.exceptions import PokemonAPITimeout, PokemonDoesNotExist
+from pokemon.external_pokemon_api import ability_data_from_json, get_ability_id
+from pokemon.models import Ability, Pokemon
+from pokemon.response_cache import get_response_cache
+from pokemon.singleflight import AsyncSingleFlight
+
+_fetches_in_flight = AsyncSingleFlight()
+
+
+async def aretrieve_pokemon_abilities(pokemon_name: str) -> List[Ability]:
+    """Async counterpart of retrieve_pokemon_abilities, used by the async views"""
+    pokemon = await Pokemon.objects.filter(name=pokemon_name).afirst()
+    if pokemon is not None:
+        return [ability async for ability in pokemon.abilities.all()]
+
+    pokemon_json = await aretrieve_pokemon_from_api(pokemon_name)
+    abilities_by_url = await aresolve_abilities(pokemon_json['abilities'])
+    return [abilities_by_url[entry['ability']['url']] for entry in pokemon_json['abilities']]
+
+
+async def aretrieve_pokemon_from_api(pokemon_name: str) -> dict:
+    pokemon_detail_path = f"{pokeapi_setting('BASE_URL')}/pokemon/{pokemon_name}/"
+    try:
+        return await afetch_json(pokemon_detail_path)
+    except httpx.HTTPStatusError as error:
+        if error.response.status_code == 404:
+            raise PokemonDoesNotExist
+        raise
+
+
+async def afetch_json(url: str) -> dict:
+    """
+    Async counterpart of fetch_json, going through the same response cache.
+    Concurrent misses of the same url within the event loop share a single api call, httpx.HTTPStatusError is raised
+    for unsuccessful responses.
+    """
+    cache = get_response_cache()
+    data = await sync_to_async(cache.get, thread_sensitive=False)(url)
+    if data is None:
+        data = await _fetches_in_flight.do(url, lambda: _afetch_json_from_api(url))
+    return data
+
+
+async def _afetch_json_from_api(url: str) -> dict:
+    response = await get_async_client().get(url)
+    response.raise_for_status()
+    data = response.json()
+    await sync_to_async(get_response_cache().set, thread_sensitive=False)(url, data)
+    return data
+
+
+async def aresolve_abilities(ability_entries: Sequence[dict]) -> Dict[str, Ability]:
+    """Async counterpart of resolve_abilities, only the abilities missing in the db are fetched from the api"""
+    ability_ids_by_url = {entry['ability']['url']: get_ability_id(entry) for entry in ability_entries}
+    abilities_by_id = await Ability.objects.ain_bulk(
+        [ability_id for ability_id in ability_ids_by_url.values() if ability_id])
+
+    missing_entries = {entry['ability']['url']: entry for entry in ability_entries
+                       if ability_ids_by_url[entry['ability']['url']] not in abilities_by_id}
+    if missing_entries:
+        abilities_json = await afetch_concurrently(aget_ability_from_api, list(missing_entries.values()))
+        new_abilities = [Ability(**ability_data_from_json(ability_json)) for ability_json in abilities_json]
+        await Ability.objects.abulk_create(new_abilities, ignore_conflicts=True)
+        for url, ability in zip(missing_entries, new_abilities):
+            ability_ids_by_url[url] = ability.pk
+            abilities_by_id[ability.pk] = ability
+
+    return {url: abilities_by_id[ability_id] for url, ability_id in ability_ids_by_url.items()}
+
+
+async def aget_ability_from_api(ability_entry: dict) -> dict:
+    return await afetch_json(ability_entry['ability']['url'])
+
+
+async def afetch_concurrently(fetch: Callable[[Any], Awaitable[Any]], items: Sequence[Any]) -> List[Any]:
+    """
+    Async counterpart of fetch_concurrently, awaiting at most FETCH_CONCURRENCY calls at once and raising
+    PokemonAPITimeout if the calls of a chunk of FETCH_CHUNK_SIZE items are not all done within FETCH_DEADLINE seconds.
+    """
+    semaphore = asyncio.Semaphore(max(pokeapi_setting('FETCH_CONCURRENCY'), 1))
+    chunk_size = max(pokeapi_setting('FETCH_CHUNK_SIZE'), 1)
+
+    async def fetch_with_semaphore(item: Any) -> Any:
+        async with semaphore:
+            return await fetch(item)
+
+    results: List[Any] = []
+    for start in range(0, len(items), chunk_size):
+        try:
+            results.extend(await asyncio.wait_for(
+                asyncio.gather(*[fetch_with_semaphore(item) for item in items[start:start + chunk_size]]),
+                timeout=pokeapi_setting('FETCH_DEADLINE')))
+        except asyncio.TimeoutError:
+            raise PokemonAPITimeout
+    return results
@@ -0,0 +1,108 @@
+import asyncio
+import weakref
+from typing import Any, Optional, Set
+
+import httpx
+
+from pokemon.conf import lazy_setting_singleton, pokeapi_setting
+from pokemon.metrics import POKEAPI, record_timing
+from pokemon.pokeapi_client import RETRY_STATUS_CODES
+from pokemon.rate_limit import aacquire_egress_token
+
+
+class AsyncPokeAPIClient:
+    """
+    Async counterpart of PokeAPIClient, used by the async views.
+    It keeps a pool of keep-alive connections, applies the same timeouts and retries 429/5xx responses with the same
+    exponential backoff, honouring the Retry-After header when there is one.
+    """
+
+    def __init__(self, pool_size: int, connect_timeout: float, read_timeout: float, max_retries: int,
+                 retry_backoff_factor: float) -> None:
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+        # Requests beyond the pool size wait here rather than in the httpx pool, whose bookkeeping is quadratic in
+        # the number of queued requests.
+        self._slots = asyncio.Semaphore(pool_size)
+        self.max_retries = max_retries
+        self.retry_backoff_factor = retry_backoff_factor
+
+    @classmethod
+    def from_settings(cls) -> 'AsyncPokeAPIClient':
+        return cls(
+            pool_size=pokeapi_setting('ASYNC_POOL_SIZE'),
+            connect_timeout=pokeapi_setting('CONNECT_TIMEOUT'),
+            read_timeout=pokeapi_setting('READ_TIMEOUT'),
+            max_retries=pokeapi_setting('MAX_RETRIES'),
+            retry_backoff_factor=pokeapi_setting('RETRY_BACKOFF_FACTOR'))
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        retry = 0
+        while True:
+            await aacquire_egress_token()
+            async with self._slots:
+                with record_timing(POKEAPI):
+                    response = await self.client.get(url, **kwargs)
+            if response.status_code not in RETRY_STATUS_CODES or retry >= self.max_retries:
+                return response
+            await asyncio.sleep(self._get_backoff(response, retry))
+            retry += 1
+
+    def _get_backoff(self, response: httpx.Response, retry: int) -> float:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self.retry_backoff_factor * 2 ** retry
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class AsyncPokeAPIClients:
+    """
+    Clients by event loop, as connections can't be shared between loops. Closing them closes every client on its own
+    loop, clients of loops that are closed already can't be closed anymore and are only dropped.
+    """
+
+    def __init__(self) -> None:
+        self._clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncPokeAPIClient]' = \
+            weakref.WeakKeyDictionary()
+        self._closing: Set['asyncio.Future[None]'] = set()
+
+    def get(self) -> AsyncPokeAPIClient:
+        """Returns the client of the running event loop, creating it from settings on first use"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = AsyncPokeAPIClient.from_settings()
+        return client
+
+    def close(self) -> None:
+        try:
+            running_loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for loop, client in list(self._clients.items()):
+            if loop.is_closed():
+                continue
+            if loop is running_loop:
+                # Referenced until done, the loop only keeps weak references to its tasks.
+                task = loop.create_task(client.aclose())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+        self._clients.clear()
+
+
+@lazy_setting_singleton('POKEAPI', close=lambda clients: clients.close())
+def get_async_clients() -> AsyncPokeAPIClients:
+    return AsyncPokeAPIClients()
+
+
+def get_async_client() -> AsyncPokeAPIClient:
+    """Returns the client of the running event loop, see AsyncPokeAPIClients"""
+    return get_async_clients().get()
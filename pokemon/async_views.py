@@ -0,0 +1,102 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from pokemon.async_external_pokemon_api import aretrieve_pokemon_abilities
+from pokemon.conf import pokeapi_setting
+from pokemon.enrichment import save_pokemon_for_enrichment
+from pokemon.exceptions import PokemonAPIRateLimited, PokemonAPITimeout, PokemonDoesNotExist, PokemonNamesUnavailable
+from pokemon.models import Pokemon
+from pokemon.rate_limit import CreateRateThrottle, retry_after_header
+from pokemon.serializers import AsyncPokemonPageSerializer, ReadCreatePokemonSerializer
+
+
+@require_http_methods(['GET', 'POST'])
+async def pokemons(request: HttpRequest) -> JsonResponse:
+    """
+    Async variant of the list and create actions of PokemonViewSet, to be served by an ASGI server.
+    No worker thread is held while the external api is awaited, so a single worker can keep many creations in
+    flight. Requests are authenticated by their session only.
+    """
+    if request.method == 'POST':
+        return await create_pokemon(request)
+    return await list_pokemons(request)
+
+
+async def list_pokemons(request: HttpRequest) -> JsonResponse:
+    """Lists pokemons by pk, the `next` url of a page continues after the last pk of that page"""
+    params = AsyncPokemonPageSerializer(data=request.GET)
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=400)
+    after = params.validated_data.get('after', 0)
+    page_size = min(params.validated_data.get('page_size', settings.PAGE_SIZE), settings.MAX_PAGE_SIZE)
+
+    queryset = Pokemon.objects.only('pk', 'name', 'description', 'weight', 'abilities_status').prefetch_related(
+        'abilities')
+    pokemons_page = [pokemon async for pokemon in queryset.filter(pk__gt=after).order_by('pk')[:page_size + 1]]
+
+    next_url = None
+    if len(pokemons_page) > page_size:
+        pokemons_page = pokemons_page[:page_size]
+        next_url = request.build_absolute_uri(f'{request.path}?after={pokemons_page[-1].pk}&page_size={page_size}')
+    results = ReadCreatePokemonSerializer(pokemons_page, many=True).data
+    return JsonResponse({'next': next_url, 'results': results}, encoder=JSONEncoder)
+
+
+async def create_pokemon(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    throttle = CreateRateThrottle()
+    if not await sync_to_async(throttle.allow, thread_sensitive=False)(throttle.get_ident(request), user):
+        return throttled_response(throttle.wait(), 'Request was throttled.')
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'detail': 'JSON parse error'}, status=400)
+
+    serializer = ReadCreatePokemonSerializer(data=data, context={'request': request})
+    try:
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+    except PokemonNamesUnavailable as error:
+        response = JsonResponse({'detail': error.detail}, status=error.status_code)
+        if error.wait:
+            response['Retry-After'] = retry_after_header(error.wait)
+        return response
+
+    if pokeapi_setting('ASYNC_ENRICHMENT'):
+        try:
+            await sync_to_async(save_pokemon_for_enrichment)(serializer)
+        except ValidationError as error:
+            return JsonResponse(error.detail, status=400)
+        data = await sync_to_async(lambda: serializer.data)()
+        return JsonResponse(data, status=202, encoder=JSONEncoder)
+
+    try:
+        abilities = await aretrieve_pokemon_abilities(serializer.validated_data['name'])
+    except PokemonDoesNotExist:
+        return JsonResponse({'detail': 'That name does not match any Pokemon'}, status=400)
+    except PokemonAPITimeout:
+        return JsonResponse({'detail': 'Pokemon abilities could not be retrieved in time, try again later'},
+                            status=504)
+    except PokemonAPIRateLimited as error:
+        return throttled_response(error.retry_after, 'Too many pokemons are being retrieved right now, try again later')
+
+    try:
+        await sync_to_async(serializer.save)(abilities=abilities)
+    except ValidationError as error:
+        return JsonResponse(error.detail, status=400)
+    data = await sync_to_async(lambda: serializer.data)()
+    return JsonResponse(data, status=201, encoder=JSONEncoder)
+
+
+def throttled_response(retry_after: float, detail: str) -> JsonResponse:
+    response = JsonResponse({'detail': detail}, status=429)
+    response['Retry-After'] = retry_after_header(retry_after)
+    return response
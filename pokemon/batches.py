@@ -0,0 +1,65 @@
+from typing import Any, Callable, Dict, List, Sequence, Set, Tuple, Type
+
+from django.db import IntegrityError
+from django.db.models import Model
+from rest_framework.serializers import BaseSerializer
+
+
+def error_result(errors: Any) -> Dict[str, Any]:
+    return {'status': 400, 'errors': errors}
+
+
+def validate_items(items: Sequence[Any],
+                   serializer_class: Type[BaseSerializer]) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+    """
+    Returns one result per item, in the same order, holding the errors of the invalid ones, and the validated data of
+    the valid ones by index. Results of valid items are left empty to be filled by the caller.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in items]
+    valid_items: Dict[int, Dict[str, Any]] = {}
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid_items[index] = serializer.validated_data
+        else:
+            results[index] = error_result(serializer.errors)
+    return results, valid_items
+
+
+def exclude_taken(valid_items: Dict[int, Dict[str, Any]], results: List[Dict[str, Any]], key: str,
+                  taken_keys: Set[Any], errors: Any) -> Dict[int, Dict[str, Any]]:
+    """Reports items whose key is taken, or is repeated within the batch, and returns the remaining items"""
+    taken_keys = set(taken_keys)
+    remaining_items = {}
+    for index, data in valid_items.items():
+        if data[key] in taken_keys:
+            results[index] = error_result(errors)
+        else:
+            taken_keys.add(data[key])
+            remaining_items[index] = data
+    return remaining_items
+
+
+def insert_reporting_taken(objects: Dict[int, Model], results: List[Dict[str, Any]],
+                           insert: Callable[[List[Model]], None], key: str, errors: Any) -> None:
+    """
+    Inserts the objects with `insert`, which must be atomic. If unique keys were taken since they were checked, the
+    insert fails as a whole, so the items whose key is now in the db are reported with `errors` and the others inserted
+    again. Reported items are removed from `objects`, the remaining ones have their primary key set.
+    """
+    while objects:
+        try:
+            insert(list(objects.values()))
+            return
+        except IntegrityError:
+            model = type(next(iter(objects.values())))
+            keys = [getattr(obj, key) for obj in objects.values()]
+            taken_keys = set(model._default_manager.filter(**{f'{key}__in': keys}).values_list(key, flat=True))
+            if not taken_keys:
+                raise
+            for index, obj in list(objects.items()):
+                # Primary keys may have been set by a rolled back batch of the bulk insert.
+                obj.pk = None
+                if getattr(obj, key) in taken_keys:
+                    results[index] = error_result(errors)
+                    del objects[index]
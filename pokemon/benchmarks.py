@@ -0,0 +1,134 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import factory
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+
+from authentication.sessions import write_behind_buffer
+from digimon.factories import DigimonFactory
+from digimon.models import Digimon
+from pokemon.conf import DEFAULTS
+from pokemon.factories import AbilityFactory, PokemonFactory
+from pokemon.fake_pokeapi import ABILITIES_PER_POKEMON, FakePokeAPI
+from pokemon.models import Ability, CollectionVersion, Pokemon
+
+User = get_user_model()
+
+
+@contextmanager
+def throwaway_database() -> Iterator[None]:
+    """Runs the block against a new database in a temporary file, set up like the test runner sets up tests"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # A file database, the in-memory one used by tests does not support concurrent writers.
+        connections['default'].settings_dict['TEST']['NAME'] = os.path.join(temp_dir, 'benchmark.sqlite3')
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            # Writes the deferred sessions while their table still exists.
+            write_behind_buffer.flush()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+
+def fake_pokeapi_settings(fake_api: FakePokeAPI) -> Dict[str, Any]:
+    """
+    Keeps the configured pools, timeouts and retries, but points to the fake api, keeps nothing on disk and doesn't
+    limit the calls to it.
+    """
+    return {
+        **getattr(settings, 'POKEAPI', {}),
+        'BASE_URL': fake_api.base_url,
+        'RESPONSE_CACHE': DEFAULTS['RESPONSE_CACHE'],
+        'FETCH_LOCK': None,
+        'NAMES_SNAPSHOT_PATH': None,
+        'NAMES_REFRESH_INTERVAL': None,
+        'ASYNC_ENRICHMENT': False,
+        'EGRESS_RATE': None,
+    }
+
+
+def unthrottled_rest_framework_settings() -> Dict[str, Any]:
+    """Keeps the configured rest framework settings but the throttle rates, benchmarks measure the app itself"""
+    return {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+
+def seed_database(pokemons_count: int, abilities_count: int, digimons_count: int, creator: User) -> None:
+    """
+    Inserts pokemons, abilities and digimons built by the model factories, with a bulk insert per table.
+    Abilities get the ids 1 to `abilities_count`, like the ones served by a FakePokeAPI with as many abilities.
+    """
+    abilities = Ability.objects.bulk_create(AbilityFactory.build_batch(
+        abilities_count, api_obj_id=factory.Iterator(range(1, abilities_count + 1))))
+    pokemons = Pokemon.objects.bulk_create(PokemonFactory.build_batch(
+        pokemons_count, creator=creator, name=factory.Sequence(lambda number: f'seed-pokemon-{number}')))
+    PokemonAbility = Pokemon.abilities.through
+    PokemonAbility.objects.bulk_create([
+        PokemonAbility(pokemon_id=pokemon.pk, ability_id=abilities[(index + offset) % abilities_count].pk)
+        for index, pokemon in enumerate(pokemons)
+        for offset in range(min(ABILITIES_PER_POKEMON, abilities_count))
+    ])
+    Digimon.objects.bulk_create(DigimonFactory.build_batch(
+        digimons_count, creator=creator, name=factory.Sequence(lambda number: f'seed-digimon-{number}')))
+    CollectionVersion.bump(Pokemon.COLLECTION)
+    CollectionVersion.bump(Digimon.COLLECTION)
+
+
+class ThreadClients:
+    """Test clients of the current thread, logged in as `user` if one is given"""
+
+    def __init__(self, user: Optional[User] = None) -> None:
+        self.user = user
+        self._local = threading.local()
+
+    def get(self) -> Client:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            # Server errors are measured like any other response instead of being raised.
+            client = self._local.client = Client(raise_request_exception=False)
+            if self.user is not None:
+                client.force_login(self.user)
+        return client
+
+
+def measure(send_request: Callable[[int], int], count: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Sends `count` requests from `concurrency` threads and sums up their statuses and latencies.
+    `send_request(number)` sends the request with that number and returns the response status.
+    """
+    def timed_request(number: int) -> Any:
+        started_at = time.perf_counter()
+        status = send_request(number)
+        return status, time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed_request, range(count)))
+    duration = time.perf_counter() - started_at
+    return summarize([status for status, _ in outcomes], [latency for _, latency in outcomes], duration)
+
+
+def summarize(statuses: List[int], latencies: List[float], duration: float) -> Dict[str, Any]:
+    """Sums up a run, latencies are in milliseconds and responses with a 4xx or 5xx status count as errors"""
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(statuses),
+        'errors': sum(1 for status in statuses if status >= 400),
+        'duration': round(duration, 3),
+        'throughput': round(len(statuses) / duration, 1),
+        'latency_p50': round(percentiles[49] * 1000, 1),
+        'latency_p95': round(percentiles[94] * 1000, 1),
+        'latency_p99': round(percentiles[98] * 1000, 1),
+    }
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Sequence
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from pokemon.batches import error_result, exclude_taken, insert_reporting_taken, validate_items
+from pokemon.exceptions import PokemonDoesNotExist
+from pokemon.external_pokemon_api import retrieve_abilities_for_pokemons
+from pokemon.models import CollectionVersion, Pokemon
+from pokemon.serializers import BulkCreatePokemonItemSerializer, ReadCreatePokemonSerializer
+
+User = get_user_model()
+
+MAX_BULK_CREATE_ITEMS: int = 500
+
+NAME_TAKEN_ERRORS: Dict[str, List[str]] = {'name': ['Pokemon with that name already exists']}
+
+
+def bulk_create_pokemons(items: Sequence[Any], creator: User) -> List[Dict[str, Any]]:
+    """
+    Creates the pokemons described by the given items and returns one result per item, in the same order.
+    A result holds either the created pokemon data with status 201, or the item errors with status 400.
+    Name uniqueness is validated with one query for the whole batch, pokemons and abilities are fetched concurrently
+    by retrieve_abilities_for_pokemons, then everything is inserted with a bulk insert per table. Items whose name is
+    taken by a concurrent request in the meantime are reported like the ones taken beforehand.
+    """
+    results, valid_items = validate_items(items, BulkCreatePokemonItemSerializer)
+    taken_names = set(Pokemon.objects.filter(name__in=[data['name'] for data in valid_items.values()]).values_list(
+        'name', flat=True))
+    items_to_create = exclude_taken(valid_items, results, 'name', taken_names, NAME_TAKEN_ERRORS)
+    abilities_by_name = retrieve_abilities_for_pokemons([data['name'] for data in items_to_create.values()])
+
+    pokemons_to_create: Dict[int, Pokemon] = {}
+    for index, data in items_to_create.items():
+        abilities = abilities_by_name[data['name']]
+        if isinstance(abilities, PokemonDoesNotExist):
+            results[index] = error_result({'name': ['That name does not match any Pokemon']})
+        elif isinstance(abilities, Exception):
+            results[index] = error_result({'detail': 'Pokemon could not be retrieved, try again later'})
+        else:
+            pokemons_to_create[index] = Pokemon(creator=creator, **data)
+
+    insert_reporting_taken(pokemons_to_create, results,
+                           lambda pokemons: _insert_pokemons_with_abilities(pokemons, abilities_by_name),
+                           'name', NAME_TAKEN_ERRORS)
+
+    created_pokemons = Pokemon.objects.prefetch_related('abilities').in_bulk(
+        [pokemon.pk for pokemon in pokemons_to_create.values()])
+    for index, pokemon in pokemons_to_create.items():
+        results[index] = {'status': 201, 'data': ReadCreatePokemonSerializer(created_pokemons[pokemon.pk]).data}
+    return results
+
+
+def _insert_pokemons_with_abilities(pokemons: List[Pokemon], abilities_by_name: Dict[str, Any]) -> None:
+    PokemonAbility = Pokemon.abilities.through
+    with transaction.atomic():
+        Pokemon.objects.bulk_create(pokemons)
+        PokemonAbility.objects.bulk_create([
+            PokemonAbility(pokemon_id=pokemon.pk, ability_id=ability_pk)
+            for pokemon in pokemons
+            for ability_pk in dict.fromkeys(ability.pk for ability in abilities_by_name[pokemon.name])
+        ])
+        CollectionVersion.bump(Pokemon.COLLECTION)
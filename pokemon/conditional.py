@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from pokemon.models import CollectionVersion
+
+
+def is_not_modified(request: HttpRequest, etag: str) -> bool:
+    """Whether the If-None-Match header of the request matches `etag`"""
+    client_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return etag in client_etags or '*' in client_etags
+
+
+class ConditionalListMixin:
+    """
+    Serves the list action with a strong ETag derived from the version of `collection_name`, see CollectionVersion.
+    Clients revalidating the current version with If-None-Match get a 304 for the cost of the version lookup, and the
+    serialized pages of each version are cached for LIST_PAGE_CACHE_TIMEOUT seconds.
+    """
+    collection_name: str = ''
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # The version is read before the page, so a page can be cached with an older version but never with a newer.
+        version = CollectionVersion.get_token(self.collection_name)
+        etag = quote_etag(f'{self.collection_name}-{version}-{request.accepted_renderer.format}')
+        if is_not_modified(request, etag):
+            response = Response(status=304)
+        else:
+            url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+            cache_key = f'list-page:{etag}:{url_hash}'
+            data = cache.get(cache_key)
+            if data is None:
+                data = super().list(request, *args, **kwargs).data
+                cache.set(cache_key, data, settings.LIST_PAGE_CACHE_TIMEOUT)
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class RenderedResponseCache:
+    """
+    Keeps rendered response bodies with their strong ETag in process memory, keyed by whatever the body depends on.
+    Meant for a few large responses that rarely change, the oldest entries are dropped beyond `max_entries`, so the
+    entries of outdated keys go away as new ones are rendered.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get_response(self, request: HttpRequest, key: Hashable, render: Callable[[], bytes],
+                     content_type: str) -> HttpResponse:
+        """Responds with the body cached for `key`, rendering it on a miss, or with a 304 if the client has it"""
+        entry = self._entries.get(key)
+        if entry is None:
+            body = render()
+            entry = (quote_etag(hashlib.sha1(body).hexdigest()), body)
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+        etag, body = entry
+        if is_not_modified(request, etag):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(body, content_type=content_type)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,83 @@
+import threading
+from typing import Any, Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+T = TypeVar('T')
+
+DEFAULTS: Dict[str, Any] = {
+    'BASE_URL': 'https://pokeapi.co/api/v2',
+    'FETCH_CONCURRENCY': 4,
+    'FETCH_DEADLINE': 10,
+    'FETCH_CHUNK_SIZE': 40,
+    'POOL_SIZE': 10,
+    'ASYNC_POOL_SIZE': 20,
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF_FACTOR': 0.5,
+    'EGRESS_RATE': None,
+    'EGRESS_BURST': 10,
+    'EGRESS_MAX_WAIT': 1,
+    'RESPONSE_CACHE': {
+        'BACKEND': 'pokemon.response_cache.MemoryResponseCache',
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'MAX_ENTRIES': 1000,
+    },
+    'FETCH_LOCK': None,
+    'NAMES_SNAPSHOT_PATH': None,
+    'NAMES_REFRESH_INTERVAL': None,
+    'ASYNC_ENRICHMENT': False,
+    'ENRICHMENT_WORKERS': 4,
+    'ENRICHMENT_MAX_ATTEMPTS': 5,
+    'ENRICHMENT_RETRY_BACKOFF': 2,
+    'ENRICHMENT_LEASE': 300,
+}
+
+
+def pokeapi_setting(name: str) -> Any:
+    """Reads a key of `settings.POKEAPI`, falling back to its default value when it is not set."""
+    return getattr(settings, 'POKEAPI', {}).get(name, DEFAULTS[name])
+
+
+_UNSET: Any = object()
+
+
+class LazySettingSingleton(Generic[T]):
+    """
+    Object shared by the whole process, built by `factory` on first use and built again once one of `setting_names`
+    changed, e.g. under override_settings. The object that is dropped is passed to `close` first, when given.
+    """
+
+    def __init__(self, factory: Callable[[], T], setting_names: Iterable[str],
+                 close: Optional[Callable[[T], Any]] = None) -> None:
+        self.factory = factory
+        self.setting_names = frozenset(setting_names)
+        self.close = close
+        self._instance: Any = _UNSET
+        self._lock = threading.Lock()
+        setting_changed.connect(self.reset, weak=False)
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is _UNSET:
+            with self._lock:
+                if self._instance is _UNSET:
+                    self._instance = self.factory()
+                instance = self._instance
+        return instance
+
+    def reset(self, setting: str, **kwargs: Any) -> None:
+        if setting not in self.setting_names:
+            return
+        with self._lock:
+            instance, self._instance = self._instance, _UNSET
+        if self.close is not None and instance is not _UNSET and instance is not None:
+            self.close(instance)
+
+
+def lazy_setting_singleton(*setting_names: str, close: Optional[Callable[[Any], Any]] = None) \
+        -> Callable[[Callable[[], T]], LazySettingSingleton[T]]:
+    """Turns a factory into a LazySettingSingleton reset by the given settings"""
+    return lambda factory: LazySettingSingleton(factory, setting_names, close)
@@ -0,0 +1,123 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.serializers import BaseSerializer
+
+from pokemon.conf import pokeapi_setting
+from pokemon.exceptions import PokemonDoesNotExist
+from pokemon.external_pokemon_api import create_abilities_from_json_data, retrieve_pokemon_from_api
+from pokemon.models import CollectionVersion, EnrichmentJob, Pokemon
+
+logger = logging.getLogger(__name__)
+
+
+def save_pokemon_for_enrichment(serializer: BaseSerializer) -> Pokemon:
+    """Saves the pokemon of a validated create serializer with its abilities pending, and queues their fetch"""
+    with transaction.atomic():
+        pokemon = serializer.save(abilities_status=Pokemon.ABILITIES_PENDING)
+        EnrichmentJob.objects.create(pokemon=pokemon)
+    return pokemon
+
+
+def claim_jobs(limit: int) -> List[EnrichmentJob]:
+    """
+    Marks up to `limit` due jobs as running and returns them.
+    Jobs are claimed by a conditional update, so concurrent workers never claim the same job.
+    """
+    now = timezone.now()
+    claimable = Q(status=EnrichmentJob.PENDING, run_after__lte=now) | Q(
+        status=EnrichmentJob.RUNNING, locked_at__lt=now - timedelta(seconds=pokeapi_setting('ENRICHMENT_LEASE')))
+    job_ids = list(EnrichmentJob.objects.filter(claimable).order_by('run_after').values_list('pk', flat=True)[:limit])
+    if not job_ids:
+        return []
+
+    claim_id = uuid.uuid4().hex
+    EnrichmentJob.objects.filter(claimable, pk__in=job_ids).update(
+        status=EnrichmentJob.RUNNING, locked_by=claim_id, locked_at=now, attempts=F('attempts') + 1)
+    return list(EnrichmentJob.objects.filter(locked_by=claim_id).select_related('pokemon'))
+
+
+def run_job(job: EnrichmentJob) -> bool:
+    """Fetches and links the abilities of the job pokemon, returns whether it succeeded"""
+    pokemon = job.pokemon
+    try:
+        abilities = create_abilities_from_json_data(retrieve_pokemon_from_api(pokemon.name))
+    except Exception as error:
+        _retry_or_fail(job, error)
+        return False
+
+    with transaction.atomic():
+        pokemon.abilities.set(abilities)
+        Pokemon.objects.filter(pk=pokemon.pk).update(abilities_status=Pokemon.ABILITIES_READY)
+        CollectionVersion.bump(Pokemon.COLLECTION)
+        job.delete()
+    return True
+
+
+def _retry_or_fail(job: EnrichmentJob, error: Exception) -> None:
+    """Schedules the next attempt of the job with exponential backoff, unless it can't succeed anymore"""
+    job.last_error = repr(error)
+    job.locked_by, job.locked_at = '', None
+    if isinstance(error, PokemonDoesNotExist) or job.attempts >= pokeapi_setting('ENRICHMENT_MAX_ATTEMPTS'):
+        logger.warning('Enriching pokemon %s failed for good: %r', job.pokemon.name, error)
+        job.status = EnrichmentJob.FAILED
+        with transaction.atomic():
+            job.save()
+            Pokemon.objects.filter(pk=job.pokemon_id).update(abilities_status=Pokemon.ABILITIES_FAILED)
+            CollectionVersion.bump(Pokemon.COLLECTION)
+        return
+
+    backoff = pokeapi_setting('ENRICHMENT_RETRY_BACKOFF') * 2 ** (job.attempts - 1)
+    job.status = EnrichmentJob.PENDING
+    job.run_after = timezone.now() + timedelta(seconds=backoff)
+    job.save()
+
+
+class EnrichmentWorker:
+    """
+    Runs the queued enrichment jobs on a pool of `workers` threads, the jobs mostly wait for the api.
+    Several worker processes can run at once, on the same or different nodes, as jobs are claimed through the db.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._stop = threading.Event()
+
+    def run_once(self) -> int:
+        """Runs the jobs that are due now, one batch per pool, and returns how many were run"""
+        run_count = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='enrichment') as executor:
+            while not self._stop.is_set():
+                jobs = claim_jobs(limit=self.workers)
+                if not jobs:
+                    break
+                list(executor.map(self._run_job_in_thread, jobs))
+                run_count += len(jobs)
+        return run_count
+
+    def run_forever(self, poll_interval: float) -> None:
+        """Runs due jobs until stopped, polling for new ones every `poll_interval` seconds while the queue is idle"""
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(poll_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @staticmethod
+    def _run_job_in_thread(job: EnrichmentJob) -> bool:
+        try:
+            return run_job(job)
+        except Exception:
+            logger.exception('Enrichment job %s crashed, it is retried once its lease expires', job.pk)
+            return False
+        finally:
+            # Pool threads are discarded at the end of run_once, their db connections must not be left open.
+            connection.close()
@@ -1,3 +1,47 @@
+from typing import Optional
+
+from rest_framework.exceptions import APIException
+
+
 class PokemonDoesNotExist(Exception):
     """Raised when external api call to pokemon detail returns 404"""
     pass
+
+
+class PokemonAPITimeout(Exception):
+    """Raised when concurrent calls to the external api are not all done within the deadline"""
+    pass
+
+
+class PokemonAPIRateLimited(Exception):
+    """Raised when a call to the external api would have to wait too long for the egress rate limit"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f'Retry after {retry_after:.2f} seconds')
+        self.retry_after = retry_after
+
+
+class RequestCostExceeded(APIException):
+    """Raised when a request takes more tokens than its throttle bucket holds, so it could never be allowed"""
+    status_code = 400
+    default_detail = 'The request is too large for the rate limit'
+    default_code = 'request_cost_exceeded'
+
+
+class PokemonNamesUnavailable(APIException):
+    """Raised when the pokemon names are not loaded yet and can't be retrieved from the external api"""
+    status_code = 503
+    default_detail = 'Pokemon names could not be retrieved, try again later'
+    default_code = 'pokemon_names_unavailable'
+
+    def __init__(self, wait: Optional[float] = None) -> None:
+        super().__init__()
+        # Sent back in a Retry-After header by the rest framework exception handler.
+        self.wait = wait
+
+
+class PokemonNamesTimeout(PokemonNamesUnavailable):
+    """Raised when the external api does not answer in time while the pokemon names are loaded"""
+    status_code = 504
+    default_detail = 'Pokemon names could not be retrieved in time, try again later'
+    default_code = 'pokemon_names_timeout'
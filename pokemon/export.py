@@ -0,0 +1,21 @@
+import json
+from typing import Iterator
+
+from django.db.models import QuerySet
+from rest_framework.utils.encoders import JSONEncoder
+
+from pokemon.models import Pokemon
+from pokemon.serializers import ReadCreatePokemonSerializer
+
+EXPORT_CHUNK_SIZE: int = 2000
+
+
+def iter_pokemons_ndjson(queryset: 'QuerySet[Pokemon]', chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yields every pokemon of the queryset serialized as a line of json.
+    Rows are read through a chunked iterator, with the abilities of each chunk prefetched at once, so memory use
+    depends on the chunk size and not on the size of the table.
+    """
+    pokemons = queryset.order_by('pk').prefetch_related('abilities').iterator(chunk_size=chunk_size)
+    for pokemon in pokemons:
+        yield json.dumps(ReadCreatePokemonSerializer(pokemon).data, cls=JSONEncoder) + '\n'
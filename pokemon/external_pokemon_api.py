@@ -1,12 +1,18 @@
-from typing import Sequence, Union
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 import requests
 from django.db.models import QuerySet
 
-from pokemon.exceptions import PokemonDoesNotExist
-from pokemon.models import Ability, Pokemon
+from pokemon.conf import pokeapi_setting
+from pokemon.exceptions import PokemonAPITimeout, PokemonDoesNotExist
+from pokemon.models import Ability, CollectionVersion, Pokemon
+from pokemon.pokeapi_client import get_client
+from pokemon.response_cache import get_response_cache
+from pokemon.singleflight import SingleFlight, hold_fetch_lock
 
-BASE_API_URL: str = 'https://pokeapi.co/api/v2'
+_fetches_in_flight = SingleFlight()
 
 
 def retrieve_pokemon_abilities(pokemon_name: str) -> Union['QuerySet[Ability]', Sequence[Ability]]:
@@ -24,33 +30,171 @@ def retrieve_pokemon_abilities(pokemon_name: str) -> Union['QuerySet[Ability]',
 
 def retrieve_pokemon_from_api(pokemon_name: str) -> dict:
     """Get Pokemon json data from external API"""
-    pokemon_detail_path = f'{BASE_API_URL}/pokemon/{pokemon_name}/'
-    response = requests.get(pokemon_detail_path)
-    if response.status_code == 404:
-        raise PokemonDoesNotExist
-    return response.json()
+    pokemon_detail_path = f"{pokeapi_setting('BASE_URL')}/pokemon/{pokemon_name}/"
+    try:
+        return fetch_json(pokemon_detail_path)
+    except requests.HTTPError as error:
+        if error.response.status_code == 404:
+            raise PokemonDoesNotExist
+        raise
+
+
+def fetch_json(url: str) -> dict:
+    """
+    Returns the json body of an api resource, looking it up in the response cache before calling the api.
+    Concurrent misses of the same url share a single api call, within the process through single flight and across
+    the workers of a node through the fetch lock. Only successful responses are cached, requests.HTTPError is raised
+    for the others.
+    """
+    data = get_response_cache().get(url)
+    if data is None:
+        data = _fetches_in_flight.do(url, lambda: _fetch_json_from_api(url))
+    return data
+
+
+def _fetch_json_from_api(url: str) -> dict:
+    cache = get_response_cache()
+    with hold_fetch_lock(url) as locked:
+        # Another worker may have fetched it while this one was waiting for the lock.
+        data = cache.get(url) if locked else None
+        if data is None:
+            response = get_client().get(url)
+            response.raise_for_status()
+            data = response.json()
+            cache.set(url, data)
+    return data
 
 
 def create_abilities_from_json_data(json_data: dict) -> Sequence[Ability]:
-    return [create_ability_from_json(entry) for entry in json_data['abilities']]
+    abilities_by_url = resolve_abilities(json_data['abilities'])
+    return [abilities_by_url[entry['ability']['url']] for entry in json_data['abilities']]
+
+
+def resolve_abilities(ability_entries: Sequence[dict]) -> Dict[str, Ability]:
+    """
+    Returns the Ability of every entry keyed by its detail url, looking all of them up in the db with one query using
+    the ids found in their urls. Only the missing ones are fetched from the api, concurrently and once per url, then
+    they are inserted with one query.
+    """
+    ability_ids_by_url = {entry['ability']['url']: get_ability_id(entry) for entry in ability_entries}
+    abilities_by_id = Ability.objects.in_bulk([ability_id for ability_id in ability_ids_by_url.values() if ability_id])
+
+    missing_entries = {entry['ability']['url']: entry for entry in ability_entries
+                       if ability_ids_by_url[entry['ability']['url']] not in abilities_by_id}
+    if missing_entries:
+        abilities_json = fetch_abilities_from_api(list(missing_entries.values()))
+        new_abilities = [Ability(**ability_data_from_json(ability_json)) for ability_json in abilities_json]
+        # Abilities inserted concurrently by other requests are skipped, their primary key is the api id anyway.
+        Ability.objects.bulk_create(new_abilities, ignore_conflicts=True)
+        for url, ability in zip(missing_entries, new_abilities):
+            ability_ids_by_url[url] = ability.pk
+            abilities_by_id[ability.pk] = ability
+
+    return {url: abilities_by_id[ability_id] for url, ability_id in ability_ids_by_url.items()}
+
+
+def get_ability_id(ability_entry: dict) -> Optional[int]:
+    """Extracts the ability id from the detail url of the entry, e.g. 65 from https://pokeapi.co/api/v2/ability/65/"""
+    last_segment = ability_entry['ability']['url'].rstrip('/').rsplit('/', 1)[-1]
+    return int(last_segment) if last_segment.isdigit() else None
 
 
-def create_ability_from_json(ability_entry: dict) -> Ability:
+def ability_data_from_json(ability_json: dict) -> Dict[str, Any]:
     """
-    Extracts ability detail url from json entry to get it from api using that url.
-    Then it creates Ability object using the info returned by the api call.
+    Extracts Ability fields from the ability detail json, using the english effect entry when there is one.
+    Effects are cut to the length of their fields, as some of them are longer in the api.
     """
-    ability_json = get_ability_from_api(ability_entry)
-    ability_data = {
-        'effect': ability_json['effect_entries'][0]['effect'],
-        'short_effect': ability_json['effect_entries'][0]['short_effect'],
-        'name': ability_json['name']
+    effect_entries = ability_json['effect_entries']
+    effect_entry = next(
+        (entry for entry in effect_entries if entry.get('language', {}).get('name') == 'en'),
+        effect_entries[0] if effect_entries else {})
+    return {
+        'api_obj_id': ability_json['id'],
+        'name': ability_json['name'],
+        'effect': effect_entry.get('effect', '')[:Ability._meta.get_field('effect').max_length],
+        'short_effect': effect_entry.get('short_effect', '')[:Ability._meta.get_field('short_effect').max_length],
     }
-    return Ability.objects.get_or_create(api_obj_id=ability_json['id'], defaults=ability_data)[0]
+
+
+def upsert_abilities(abilities: Sequence[Ability]) -> None:
+    """Inserts the abilities in one query, updating the ones that already exist"""
+    Ability.objects.bulk_create(
+        abilities,
+        update_conflicts=True,
+        unique_fields=['api_obj_id'],
+        update_fields=['name', 'effect', 'short_effect'])
+    # Abilities are nested in the listed pokemons.
+    CollectionVersion.bump(Pokemon.COLLECTION)
 
 
 def get_ability_from_api(ability_entry: dict) -> dict:
-    return requests.get(ability_entry['ability']['url']).json()
+    return fetch_json(ability_entry['ability']['url'])
+
+
+def fetch_abilities_from_api(ability_entries: Sequence[dict]) -> List[dict]:
+    """Fetches the details of all the given ability entries concurrently, in the same order as the entries"""
+    return fetch_concurrently(get_ability_from_api, ability_entries)
+
+
+def fetch_concurrently(fetch: Callable[[Any], Any], items: Sequence[Any], return_exceptions: bool = False) -> List[Any]:
+    """
+    Calls `fetch` on every item through a bounded thread pool and returns the results in the same order as the items.
+    At most FETCH_CONCURRENCY calls are in flight at once. Items are sent in chunks of FETCH_CHUNK_SIZE, and
+    PokemonAPITimeout is raised if the calls of a chunk are not all done within FETCH_DEADLINE seconds. When
+    `return_exceptions` is set, an exception raised by a call, or PokemonAPITimeout for a call that missed the deadline
+    of its chunk, is returned in place of its result instead of being raised. Only http calls should run in the pool,
+    so its threads never open database connections.
+    """
+    if not items:
+        return []
+
+    max_workers = min(pokeapi_setting('FETCH_CONCURRENCY'), len(items))
+    chunk_size = max(pokeapi_setting('FETCH_CHUNK_SIZE'), 1)
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix='pokeapi-fetch')
+    try:
+        results: List[Any] = []
+        for start in range(0, len(items), chunk_size):
+            # Calls run in the context of the caller, so they are counted in the profile of its request.
+            futures = [executor.submit(contextvars.copy_context().run, fetch, item)
+                       for item in items[start:start + chunk_size]]
+            _, not_done = wait(futures, timeout=pokeapi_setting('FETCH_DEADLINE'))
+            for future in not_done:
+                future.cancel()
+            if not_done and not return_exceptions:
+                raise PokemonAPITimeout
+            if return_exceptions:
+                results.extend(PokemonAPITimeout() if future in not_done else future.exception() or future.result()
+                               for future in futures)
+            else:
+                results.extend(future.result() for future in futures)
+        return results
+    finally:
+        # Requests that are already running can't be interrupted, don't keep the caller waiting for them.
+        executor.shutdown(wait=False)
+
+
+def retrieve_abilities_for_pokemons(pokemon_names: Sequence[str]) -> Dict[str, Union[List[Ability], Exception]]:
+    """
+    Bulk variant of retrieve_pokemon_abilities for pokemons that don't exist in the db yet.
+    The pokemons are fetched concurrently, then the abilities referenced by all of them are resolved at once by
+    resolve_abilities, so each missing ability is fetched only once even when several pokemons share it. Errors of
+    fetching a pokemon, including PokemonAPITimeout when it missed the deadline of its chunk, are returned in place of
+    its abilities, so one invalid or slow pokemon does not fail the others.
+    """
+    pokemons_json = fetch_concurrently(retrieve_pokemon_from_api, pokemon_names, return_exceptions=True)
+
+    ability_entries = [entry for pokemon_json in pokemons_json if not isinstance(pokemon_json, Exception)
+                       for entry in pokemon_json['abilities']]
+    abilities_by_url = resolve_abilities(ability_entries)
+
+    abilities_by_pokemon_name: Dict[str, Union[List[Ability], Exception]] = {}
+    for pokemon_name, pokemon_json in zip(pokemon_names, pokemons_json):
+        if isinstance(pokemon_json, Exception):
+            abilities_by_pokemon_name[pokemon_name] = pokemon_json
+        else:
+            abilities_by_pokemon_name[pokemon_name] = [abilities_by_url[entry['ability']['url']]
+                                                       for entry in pokemon_json['abilities']]
+    return abilities_by_pokemon_name
 
 
 def get_pokemon_available_names() -> Sequence[str]:
@@ -59,6 +203,14 @@ def get_pokemon_available_names() -> Sequence[str]:
     Limit query param is used in request url to get all pokemons at once, setting it to 1000 is because we know how
     many pokemons there are and it won't increase in the future so there is no need to complicate the logic.
     """
-    response = requests.get(f'{BASE_API_URL}/pokemon/?limit=1000')
+    response = get_client().get(f"{pokeapi_setting('BASE_URL')}/pokemon/?limit=1000")
+    response.raise_for_status()
     pokemons_data = response.json()
     return [pokemon['name'] for pokemon in pokemons_data['results']]
+
+
+def retrieve_abilities_page(offset: int, limit: int) -> dict:
+    """Lists a page of abilities, the page holds the total `count`, the `next` page url and the `results` entries"""
+    response = get_client().get(f"{pokeapi_setting('BASE_URL')}/ability/", params={'offset': offset, 'limit': limit})
+    response.raise_for_status()
+    return response.json()
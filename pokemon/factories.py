@@ -14,7 +14,7 @@ class UserFactory(factory.DjangoModelFactory):
 
     first_name = factory.Faker('first_name')
     last_name = factory.Faker('last_name')
-    email = factory.Faker('email')
+    email = factory.Sequence(lambda n: f'user-{n}@example.com')
     username = factory.LazyAttribute(lambda user: user.email)
 
 
@@ -32,7 +32,8 @@ class PokemonFactory(factory.DjangoModelFactory):
     class Meta:
         model = Pokemon
 
-    name = factory.Faker('word')
+    # Names are unique, faker words repeat.
+    name = factory.Sequence(lambda n: f'pokemon-{n}')
     description = factory.Faker('paragraph')
     weight = round(random.uniform(1, 150), 1)
     creator = factory.SubFactory(UserFactory)
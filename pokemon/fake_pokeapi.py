@@ -0,0 +1,169 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+ABILITIES_PER_POKEMON = 2
+
+
+class _ThreadingHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 connections would make concurrent clients wait for SYN retransmissions.
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FakePokeAPI:
+    """
+    Local stand-in for PokeAPI, serving generated pokemons and abilities from a background thread.
+    Every response is delayed by `latency` seconds, to reproduce the cost of the real api in benchmarks, and a random
+    `error_rate` fraction of the requests is answered with a 503 to exercise retries and error handling.
+    Usage:
+        with FakePokeAPI(pokemons_count=100, latency=0.05) as fake_api:
+            with override_settings(POKEAPI={'BASE_URL': fake_api.base_url}):
+                ...
+    """
+
+    def __init__(self, pokemons_count: int = 100, abilities_count: int = 50, latency: float = 0,
+                 error_rate: float = 0, seed: int = 0, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.pokemons_count = pokemons_count
+        self.abilities_count = abilities_count
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.requests_count = 0
+        self.errors_count = 0
+        self._requests_count_lock = threading.Lock()
+        self.server = _ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/v2'
+
+    @staticmethod
+    def pokemon_name(index: int) -> str:
+        return f'fake-pokemon-{index}'
+
+    def get_pokemon_names(self) -> List[str]:
+        return [self.pokemon_name(index) for index in range(self.pokemons_count)]
+
+    def start(self) -> 'FakePokeAPI':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-pokeapi', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakePokeAPI':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def get_response(self, path: str, query: Dict[str, List[str]]) -> Optional[dict]:
+        """Returns the json body served at `path`, or None for a 404"""
+        match = re.fullmatch(r'/api/v2/pokemon/([\w-]+)/', path)
+        if match:
+            return self._pokemon_json(match.group(1))
+        match = re.fullmatch(r'/api/v2/ability/(\d+)/', path)
+        if match:
+            return self._ability_json(int(match.group(1)))
+        if path == '/api/v2/pokemon/':
+            limit = int(query.get('limit', ['20'])[0])
+            names = self.get_pokemon_names()[:limit]
+            return {'count': self.pokemons_count, 'results': [{'name': name} for name in names]}
+        if path == '/api/v2/ability/':
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['20'])[0])
+            ids = range(offset + 1, min(offset + limit, self.abilities_count) + 1)
+            next_url = None
+            if offset + limit < self.abilities_count:
+                next_url = f'{self.base_url}/ability/?offset={offset + limit}&limit={limit}'
+            return {
+                'count': self.abilities_count,
+                'next': next_url,
+                'results': [{'name': f'fake-ability-{ability_id}', 'url': self._ability_url(ability_id)}
+                            for ability_id in ids],
+            }
+        return None
+
+    def _pokemon_json(self, name: str) -> Optional[dict]:
+        match = re.fullmatch(r'fake-pokemon-(\d+)', name)
+        if match is None or int(match.group(1)) >= self.pokemons_count:
+            return None
+        index = int(match.group(1))
+        ability_ids = [(index * ABILITIES_PER_POKEMON + offset) % self.abilities_count + 1
+                       for offset in range(ABILITIES_PER_POKEMON)]
+        return {
+            'name': name,
+            'abilities': [{'ability': {'name': f'fake-ability-{ability_id}', 'url': self._ability_url(ability_id)}}
+                          for ability_id in ability_ids],
+        }
+
+    def _ability_json(self, ability_id: int) -> Optional[dict]:
+        if not 1 <= ability_id <= self.abilities_count:
+            return None
+        return {
+            'id': ability_id,
+            'name': f'fake-ability-{ability_id}',
+            'effect_entries': [{
+                'effect': f'Effect of fake ability {ability_id}',
+                'short_effect': f'Fake ability {ability_id}',
+                'language': {'name': 'en'},
+            }],
+        }
+
+    def _ability_url(self, ability_id: int) -> str:
+        return f'{self.base_url}/ability/{ability_id}/'
+
+    def _record_request(self) -> bool:
+        """Counts the request and returns whether it must fail"""
+        with self._requests_count_lock:
+            self.requests_count += 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors_count += 1
+            return fail
+
+    def _make_handler(self) -> type:
+        fake_api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections alive, so clients can reuse their pooled connections, headers and body are
+            # written separately so Nagle's algorithm would delay the body of every reused connection.
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                fail = fake_api._record_request()
+                if fake_api.latency:
+                    time.sleep(fake_api.latency)
+                if fail:
+                    self._send(503, {'detail': 'Injected error.'})
+                    return
+                url = urlsplit(self.path)
+                data = fake_api.get_response(url.path, parse_qs(url.query))
+                if data is None:
+                    self._send(404, {'detail': 'Not found.'})
+                else:
+                    self._send(200, data)
+
+            def _send(self, status: int, data: dict) -> None:
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
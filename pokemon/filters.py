@@ -0,0 +1,19 @@
+from typing import Any
+
+from django.db.models import QuerySet
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+
+
+class QueryParamsFilterBackend(BaseFilterBackend):
+    """
+    Filters the queryset by the query params that are validated by the view's `filter_serializer_class`.
+    Each validated param is applied as the field lookup it is mapped to by the view's `filter_lookups`, the params
+    that are not sent are not applied at all.
+    """
+
+    def filter_queryset(self, request: Request, queryset: QuerySet, view: Any) -> QuerySet:
+        serializer = view.filter_serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        lookups = {view.filter_lookups[param]: value for param, value in serializer.validated_data.items()}
+        return queryset.filter(**lookups)
@@ -0,0 +1,133 @@
+import json
+import platform
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test import override_settings
+from django.urls import reverse
+
+from pokemon.benchmarks import ThreadClients, fake_pokeapi_settings, measure, seed_database, throwaway_database, \
+    unthrottled_rest_framework_settings
+from pokemon.fake_pokeapi import FakePokeAPI
+from pokemon.models import Pokemon
+from pokemon.names import pokemon_names
+
+User = get_user_model()
+
+SCENARIOS = ('create', 'list', 'list_filtered', 'update', 'login', 'digimon_list')
+
+
+class Command(BaseCommand):
+    help = ('Measures the latency percentiles and throughput of the main endpoints against a local fake PokeAPI and '
+            'a throwaway seeded database, and outputs them as json to track regressions between releases')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f'Comma separated scenarios to run, out of {", ".join(SCENARIOS)}')
+        parser.add_argument('--requests', type=int, default=200, help='Number of requests sent per scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of threads sending the requests')
+        parser.add_argument('--pokemons', type=int, default=1000, help='Number of pokemons seeded before running')
+        parser.add_argument('--abilities', type=int, default=100, help='Number of abilities seeded before running')
+        parser.add_argument('--digimons', type=int, default=1000, help='Number of digimons seeded before running')
+        parser.add_argument('--latency', type=float, default=0.02,
+                            help='Seconds the fake PokeAPI waits before each response')
+        parser.add_argument('--error-rate', type=float, default=0,
+                            help='Fraction of the fake PokeAPI responses that are 503 errors')
+        parser.add_argument('--output', help='File to write the results to, defaults to stdout')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        scenarios = [scenario for scenario in options['scenarios'].split(',') if scenario]
+        unknown_scenarios = set(scenarios) - set(SCENARIOS)
+        if unknown_scenarios:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown_scenarios))}')
+        if options['pokemons'] < 1 or options['abilities'] < 1:
+            raise CommandError('At least one pokemon and one ability must be seeded')
+
+        with throwaway_database():
+            results = self.run_scenarios(scenarios, options)
+
+        output = json.dumps(results, indent=2)
+        if options['output'] is None:
+            self.stdout.write(output)
+            return
+        with open(options['output'], 'w') as output_file:
+            output_file.write(output + '\n')
+
+    def run_scenarios(self, scenarios: list, options: Dict[str, Any]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {
+            'meta': {
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'config': {key: options[key] for key in
+                       ('requests', 'concurrency', 'pokemons', 'abilities', 'digimons', 'latency', 'error_rate')},
+            'scenarios': {},
+        }
+        fake_api = FakePokeAPI(pokemons_count=options['requests'], abilities_count=options['abilities'],
+                               latency=options['latency'], error_rate=options['error_rate'])
+        with fake_api, override_settings(POKEAPI=fake_pokeapi_settings(fake_api),
+                                            REST_FRAMEWORK=unthrottled_rest_framework_settings()):
+            pokemon_names.set_names(fake_api.get_pokemon_names())
+            creator = User.objects.create_user(username='bench@example.com', email='bench@example.com',
+                                               password='bench-password')
+            seed_database(options['pokemons'], options['abilities'], options['digimons'], creator)
+
+            for scenario in scenarios:
+                send_request = getattr(self, f'{scenario}_scenario')(creator, options)
+                results['scenarios'][scenario] = measure(
+                    send_request, count=options['requests'], concurrency=options['concurrency'])
+                self.stderr.write(f'{scenario}: {results["scenarios"][scenario]["throughput"]} requests/s')
+            results['fake_api'] = {'requests': fake_api.requests_count, 'errors': fake_api.errors_count}
+        return results
+
+    @staticmethod
+    def create_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        """Creates a new pokemon per request, fetching it from the fake api"""
+        path = reverse('pokemon-list')
+        clients = ThreadClients(creator)
+        names = pokemon_names.get_names()
+        return lambda number: clients.get().post(
+            path, {'name': names[number], 'description': 'Benchmark', 'weight': 10}).status_code
+
+    @staticmethod
+    def list_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        """Lists the first page of pokemons, which is served from the page cache after the first request"""
+        path = reverse('pokemon-list')
+        clients = ThreadClients()
+        return lambda number: clients.get().get(path).status_code
+
+    @staticmethod
+    def list_filtered_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        """Lists pokemons with a different filter per request, so every page is serialized"""
+        path = reverse('pokemon-list')
+        clients = ThreadClients()
+        return lambda number: clients.get().get(path, {'name_prefix': f'seed-pokemon-{number}'}).status_code
+
+    @staticmethod
+    def update_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        """Updates the weight of the seeded pokemons, as their creator"""
+        pokemon_ids = list(Pokemon.objects.filter(creator=creator).values_list('pk', flat=True))
+        clients = ThreadClients(creator)
+
+        def update(number: int) -> int:
+            path = reverse('pokemon-detail', kwargs={'pk': pokemon_ids[number % len(pokemon_ids)]})
+            return clients.get().patch(path, {'weight': number % 100 + 1}, content_type='application/json').status_code
+
+        return update
+
+    @staticmethod
+    def login_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        path = reverse('auth-login')
+        clients = ThreadClients()
+        data = {'email': 'bench@example.com', 'password': 'bench-password'}
+        return lambda number: clients.get().post(path, data).status_code
+
+    @staticmethod
+    def digimon_list_scenario(creator: User, options: Dict[str, Any]) -> Callable[[int], int]:
+        path = reverse('digimon-list')
+        clients = ThreadClients()
+        return lambda number: clients.get().get(path).status_code
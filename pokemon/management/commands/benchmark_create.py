@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from pokemon.benchmarks import ThreadClients, fake_pokeapi_settings, measure, summarize, throwaway_database, \
+    unthrottled_rest_framework_settings
+from pokemon.fake_pokeapi import FakePokeAPI
+from pokemon.models import Ability, Pokemon
+from pokemon.names import pokemon_names
+from pokemon.response_cache import get_response_cache
+
+
+class Command(BaseCommand):
+    help = ('Compares creating pokemons through the sync view, driven by threads of in-process test clients, with the '
+            'async view, driven by concurrent in-process AsyncClient requests, against a local fake PokeAPI and a '
+            'throwaway database. No server is started, so it measures the views and not gunicorn or uvicorn workers. '
+            'Prints the results as json')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--requests', type=int, default=200, help='Number of pokemons created per run')
+        parser.add_argument('--sync-threads', type=int, default=8,
+                            help='Number of threads sending requests to the sync view through test clients')
+        parser.add_argument('--async-concurrency', type=int, default=200,
+                            help='Number of AsyncClient requests kept in flight at once against the async view')
+        parser.add_argument('--latency', type=float, default=0.05,
+                            help='Seconds the fake PokeAPI waits before each response')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with throwaway_database():
+            results = self.run_benchmarks(options)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_benchmarks(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        requests_count = options['requests']
+        with FakePokeAPI(pokemons_count=requests_count, latency=options['latency']) as fake_api, \
+                override_settings(POKEAPI=fake_pokeapi_settings(fake_api),
+                                  REST_FRAMEWORK=unthrottled_rest_framework_settings()):
+            pokemon_names.set_names(fake_api.get_pokemon_names())
+            user = User.objects.create_user(username='benchmark', password='benchmark')
+            results = {'config': {key: options[key] for key in
+                                  ('requests', 'sync_threads', 'async_concurrency', 'latency')}}
+            for name, run in (('sync', self.run_sync), ('async', self.run_async)):
+                Pokemon.objects.all().delete()
+                Ability.objects.all().delete()
+                get_response_cache().clear()
+                upstream_requests_before = fake_api.requests_count
+                results[name] = run(user, fake_api.get_pokemon_names(), options)
+                results[name]['upstream_requests'] = fake_api.requests_count - upstream_requests_before
+        return results
+
+    @staticmethod
+    def run_sync(user: User, names: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+        path = reverse('pokemon-list')
+        clients = ThreadClients(user)
+
+        def create(number: int) -> int:
+            data = {'name': names[number], 'description': 'Benchmark', 'weight': 10}
+            return clients.get().post(path, data).status_code
+
+        return measure(create, count=len(names), concurrency=options['sync_threads'])
+
+    @staticmethod
+    def run_async(user: User, names: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+        path = reverse('async-pokemon-list')
+
+        async def create_all() -> List[Any]:
+            client = AsyncClient()
+            await client.aforce_login(user)
+            semaphore = asyncio.Semaphore(options['async_concurrency'])
+
+            async def create(name: str) -> Any:
+                async with semaphore:
+                    started_at = time.perf_counter()
+                    response = await client.post(
+                        path, {'name': name, 'description': 'Benchmark', 'weight': 10}, content_type='application/json')
+                    return response, time.perf_counter() - started_at
+
+            return await asyncio.gather(*[create(name) for name in names])
+
+        started_at = time.perf_counter()
+        outcomes = asyncio.run(create_all())
+        duration = time.perf_counter() - started_at
+        return summarize([response.status_code for response, _ in outcomes], [latency for _, latency in outcomes],
+                         duration)
@@ -0,0 +1,24 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pokemon.export import EXPORT_CHUNK_SIZE, iter_pokemons_ndjson
+from pokemon.models import Pokemon
+
+
+class Command(BaseCommand):
+    help = 'Exports all pokemons with their abilities as newline delimited json'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--output', help='File to write to, defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Number of pokemons read from the database at once')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        lines = iter_pokemons_ndjson(Pokemon.objects.all(), chunk_size=options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w') as output:
+            output.writelines(lines)
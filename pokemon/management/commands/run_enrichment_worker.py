@@ -0,0 +1,29 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pokemon.conf import pokeapi_setting
+from pokemon.enrichment import EnrichmentWorker
+
+
+class Command(BaseCommand):
+    help = 'Fetches the abilities of the pokemons created in async enrichment mode, see POKEAPI ASYNC_ENRICHMENT'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--workers', type=int, default=pokeapi_setting('ENRICHMENT_WORKERS'),
+                            help='Number of jobs run concurrently')
+        parser.add_argument('--poll-interval', type=float, default=1,
+                            help='Seconds waited between checks for new jobs while the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due now, then exit')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        worker = EnrichmentWorker(workers=options['workers'])
+        if options['once']:
+            run_count = worker.run_once()
+            self.stdout.write(self.style.SUCCESS(f'Ran {run_count} enrichment jobs'))
+            return
+        self.stdout.write(f'Running enrichment jobs with {options["workers"]} workers, press CTRL-C to stop')
+        try:
+            worker.run_forever(poll_interval=options['poll_interval'])
+        except KeyboardInterrupt:
+            worker.stop()
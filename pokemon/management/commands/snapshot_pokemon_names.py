@@ -0,0 +1,17 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pokemon.conf import pokeapi_setting
+from pokemon.names import pokemon_names
+
+
+class Command(BaseCommand):
+    help = 'Fetches the available pokemon names from the external api and writes them to the names snapshot file'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = pokeapi_setting('NAMES_SNAPSHOT_PATH')
+        if path is None:
+            raise CommandError("POKEAPI['NAMES_SNAPSHOT_PATH'] is not set")
+        pokemon_names.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(pokemon_names.get_names())} pokemon names to {path}'))
@@ -0,0 +1,63 @@
+import json
+import os
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pokemon.external_pokemon_api import ability_data_from_json, fetch_abilities_from_api, retrieve_abilities_page, \
+    upsert_abilities
+from pokemon.models import Ability
+
+
+class Command(BaseCommand):
+    help = ('Loads all the abilities of the external api into the database, so creating pokemons does not need to '
+            'fetch them anymore')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--page-size', type=int, default=100, help='Number of abilities synced at once')
+        parser.add_argument('--checkpoint',
+                            help='File that keeps the sync progress, an interrupted sync resumes from it')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Fetch the abilities and report what would change without writing anything')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        checkpoint, dry_run = options['checkpoint'], options['dry_run']
+        offset = self.read_checkpoint(checkpoint)
+        new_count = updated_count = 0
+
+        while True:
+            page = retrieve_abilities_page(offset=offset, limit=options['page_size'])
+            abilities_json = fetch_abilities_from_api([{'ability': entry} for entry in page['results']])
+            abilities = [Ability(**ability_data_from_json(ability_json)) for ability_json in abilities_json]
+
+            existing_count = Ability.objects.filter(api_obj_id__in=[ability.pk for ability in abilities]).count()
+            new_count += len(abilities) - existing_count
+            updated_count += existing_count
+            if not dry_run:
+                upsert_abilities(abilities)
+
+            offset += len(page['results'])
+            if not dry_run:
+                self.write_checkpoint(checkpoint, offset)
+            self.stdout.write(f'Synced {offset}/{page["count"]} abilities')
+            if not page['next'] or not page['results']:
+                break
+
+        if not dry_run and checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        prefix = 'Dry run: would have created' if dry_run else 'Created'
+        self.stdout.write(self.style.SUCCESS(f'{prefix} {new_count} abilities and updated {updated_count}'))
+
+    @staticmethod
+    def read_checkpoint(checkpoint: Optional[str]) -> int:
+        if checkpoint is None or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as checkpoint_file:
+            return json.load(checkpoint_file)['offset']
+
+    @staticmethod
+    def write_checkpoint(checkpoint: Optional[str], offset: int) -> None:
+        if checkpoint is None:
+            return
+        with open(checkpoint, 'w') as checkpoint_file:
+            json.dump({'offset': offset}, checkpoint_file)
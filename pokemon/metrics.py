@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+# Timings measured while handling a request, as (count, seconds) per kind of work.
+DB, POKEAPI, SERIALIZATION = 'db', 'pokeapi', 'serialization'
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+
+class RequestProfile:
+    """
+    Counts and sums up the durations of the db queries, api calls and serialization of a request.
+    Work done by pool threads on behalf of the request is added concurrently, so durations are totals and may exceed
+    the duration of the request.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, List[float]] = {DB: [0, 0.0], POKEAPI: [0, 0.0], SERIALIZATION: [0, 0.0]}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, duration: float) -> None:
+        with self._lock:
+            timing = self.timings[kind]
+            timing[0] += 1
+            timing[1] += duration
+
+    def get_server_timing(self, duration: float) -> str:
+        """Formats the profile as a Server-Timing header value, durations are in milliseconds"""
+        db_count, db_duration = self.timings[DB]
+        api_count, api_duration = self.timings[POKEAPI]
+        return ', '.join([
+            f'db;dur={db_duration * 1000:.1f};desc="{db_count} queries"',
+            f'pokeapi;dur={api_duration * 1000:.1f};desc="{api_count} calls"',
+            f'serialization;dur={self.timings[SERIALIZATION][1] * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ])
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+
+
+@contextmanager
+def record_timing(kind: str) -> Iterator[None]:
+    """Adds the duration of the block to the profile of the current request, if it is being profiled"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(kind, time.perf_counter() - started_at)
+
+
+def record_query(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """Database execute wrapper timing the queries of profiled requests"""
+    with record_timing(DB):
+        return execute(sql, params, many, context)
+
+
+def install_query_recorder(connection: Any, **kwargs: Any) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    """Prometheus style histogram of observations, with cumulative bucket counts per set of label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label values, the observation count of each bucket, then the sum and count of all the observations.
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            bucket_counts, totals = self._series.setdefault(label_values, ([0] * len(self.buckets), [0.0, 0]))
+            bucket_index = bisect.bisect_left(self.buckets, value)
+            if bucket_index < len(self.buckets):
+                bucket_counts[bucket_index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(label_values, list(bucket_counts), list(totals))
+                      for label_values, (bucket_counts, totals) in sorted(self._series.items())]
+        for label_values, bucket_counts, (total, count) in series:
+            labels = ','.join(f'{name}="{escape_label_value(value)}"'
+                              for name, value in zip(self.label_names, label_values))
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{upper_bound}"}} {cumulative_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {int(count)}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {int(count)}')
+        return lines
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+LABEL_NAMES = ('view', 'method')
+
+request_duration = Histogram(
+    'pokemon_world_request_duration_seconds', 'Duration of the requests.', LABEL_NAMES, DURATION_BUCKETS)
+db_queries = Histogram(
+    'pokemon_world_request_db_queries', 'Number of db queries per request.', LABEL_NAMES, COUNT_BUCKETS)
+db_duration = Histogram(
+    'pokemon_world_request_db_duration_seconds', 'Time spent in db queries per request.', LABEL_NAMES,
+    DURATION_BUCKETS)
+pokeapi_calls = Histogram(
+    'pokemon_world_request_pokeapi_calls', 'Number of PokeAPI calls per request.', LABEL_NAMES, COUNT_BUCKETS)
+pokeapi_duration = Histogram(
+    'pokemon_world_request_pokeapi_duration_seconds', 'Time spent in PokeAPI calls per request.', LABEL_NAMES,
+    DURATION_BUCKETS)
+serialization_duration = Histogram(
+    'pokemon_world_request_serialization_duration_seconds', 'Time spent serializing and rendering per request.',
+    LABEL_NAMES, DURATION_BUCKETS)
+
+HISTOGRAMS = (request_duration, db_queries, db_duration, pokeapi_calls, pokeapi_duration, serialization_duration)
+
+
+def observe_request(request: HttpRequest, profile: RequestProfile, duration: float) -> None:
+    """Adds the profile of a request to the histograms, labelled by view name and method to keep their number bounded"""
+    resolver_match = getattr(request, 'resolver_match', None)
+    label_values = (resolver_match.view_name if resolver_match else 'unmatched',
+                    request.method if request.method in METHODS else 'other')
+    request_duration.observe(label_values, duration)
+    db_queries.observe(label_values, profile.timings[DB][0])
+    db_duration.observe(label_values, profile.timings[DB][1])
+    pokeapi_calls.observe(label_values, profile.timings[POKEAPI][0])
+    pokeapi_duration.observe(label_values, profile.timings[POKEAPI][1])
+    serialization_duration.observe(label_values, profile.timings[SERIALIZATION][1])
+
+
+def render_metrics() -> str:
+    """Renders the histograms in the Prometheus text exposition format"""
+    return '\n'.join(line for histogram in HISTOGRAMS for line in histogram.render()) + '\n'
+
+
+class ProfilingMiddleware:
+    """
+    Profiles every request when REQUEST_PROFILING is enabled: its db queries, PokeAPI calls and serialization are
+    timed, sent back in a Server-Timing header and added to the in-process histograms served by /internal/metrics.
+    It should come first in MIDDLEWARE so the total covers the other middlewares, and it is skipped entirely when
+    profiling is disabled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections are per thread, the ones opened later get the recorder when they are created.
+        connection_created.connect(install_query_recorder, dispatch_uid='pokemon.metrics.install_query_recorder')
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    def process_template_response(self, request: HttpRequest, response: SimpleTemplateResponse) -> Any:
+        """Times the rendering of DRF responses, which happens right after this hook"""
+        profile = _current_profile.get()
+        if profile is not None:
+            render_started_at = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: profile.add(SERIALIZATION, time.perf_counter() - render_started_at))
+        return response
+
+    @staticmethod
+    def finish(request: HttpRequest, response: HttpResponse, profile: RequestProfile) -> HttpResponse:
+        duration = time.perf_counter() - profile.started_at
+        response['Server-Timing'] = profile.get_server_timing(duration)
+        observe_request(request, profile, duration)
+        return response
+
+
+class ProfiledSerializerMixin:
+    """Adds the time spent converting instances to primitives to the serialization timing of the request"""
+
+    def to_representation(self, instance: Any) -> Any:
+        # Called once per listed item, so the profile is looked up directly rather than through record_timing.
+        profile = _current_profile.get()
+        if profile is None:
+            return super().to_representation(instance)
+        started_at = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            profile.add(SERIALIZATION, time.perf_counter() - started_at)
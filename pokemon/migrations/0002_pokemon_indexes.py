@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokemon', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pokemon',
+            name='name',
+            field=models.CharField(db_index=True, max_length=75),
+        ),
+        migrations.AlterField(
+            model_name='pokemon',
+            name='weight',
+            field=models.DecimalField(db_index=True, decimal_places=1, max_digits=4),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokemon', '0003_pokemon_unique_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='abilities_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=7),
+        ),
+        migrations.CreateModel(
+            name='EnrichmentJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=7)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=64)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('pokemon', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='enrichment_job', to='pokemon.pokemon')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='pokemon_enr_status_0020ce_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_pokemons_version(apps, schema_editor):
+    apps.get_model('pokemon', 'CollectionVersion').objects.get_or_create(name='pokemons')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokemon', '0004_pokemon_enrichment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('bumped_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(create_pokemons_version, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,45 @@
+from typing import Any
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
 User = get_user_model()
 
 
+class CollectionVersion(models.Model):
+    """
+    Version of a collection of objects, e.g. all pokemons, bumped on every write to the collection.
+    It identifies the current state of the collection in ETags and cached list pages. Writes that bypass
+    Model.save(), like bulk_create and QuerySet.update, have to bump the version themselves.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    bumped_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def get_token(cls, name: str) -> str:
+        """
+        Returns a token identifying the current version of the collection.
+        The bump time is part of the token, so versions rolled back with a transaction or a restored backup don't
+        reuse the token of the version they replaced.
+        """
+        row = cls.objects.filter(name=name).values_list('version', 'bumped_at').first()
+        if row is None:
+            return '0'
+        version, bumped_at = row
+        return f'{version}.{int(bumped_at.timestamp() * 1000000):x}'
+
+    @classmethod
+    def bump(cls, name: str) -> None:
+        now = timezone.now()
+        if not cls.objects.filter(name=name).update(version=F('version') + 1, bumped_at=now):
+            cls.objects.bulk_create([cls(name=name, version=1, bumped_at=now)], ignore_conflicts=True)
+
+
 class Ability(models.Model):
     """
     Represents a Pokemon ability.
@@ -20,9 +56,54 @@ class Ability(models.Model):
 
 
 class Pokemon(models.Model):
+    COLLECTION = 'pokemons'
+
+    ABILITIES_PENDING = 'pending'
+    ABILITIES_READY = 'ready'
+    ABILITIES_FAILED = 'failed'
+    ABILITIES_STATUS_CHOICES = (
+        (ABILITIES_PENDING, 'Pending'),
+        (ABILITIES_READY, 'Ready'),
+        (ABILITIES_FAILED, 'Failed'),
+    )
+
     creator = models.ForeignKey(User, related_name='created_pokemons', on_delete=models.SET_NULL, null=True)
 
-    name = models.CharField(max_length=75)
+    name = models.CharField(max_length=75, unique=True)
     description = models.CharField(max_length=250)
-    weight = models.DecimalField(max_digits=4, decimal_places=1)
+    weight = models.DecimalField(max_digits=4, decimal_places=1, db_index=True)
     abilities = models.ManyToManyField(Ability, related_name='pokemons')
+    abilities_status = models.CharField(max_length=7, choices=ABILITIES_STATUS_CHOICES, default=ABILITIES_READY)
+
+
+@receiver([post_save, post_delete], sender=Pokemon)
+def bump_pokemons_version(**kwargs: Any) -> None:
+    CollectionVersion.bump(Pokemon.COLLECTION)
+
+
+class EnrichmentJob(models.Model):
+    """
+    Queued fetch of the abilities of a pokemon created in async enrichment mode, run by `manage.py
+    run_enrichment_worker`. Jobs are deleted once they succeed, failed ones are kept for inspection.
+    locked_by and locked_at identify the worker running the job, a running job whose lock is older than
+    ENRICHMENT_LEASE seconds is considered abandoned and can be claimed again.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    )
+
+    pokemon = models.OneToOneField(Pokemon, related_name='enrichment_job', on_delete=models.CASCADE)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
@@ -0,0 +1,156 @@
+import bisect
+import difflib
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import requests
+
+from pokemon.conf import pokeapi_setting
+from pokemon.exceptions import PokemonAPIRateLimited, PokemonNamesTimeout, PokemonNamesUnavailable
+from pokemon.external_pokemon_api import get_pokemon_available_names
+from pokemon.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class PokemonNameIndex:
+    """
+    Immutable index over a list of pokemon names.
+    Membership checks use a frozenset, prefix searches bisect a sorted copy of the names and fuzzy searches fall back
+    to difflib's close matches.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self._names_set = frozenset(self.names)
+        self._sorted_names: Tuple[str, ...] = tuple(sorted(self._names_set))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names_set
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search_prefix(self, prefix: str, limit: int) -> List[str]:
+        """Returns up to `limit` names starting with `prefix` in alphabetical order"""
+        matches = []
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        for name in self._sorted_names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+        return matches
+
+    def search_fuzzy(self, query: str, limit: int) -> List[str]:
+        """Returns up to `limit` names that are the closest to `query`, best matches first"""
+        return difflib.get_close_matches(query, self._sorted_names, n=limit)
+
+
+class PokemonNameRegistry:
+    """
+    Names of all the pokemons available in the external api, loaded lazily on first access instead of at startup.
+    They are read from the snapshot file at NAMES_SNAPSHOT_PATH, falling back to the api only when there is no
+    snapshot yet, in which case concurrent first accesses share a single api call and PokemonNamesUnavailable is raised
+    when it fails. Once loaded, a background thread refreshes them from the api every NAMES_REFRESH_INTERVAL seconds
+    and rewrites the snapshot, so later restarts start from fresh names without any network call.
+    """
+
+    def __init__(self) -> None:
+        self._index: Optional[PokemonNameIndex] = None
+        # Incremented whenever the names are replaced, so that data derived from them can be cached per version.
+        self.version = 0
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_refreshing = threading.Event()
+
+    @property
+    def index(self) -> PokemonNameIndex:
+        if self._index is None:
+            self._load()
+        return self._index
+
+    def get_names(self) -> Sequence[str]:
+        return self.index.names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Autocompletes `prefix`, falling back to fuzzy matches when no name starts with it"""
+        return self.index.search_prefix(prefix, limit) or self.index.search_fuzzy(prefix, limit)
+
+    def set_names(self, names: Sequence[str]) -> None:
+        index = PokemonNameIndex(names)
+        with self._lock:
+            self._index = index
+            self.version += 1
+
+    def refresh(self) -> None:
+        """Fetches the names from the api, then replaces the current names and the snapshot with them"""
+        names = get_pokemon_available_names()
+        self.set_names(names)
+        self._write_snapshot(names)
+
+    def stop_refreshing(self) -> None:
+        self._stop_refreshing.set()
+
+    def _load(self) -> None:
+        self._loads.do('names', self._load_once)
+
+    def _load_once(self) -> None:
+        if self._index is not None:
+            return
+        names = self._read_snapshot()
+        if names is None:
+            try:
+                self.refresh()
+            except requests.Timeout as error:
+                raise PokemonNamesTimeout from error
+            except requests.RequestException as error:
+                raise PokemonNamesUnavailable from error
+            except PokemonAPIRateLimited as error:
+                raise PokemonNamesUnavailable(wait=error.retry_after) from error
+        else:
+            self.set_names(names)
+        self._start_refresher()
+
+    def _start_refresher(self) -> None:
+        interval = pokeapi_setting('NAMES_REFRESH_INTERVAL')
+        if interval is None or self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_periodically, args=(interval,), name='pokemon-names-refresher', daemon=True)
+        self._refresher.start()
+
+    def _refresh_periodically(self, interval: float) -> None:
+        while not self._stop_refreshing.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Refreshing pokemon names failed, keeping the current ones')
+
+    @staticmethod
+    def _read_snapshot() -> Optional[List[str]]:
+        path = pokeapi_setting('NAMES_SNAPSHOT_PATH')
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as snapshot:
+            return json.load(snapshot)
+
+    @staticmethod
+    def _write_snapshot(names: Sequence[str]) -> None:
+        path = pokeapi_setting('NAMES_SNAPSHOT_PATH')
+        if path is None:
+            return
+        # Write to a temporary file first, so other workers never read a partially written snapshot.
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as snapshot:
+            json.dump(list(names), snapshot)
+        os.replace(temp_path, path)
+
+
+pokemon_names = PokemonNameRegistry()
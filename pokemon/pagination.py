@@ -0,0 +1,23 @@
+from typing import Optional
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination ordered by primary key.
+    Every page is fetched with a `pk > last pk of the previous page` condition, so listing needs neither OFFSET scans
+    nor a COUNT(*) over the whole table, and rows inserted concurrently can't shift the pages being read.
+    Pages have PAGE_SIZE items, unless clients ask for another size with the `page_size` query param, up to
+    MAX_PAGE_SIZE.
+    """
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request: Request) -> Optional[int]:
+        # Read at request time rather than at import time, so the settings can be overridden.
+        self.page_size = settings.PAGE_SIZE
+        self.max_page_size = settings.MAX_PAGE_SIZE
+        return super().get_page_size(request)
@@ -0,0 +1,74 @@
+import threading
+from typing import Any, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pokemon.conf import lazy_setting_singleton, pokeapi_setting
+from pokemon.metrics import POKEAPI, record_timing
+from pokemon.rate_limit import acquire_egress_token
+
+RETRY_STATUS_CODES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+
+class EgressLimitedRetry(Retry):
+    """Retry that takes an egress token before every retry, so retries count against EGRESS_RATE like first calls"""
+
+    def sleep(self, response: Any = None) -> None:
+        super().sleep(response)
+        acquire_egress_token()
+
+
+class PokeAPIClient:
+    """
+    Http client used for all the calls to the external api.
+    Every thread gets its own requests Session, as sessions are not guaranteed to be thread safe, but all of them are
+    mounted on the same adapter so they share one pool of keep-alive connections.
+    """
+
+    def __init__(self, pool_size: int, connect_timeout: float, read_timeout: float, max_retries: int,
+                 retry_backoff_factor: float) -> None:
+        retry = EgressLimitedRetry(
+            total=max_retries,
+            backoff_factor=retry_backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({'GET'}),
+            # Hand the last response back instead of raising once retries are exhausted.
+            raise_on_status=False)
+        self.adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+        self.timeout = (connect_timeout, read_timeout)
+        self._local = threading.local()
+
+    @classmethod
+    def from_settings(cls) -> 'PokeAPIClient':
+        return cls(
+            pool_size=pokeapi_setting('POOL_SIZE'),
+            connect_timeout=pokeapi_setting('CONNECT_TIMEOUT'),
+            read_timeout=pokeapi_setting('READ_TIMEOUT'),
+            max_retries=pokeapi_setting('MAX_RETRIES'),
+            retry_backoff_factor=pokeapi_setting('RETRY_BACKOFF_FACTOR'))
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        acquire_egress_token()
+        with record_timing(POKEAPI):
+            return self.session.get(url, **kwargs)
+
+    def close(self) -> None:
+        self.adapter.close()
+
+
+@lazy_setting_singleton('POKEAPI', close=lambda client: client.close())
+def get_client() -> PokeAPIClient:
+    return PokeAPIClient.from_settings()
@@ -0,0 +1,232 @@
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
+
+from pokemon.conf import lazy_setting_singleton, pokeapi_setting
+from pokemon.exceptions import PokemonAPIRateLimited, RequestCostExceeded
+
+DURATIONS: Dict[str, int] = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+EGRESS_BUCKET: str = 'pokeapi-egress'
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parses a rate like '30/min' into the capacity of its bucket and the tokens it gets back per second"""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def refill(tokens: float, updated_at: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(now - updated_at, 0) * rate)
+
+
+class BaseTokenBucketStore:
+    """
+    Token buckets by key. Taking from several buckets at once is all or nothing, so a request refused by one of its
+    buckets doesn't spend the tokens of the others. Buckets that would be full again are dropped, as a missing bucket
+    is a full one.
+    """
+    purge_interval: float = 60
+
+    def take(self, keys: Sequence[str], capacity: float, rate: float, cost: float = 1) -> float:
+        """
+        Takes `cost` tokens from the bucket of every key, buckets hold up to `capacity` tokens and get `rate` tokens
+        back per second. Returns 0 when the tokens were taken, otherwise the seconds to wait before they can be.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _take(buckets: List[Tuple[float, float]], now: float, capacity: float, rate: float,
+              cost: float) -> Tuple[float, List[Tuple[float, float]]]:
+        """Returns the wait for the given (tokens, updated_at) buckets and, if it is 0, their (tokens, full_at)"""
+        levels = [refill(tokens, updated_at, now, capacity, rate) for tokens, updated_at in buckets]
+        wait = max((cost - level) / rate for level in levels)
+        if wait > 0:
+            return wait, []
+        return 0, [(level - cost, now + (capacity - level + cost) / rate) for level in levels]
+
+
+class MemoryTokenBucketStore(BaseTokenBucketStore):
+    """Buckets of the current process only, every worker process applies the rates on its own"""
+
+    def __init__(self, **kwargs: Any) -> None:
+        # (tokens, updated_at, full_at) per key.
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._purge_at = 0.0
+
+    def take(self, keys: Sequence[str], capacity: float, rate: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._purge_at:
+                self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+                self._purge_at = now + self.purge_interval
+            buckets = [self._buckets.get(key, (capacity, now, now))[:2] for key in keys]
+            wait, taken = self._take(buckets, now, capacity, rate, cost)
+            for key, (tokens, full_at) in zip(keys, taken):
+                self._buckets[key] = (tokens, now, full_at)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteTokenBucketStore(BaseTokenBucketStore):
+    """
+    Buckets stored in a sqlite database at `location`, shared by all the worker processes of a node so the rates apply
+    to the node as a whole. A connection is opened per operation, like for SQLiteResponseCache.
+    """
+
+    def __init__(self, location: str, **kwargs: Any) -> None:
+        self.location = location
+        self._purge_at = 0.0
+        with closing(self._connect()) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS token_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated_at REAL NOT NULL, full_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS token_buckets_full_at ON token_buckets (full_at)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.location, timeout=5, isolation_level=None)
+
+    def take(self, keys: Sequence[str], capacity: float, rate: float, cost: float = 1) -> float:
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            if now >= self._purge_at:
+                connection.execute('DELETE FROM token_buckets WHERE full_at <= ?', (now,))
+                self._purge_at = now + self.purge_interval
+            rows = connection.execute(
+                f'SELECT key, tokens, updated_at FROM token_buckets WHERE key IN ({", ".join("?" * len(keys))})', keys)
+            buckets = {key: (tokens, updated_at) for key, tokens, updated_at in rows}
+            wait, taken = self._take([buckets.get(key, (capacity, now)) for key in keys], now, capacity, rate, cost)
+            connection.executemany(
+                'INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)',
+                [(key, tokens, now, full_at) for key, (tokens, full_at) in zip(keys, taken)])
+            connection.execute('COMMIT')
+        return wait
+
+    def clear(self) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute('DELETE FROM token_buckets')
+
+
+@lazy_setting_singleton('RATE_LIMIT_STORE')
+def get_rate_limit_store() -> BaseTokenBucketStore:
+    config = settings.RATE_LIMIT_STORE
+    return import_string(config['BACKEND'])(location=config.get('LOCATION'))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Takes a token from the bucket of the client ip and, for authenticated requests, from the bucket of the user too,
+    so neither many clients of a user nor many users of a client get past the rate. Both buckets get the rate of
+    `scope` in DEFAULT_THROTTLE_RATES, requests are not throttled when the scope has no rate.
+    """
+    scope: str = ''
+
+    def __init__(self) -> None:
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.bucket = parse_rate(rate) if rate else None
+        self.retry_after: Optional[float] = None
+
+    def get_cost(self, request: Request, view: APIView) -> float:
+        """Tokens taken by the request"""
+        return 1
+
+    def allow_request(self, request: Request, view: APIView) -> bool:
+        return self.allow(self.get_ident(request), request.user, self.get_cost(request, view))
+
+    def allow(self, ident: str, user: Any, cost: float = 1) -> bool:
+        """Like allow_request, for views that are not DRF views"""
+        if self.bucket is None:
+            return True
+        keys = [f'{self.scope}:ip:{ident}']
+        if user is not None and user.is_authenticated:
+            keys.append(f'{self.scope}:user:{user.pk}')
+        capacity, rate = self.bucket
+        if cost > capacity:
+            raise RequestCostExceeded(
+                f'This request counts as {cost:g} requests of the `{self.scope}` rate, which allows at most '
+                f'{capacity} at once')
+        self.retry_after = get_rate_limit_store().take(keys, capacity, rate, cost)
+        return not self.retry_after
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
+
+
+class CreateRateThrottle(TokenBucketThrottle):
+    """
+    Bulk creates take a token per item, so batching doesn't get more pokemons created than the rate allows, and bulk
+    creates of more items than the bucket holds are refused with 400.
+    """
+    scope = 'create'
+
+    def get_cost(self, request: Request, view: APIView) -> float:
+        if getattr(view, 'action', None) == 'bulk_create' and isinstance(request.data, list):
+            return max(len(request.data), 1)
+        return 1
+
+
+class AuthRateThrottle(TokenBucketThrottle):
+    scope = 'auth'
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(math.ceil(seconds))
+
+
+def _take_egress_token() -> float:
+    rate = pokeapi_setting('EGRESS_RATE')
+    if rate is None:
+        return 0
+    return get_rate_limit_store().take([EGRESS_BUCKET], pokeapi_setting('EGRESS_BURST'), rate)
+
+
+def acquire_egress_token() -> None:
+    """
+    Waits for a token of the egress bucket shared by all the calls to the external api, when EGRESS_RATE is set.
+    Raises PokemonAPIRateLimited instead when the token is not available within EGRESS_MAX_WAIT seconds, so bursts
+    are shed rather than queued up in the workers.
+    """
+    give_up_at = time.monotonic() + pokeapi_setting('EGRESS_MAX_WAIT')
+    while True:
+        wait = _take_egress_token()
+        if not wait:
+            return
+        if time.monotonic() + wait > give_up_at:
+            raise PokemonAPIRateLimited(wait)
+        time.sleep(wait)
+
+
+async def aacquire_egress_token() -> None:
+    """Async counterpart of acquire_egress_token, the store is accessed from a thread so the event loop never blocks"""
+    if pokeapi_setting('EGRESS_RATE') is None:
+        return
+    give_up_at = time.monotonic() + pokeapi_setting('EGRESS_MAX_WAIT')
+    while True:
+        wait = await sync_to_async(_take_egress_token, thread_sensitive=False)()
+        if not wait:
+            return
+        if time.monotonic() + wait > give_up_at:
+            raise PokemonAPIRateLimited(wait)
+        await asyncio.sleep(wait)
@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+from django.utils.module_loading import import_string
+
+from pokemon.conf import lazy_setting_singleton, pokeapi_setting
+
+
+class CacheStats:
+    """Thread safe hit/miss counters of a response cache"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class BaseResponseCache:
+    """
+    Stores json bodies of api responses keyed by their url.
+    Entries expire after `timeout` seconds and the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, timeout: float, max_entries: int, **kwargs: Any) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        self.stats.record(hit=value is not None)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+
+class MemoryResponseCache(BaseResponseCache):
+    """In-process LRU cache, each worker process has its own copy"""
+
+    def __init__(self, timeout: float, max_entries: int, **kwargs: Any) -> None:
+        super().__init__(timeout, max_entries)
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache(BaseResponseCache):
+    """
+    Disk backed cache stored in a sqlite database at `location`.
+    It survives restarts and is shared by all the worker processes of a node, a connection is opened per operation
+    so it is safe to use from any thread or forked process. Recency is only recorded when the previous access of an
+    entry is older than `access_resolution` seconds, so hits on hot entries don't take the write lock.
+    """
+    access_resolution: float = 60 * 60
+
+    def __init__(self, timeout: float, max_entries: int, location: str, **kwargs: Any) -> None:
+        super().__init__(timeout, max_entries)
+        self.location = location
+        with closing(self._connect()) as connection, connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.location, timeout=5)
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                'SELECT value, accessed_at FROM responses WHERE key = ? AND expires_at > ?', (key, now)).fetchone()
+            if row is None:
+                return None
+            value, accessed_at = row
+            if now - accessed_at >= self.access_resolution:
+                connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now + self.timeout, now))
+            connection.execute('DELETE FROM responses WHERE expires_at <= ?', (now,))
+            connection.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def clear(self) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM responses')
+
+
+class TieredResponseCache(BaseResponseCache):
+    """In-process LRU in front of the sqlite cache, so hot entries don't even hit the disk"""
+
+    def __init__(self, timeout: float, max_entries: int, location: str, memory_max_entries: int,
+                 **kwargs: Any) -> None:
+        super().__init__(timeout, max_entries)
+        self.memory = MemoryResponseCache(timeout, memory_max_entries)
+        self.disk = SQLiteResponseCache(timeout, max_entries, location)
+
+    def _get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+
+@lazy_setting_singleton('POKEAPI')
+def get_response_cache() -> BaseResponseCache:
+    config = pokeapi_setting('RESPONSE_CACHE')
+    return import_string(config['BACKEND'])(
+        timeout=config['TIMEOUT'],
+        max_entries=config['MAX_ENTRIES'],
+        location=config.get('LOCATION'),
+        memory_max_entries=config.get('MEMORY_MAX_ENTRIES'))
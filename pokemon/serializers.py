@@ -1,9 +1,11 @@
 from typing import Dict
 
-from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
+from pokemon.metrics import ProfiledSerializerMixin
 from pokemon.models import Pokemon, Ability
+from pokemon.names import pokemon_names
 
 
 class AbilitySerializer(serializers.ModelSerializer):
@@ -12,30 +14,84 @@ class AbilitySerializer(serializers.ModelSerializer):
         fields = ('name', 'effect', 'short_effect', 'api_obj_id')
 
 
-class ReadCreatePokemonSerializer(serializers.ModelSerializer):
-    """Serializer to be used for all actions on Pokemon resource except for update actions"""
+class ReadCreatePokemonSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer to be used for all actions on Pokemon resource except for update actions.
+    Name uniqueness is enforced by the unique index instead of a query per validation, which is also safe against
+    concurrent creations.
+    """
     abilities = AbilitySerializer(many=True, required=False, read_only=True)
 
     class Meta:
         model = Pokemon
-        fields = ('pk', 'name', 'description', 'weight', 'abilities')
+        fields = ('pk', 'name', 'description', 'weight', 'abilities', 'abilities_status')
+        extra_kwargs = {'name': {'validators': []}, 'abilities_status': {'read_only': True}}
 
     @staticmethod
     def validate_name(value: str) -> str:
-        if Pokemon.objects.filter(name=value).exists():
-            raise serializers.ValidationError('Pokemon with that name already exists')
-        if value not in settings.AVAILABLE_POKEMON_NAMES:
+        if value not in pokemon_names:
             raise serializers.ValidationError('That name does not match any Pokemon')
         return value
 
     def create(self, validated_data: Dict) -> Pokemon:
         validated_data['creator'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Other constraints may fail too, e.g. the creator being deleted meanwhile.
+            if not Pokemon.objects.filter(name=validated_data['name']).exists():
+                raise
+            raise serializers.ValidationError({'name': ['Pokemon with that name already exists']})
 
 
-class UpdatePokemonSerializer(serializers.ModelSerializer):
+class BulkCreatePokemonItemSerializer(serializers.ModelSerializer):
+    """
+    Validates a single item of a bulk create request.
+    Names are only checked against the available names here, their uniqueness is checked for the whole batch at once.
+    """
+
+    class Meta:
+        model = Pokemon
+        fields = ('name', 'description', 'weight')
+        extra_kwargs = {'name': {'validators': []}}
+
+    @staticmethod
+    def validate_name(value: str) -> str:
+        if value not in pokemon_names:
+            raise serializers.ValidationError('That name does not match any Pokemon')
+        return value
+
+
+class UpdatePokemonSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     weight = serializers.DecimalField(required=False, max_digits=4, decimal_places=1)
 
     class Meta:
         model = Pokemon
         fields = ('pk', 'description', 'weight')
+
+
+class PokemonNameSearchSerializer(serializers.Serializer):
+    """Validates the query params of the pokemon names autocomplete"""
+    prefix = serializers.CharField(required=False, allow_blank=True, default='')
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+    @staticmethod
+    def validate_prefix(value: str) -> str:
+        return value.lower()
+
+
+class PokemonFilterSerializer(serializers.Serializer):
+    """Validates the query params used to filter the pokemons list"""
+    name = serializers.CharField(required=False)
+    name_prefix = serializers.CharField(required=False)
+    creator = serializers.IntegerField(required=False)
+    weight_min = serializers.DecimalField(required=False, max_digits=4, decimal_places=1)
+    weight_max = serializers.DecimalField(required=False, max_digits=4, decimal_places=1)
+    ability = serializers.IntegerField(required=False)
+
+
+class AsyncPokemonPageSerializer(serializers.Serializer):
+    """Validates the query params of the async pokemons list"""
+    after = serializers.IntegerField(required=False, min_value=0)
+    page_size = serializers.IntegerField(required=False, min_value=1)
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pokemon.metrics.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,11 +86,85 @@ DATABASES = {
 # Django Rest Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
+        'authentication.authentication.CachedBasicAuthentication',
+        'authentication.authentication.SignedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    # Token buckets per client ip and per user, see pokemon/rate_limit.py. `create` applies to creating pokemons and
+    # digimons, a bulk create takes a token per pokemon, `auth` to logging in, registering and refreshing tokens.
+    # Throttled requests are answered with 429.
+    'DEFAULT_THROTTLE_RATES': {
+        'create': '30/min',
+        'auth': '10/min',
+    },
+}
+
+# Store of the token buckets of the throttles and of the PokeAPI egress limit. The sqlite file is shared by all the
+# workers of a node, so the rates apply to the node as a whole, pokemon.rate_limit.MemoryTokenBucketStore applies them
+# to every process on its own.
+RATE_LIMIT_STORE = {
+    'BACKEND': 'pokemon.rate_limit.SQLiteTokenBucketStore',
+    'LOCATION': os.path.join(BASE_DIR, 'rate_limits.sqlite3'),
+}
+
+# Sessions are read from and written to the SESSION_CACHE_ALIAS cache, and written to the db behind, at most every
+# SESSION_WRITE_BEHIND_INTERVAL seconds, see authentication/sessions.py. Logging in and out is still written right away.
+# They stay cached for SESSION_CACHE_TIMEOUT seconds, which is how long other processes may accept a logged out session
+# when the cache is in-process like here, point it to a shared backend like memcached to avoid that.
+SESSION_ENGINE = 'authentication.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_CACHE_TIMEOUT = 60
+SESSION_WRITE_BEHIND_INTERVAL = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+# Users of authenticated sessions are cached in each process for USER_CACHE_TIMEOUT seconds. Saving a user drops it
+# from the cache of every process sharing the default cache right away, the others see the change once their entry
+# expires.
+AUTHENTICATION_BACKENDS = ['authentication.backends.CachedModelBackend']
+USER_CACHE_TIMEOUT = 60
+USER_CACHE_MAX_ENTRIES = 1000
+
+# Credentials verified by basic authentication are cached in each process for this many seconds, so clients sending
+# them with every request pay for the password hash once per timeout. Changing the password invalidates them at once.
+CREDENTIAL_CACHE_TIMEOUT = 60
+CREDENTIAL_CACHE_MAX_ENTRIES = 1000
+
+# Lifetimes in seconds of the bearer tokens issued by the login endpoint in token mode, access tokens are renewed with
+# the refresh token through the refresh endpoint. Logging out revokes all the tokens of the user, but processes that
+# don't share the default cache may accept them for up to TOKEN_EPOCH_CACHE_TIMEOUT more seconds.
+ACCESS_TOKEN_LIFETIME = 60 * 15
+REFRESH_TOKEN_LIFETIME = 60 * 60 * 24 * 7
+TOKEN_EPOCH_CACHE_TIMEOUT = 60
+
+# Number of items of the pages of paginated lists, and the largest page size that clients can request through the
+# `page_size` query param.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Serialized pages of the pokemon and digimon lists are cached per collection version for this many seconds, in the
+# default cache. It is in-process unless CACHES points to a shared backend like memcached.
+LIST_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Requests are profiled by pokemon.metrics.ProfilingMiddleware when enabled: their db queries, PokeAPI calls and
+# serialization times are sent back in a Server-Timing header, and aggregated into per-process histograms that clients
+# from INTERNAL_IPS can scrape from /internal/metrics in the Prometheus text format.
+REQUEST_PROFILING = False
+INTERNAL_IPS = ['127.0.0.1']
+
+# Passwords of bulk registrations and `manage.py import_users` are hashed in parallel on a pool of this many worker
+# processes, they are hashed inline with a single worker.
+PASSWORD_HASHING_WORKERS = os.cpu_count() or 1
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -126,6 +201,61 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
-# This constant is gonna be set in urls.py to retrieve the names from
-# external API only once in the whole application.
-AVAILABLE_POKEMON_NAMES = []
+# External Pokemon API (PokeAPI) configuration, missing keys fall back to the defaults in pokemon/conf.py.
+POKEAPI = {
+    # Root url of the api, the benchmarks point it to a local fake api.
+    'BASE_URL': 'https://pokeapi.co/api/v2',
+    # Maximum number of api requests that are sent concurrently while handling a single request, e.g. the abilities
+    # of a created pokemon.
+    'FETCH_CONCURRENCY': 4,
+    # Overall deadline in seconds for each batch of concurrent api requests. Batches of more than FETCH_CHUNK_SIZE
+    # requests, e.g. the pokemons of a bulk create, are sent in chunks that each get their own deadline.
+    'FETCH_DEADLINE': 10,
+    'FETCH_CHUNK_SIZE': 40,
+    # Number of keep-alive connections kept open to the api, shared by all threads of the process.
+    'POOL_SIZE': 10,
+    # Connections kept open by the async client of the async views, per event loop. Larger pools only pay off for
+    # slow apis, httpx spends more cpu scheduling requests over them.
+    'ASYNC_POOL_SIZE': 20,
+    # Connect and read timeouts in seconds of every api request.
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    # Requests answered with 429 or 5xx are retried with exponential backoff (factor * 2 ** retry seconds).
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF_FACTOR': 0.5,
+    # Api requests sent by all the workers of the node, including retries, are limited to EGRESS_RATE per second
+    # with bursts of up to EGRESS_BURST, see RATE_LIMIT_STORE. Requests that can't be sent within EGRESS_MAX_WAIT
+    # seconds are given up and answered with 429. Set EGRESS_RATE to None to disable the limit.
+    'EGRESS_RATE': 20,
+    'EGRESS_BURST': 40,
+    'EGRESS_MAX_WAIT': 2,
+    # Cache of pokemon and ability responses, their data practically never changes. The default backend keeps an
+    # in-process LRU in front of a sqlite file that survives restarts and is shared by all the workers of a node.
+    'RESPONSE_CACHE': {
+        'BACKEND': 'pokemon.response_cache.TieredResponseCache',
+        'LOCATION': os.path.join(BASE_DIR, 'pokeapi_cache.sqlite3'),
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'MAX_ENTRIES': 20000,
+        'MEMORY_MAX_ENTRIES': 500,
+    },
+    # Lock table used to make concurrent workers of a node wait for a single api call per url, then read its
+    # response from the shared response cache. Waiting for a lock gives up after TIMEOUT seconds.
+    'FETCH_LOCK': {
+        'LOCATION': os.path.join(BASE_DIR, 'pokeapi_cache.sqlite3'),
+        'TIMEOUT': 10,
+    },
+    # Snapshot of the available pokemon names, it is created by `manage.py snapshot_pokemon_names` or by the first
+    # worker that needs the names, and refreshed in the background every NAMES_REFRESH_INTERVAL seconds.
+    'NAMES_SNAPSHOT_PATH': os.path.join(BASE_DIR, 'pokemon_names.json'),
+    'NAMES_REFRESH_INTERVAL': 60 * 60 * 24,
+    # When enabled, creating a pokemon responds 202 right away with its abilities pending, they are fetched by
+    # `manage.py run_enrichment_worker` which has to be running alongside the web workers.
+    'ASYNC_ENRICHMENT': False,
+    # Number of jobs a worker process runs concurrently.
+    'ENRICHMENT_WORKERS': 4,
+    # Failed jobs are retried up to MAX_ATTEMPTS times in total, waiting RETRY_BACKOFF * 2 ** (attempt - 1) seconds.
+    'ENRICHMENT_MAX_ATTEMPTS': 5,
+    'ENRICHMENT_RETRY_BACKOFF': 2,
+    # Seconds after which a running job is considered abandoned by its worker and can be run by another one.
+    'ENRICHMENT_LEASE': 300,
+}
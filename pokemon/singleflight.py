@@ -0,0 +1,149 @@
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+
+from pokemon.conf import lazy_setting_singleton, pokeapi_setting
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key within a process.
+    The first caller of a key runs the call while the callers arriving before it is done wait for, and share, its
+    result or exception instead of running the same call again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Async counterpart of SingleFlight, coalescing concurrent calls sharing the same key within an event loop"""
+
+    def __init__(self) -> None:
+        self._calls: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future[Any]]]' = \
+            weakref.WeakKeyDictionary()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            # The call runs in a task of its own, so the first caller being cancelled, e.g. because its client
+            # disconnected, does not cancel it for the others.
+            task = calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(functools.partial(self._forget, calls, key))
+        # Shielded, so a waiter being cancelled does not cancel the call for the others.
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _forget(calls: Dict[str, 'asyncio.Future[Any]'], key: str, task: 'asyncio.Future[Any]') -> None:
+        del calls[key]
+        if not task.cancelled():
+            # Marks the exception as retrieved, there may be no waiter left to retrieve it.
+            task.exception()
+
+
+class SQLiteFetchLock:
+    """
+    Cross process lock per key, backed by a lock table in a sqlite database shared by the workers of a node.
+    A lock that is not released within `timeout` seconds, e.g. because its worker died, is considered stale and can
+    be taken over, and a worker that waits longer than `timeout` for a lock goes on without it.
+    """
+
+    def __init__(self, location: str, timeout: float, poll_interval: float = 0.05) -> None:
+        self.location = location
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.owner = f'{os.getpid()}-{id(self)}'
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS fetch_locks (key TEXT PRIMARY KEY, owner TEXT NOT NULL, '
+                'expires_at REAL NOT NULL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.location, timeout=5, isolation_level=None)
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[bool]:
+        """Holds the lock of `key` while in the block, yields whether it was actually acquired"""
+        owner = f'{self.owner}-{threading.get_ident()}'
+        acquired = self._acquire(key, owner)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._release(key, owner)
+
+    def _acquire(self, key: str, owner: str) -> bool:
+        give_up_at = time.time() + self.timeout
+        while True:
+            now = time.time()
+            with closing(self._connect()) as connection:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute('DELETE FROM fetch_locks WHERE key = ? AND expires_at <= ?', (key, now))
+                inserted = connection.execute(
+                    'INSERT OR IGNORE INTO fetch_locks (key, owner, expires_at) VALUES (?, ?, ?)',
+                    (key, owner, now + self.timeout)).rowcount
+                connection.execute('COMMIT')
+            if inserted:
+                return True
+            if now >= give_up_at:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _release(self, key: str, owner: str) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute('DELETE FROM fetch_locks WHERE key = ? AND owner = ?', (key, owner))
+
+
+@contextmanager
+def _no_lock(key: str) -> Iterator[bool]:
+    yield False
+
+
+@lazy_setting_singleton('POKEAPI')
+def get_fetch_lock() -> Optional[SQLiteFetchLock]:
+    config = pokeapi_setting('FETCH_LOCK')
+    if config is None:
+        return None
+    return SQLiteFetchLock(location=config['LOCATION'], timeout=config['TIMEOUT'])
+
+
+def hold_fetch_lock(key: str) -> Any:
+    """Holds the cross process fetch lock of `key`, or nothing if FETCH_LOCK is not configured"""
+    fetch_lock = get_fetch_lock()
+    if fetch_lock is None:
+        return _no_lock(key)
+    return fetch_lock.hold(key)
@@ -1,14 +1,50 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch, MagicMock
 
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from requests.models import Response
 from rest_framework.reverse import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
-from pokemon.exceptions import PokemonDoesNotExist
-from pokemon.external_pokemon_api import retrieve_pokemon_from_api, create_ability_from_json, \
-    retrieve_pokemon_abilities, get_pokemon_available_names
+from digimon.models import Digimon
+from pokemon.async_external_pokemon_api import afetch_concurrently, aretrieve_pokemon_abilities
+from pokemon.async_pokeapi_client import get_async_client
+from pokemon.benchmarks import seed_database, summarize
+from pokemon.bulk import bulk_create_pokemons
+from pokemon.exceptions import PokemonAPIRateLimited, PokemonAPITimeout, PokemonDoesNotExist, PokemonNamesTimeout, \
+    PokemonNamesUnavailable
+from pokemon.external_pokemon_api import retrieve_pokemon_from_api, retrieve_pokemon_abilities, \
+    get_pokemon_available_names, fetch_abilities_from_api, retrieve_abilities_for_pokemons, fetch_json, \
+    create_abilities_from_json_data
+from pokemon.export import iter_pokemons_ndjson
+from pokemon.enrichment import claim_jobs, run_job
+from pokemon import metrics
 from pokemon.factories import UserFactory, AbilityFactory, PokemonFactory
-from pokemon.models import Pokemon, Ability
+from pokemon.fake_pokeapi import FakePokeAPI
+from pokemon.models import Pokemon, Ability, CollectionVersion, EnrichmentJob
+from pokemon.names import PokemonNameIndex, PokemonNameRegistry, pokemon_names
+from pokemon.pokeapi_client import PokeAPIClient, get_client
+from pokemon.rate_limit import MemoryTokenBucketStore, SQLiteTokenBucketStore, acquire_egress_token, \
+    aacquire_egress_token, parse_rate
+from pokemon.response_cache import MemoryResponseCache, SQLiteResponseCache, TieredResponseCache
+from pokemon.singleflight import AsyncSingleFlight, SingleFlight, SQLiteFetchLock
+from pokemon.views import PokemonViewSetMetaData
 
 
 class CreatePokemonActionTestSuite(APITestCase):
@@ -20,6 +56,7 @@ class CreatePokemonActionTestSuite(APITestCase):
             'description': 'Mighty Pokemon',
             'weight': 59
         }
+        pokemon_names.set_names(['bulbasaur', 'ivysaur'])
 
         self.logged_in_user = UserFactory()
         self.client.force_authenticate(self.logged_in_user)
@@ -46,7 +83,7 @@ class CreatePokemonActionTestSuite(APITestCase):
         self.assertEqual(201, response.status_code)
         self.assertEqual(2, Pokemon.objects.all().first().abilities.count())
 
-    @patch('pokemon.external_pokemon_api.requests.get')
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
     def test_api_module_throw_exception_pokemon_does_not_Exist(self, mock_get):
         mock_response = Response()
         mock_response.status_code = 404
@@ -55,6 +92,14 @@ class CreatePokemonActionTestSuite(APITestCase):
         response = self.client.post(path=self.list_path, data=self.valid_creation_data)
         self.assertEqual(400, response.status_code)
 
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_abilities_fetch_timeout_returns_504(self, api_call_func):
+        api_call_func.side_effect = PokemonAPITimeout
+        response = self.client.post(path=self.list_path, data=self.valid_creation_data)
+
+        self.assertEqual(504, response.status_code)
+        self.assertEqual(0, Pokemon.objects.count())
+
     @patch('pokemon.views.retrieve_pokemon_abilities')
     def test_create_two_pokemons_with_same_name(self, api_call_func):
         api_call_func.return_value = [AbilityFactory() for _ in range(2)]
@@ -64,6 +109,26 @@ class CreatePokemonActionTestSuite(APITestCase):
         response = self.client.post(path=self.list_path, data=self.valid_creation_data)
         self.assertEqual(400, response.status_code)
 
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_create_pokemon_with_name_taken_concurrently(self, api_call_func):
+        def create_same_pokemon_concurrently(name):
+            PokemonFactory(name=name)
+            return []
+
+        api_call_func.side_effect = create_same_pokemon_concurrently
+        response = self.client.post(path=self.list_path, data=self.valid_creation_data)
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(['Pokemon with that name already exists'], response.data['name'])
+        self.assertEqual(1, Pokemon.objects.count())
+
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_create_pokemon_integrity_errors_of_other_constraints_are_raised(self, api_call_func):
+        api_call_func.return_value = []
+        with patch.object(Pokemon.objects, 'create', side_effect=IntegrityError('FOREIGN KEY constraint failed')), \
+                self.assertRaises(IntegrityError):
+            self.client.post(path=self.list_path, data=self.valid_creation_data)
+
     @patch('pokemon.views.retrieve_pokemon_abilities')
     def test_create_pokemon_with_invalid_name_does_not_hit_external_api(self, api_call):
         invalid_data = {
@@ -76,6 +141,72 @@ class CreatePokemonActionTestSuite(APITestCase):
         self.assertFalse(api_call.called)
 
 
+class BulkCreatePokemonActionTestSuite(APITestCase):
+
+    def setUp(self):
+        self.bulk_path = reverse('pokemon-bulk-create')
+        pokemon_names.set_names(['bulbasaur', 'ivysaur', 'venusaur'])
+        self.items = [
+            {'name': 'bulbasaur', 'description': 'Mighty Pokemon', 'weight': 69},
+            {'name': 'ivysaur', 'description': 'Mightier Pokemon', 'weight': 130},
+        ]
+
+        self.logged_in_user = UserFactory()
+        self.client.force_authenticate(self.logged_in_user)
+
+    def test_bulk_create_as_anonymous_user(self):
+        self.client.logout()
+        response = self.client.post(path=self.bulk_path, data=self.items, format='json')
+        self.assertEqual(401, response.status_code)
+
+    @patch('pokemon.bulk.retrieve_abilities_for_pokemons')
+    def test_bulk_create_pokemons_with_abilities(self, api_call):
+        shared_ability = AbilityFactory()
+        api_call.return_value = {'bulbasaur': [shared_ability, AbilityFactory()], 'ivysaur': [shared_ability]}
+
+        response = self.client.post(path=self.bulk_path, data=self.items, format='json')
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(['bulbasaur', 'ivysaur'], [result['data']['name'] for result in response.data['results']])
+        self.assertEqual(2, Pokemon.objects.get(name='bulbasaur').abilities.count())
+        self.assertEqual(self.logged_in_user, Pokemon.objects.get(name='ivysaur').creator)
+
+    @patch('pokemon.bulk.retrieve_abilities_for_pokemons')
+    def test_bulk_create_reports_errors_per_item(self, api_call):
+        api_call.return_value = {'ivysaur': [], 'venusaur': PokemonDoesNotExist()}
+        PokemonFactory(name='bulbasaur')
+        items = self.items + [
+            {'name': 'ivysaur', 'description': 'Duplicate in batch', 'weight': 130},
+            {'name': 'missingno', 'description': 'Not a pokemon', 'weight': 10},
+            {'name': 'venusaur', 'description': 'Removed from the api', 'weight': 10},
+        ]
+
+        response = self.client.post(path=self.bulk_path, data=items, format='json')
+
+        self.assertEqual(207, response.status_code)
+        self.assertEqual([400, 201, 400, 400, 400], [result['status'] for result in response.data['results']])
+        self.assertEqual(2, Pokemon.objects.count())
+        api_call.assert_called_once_with(['ivysaur', 'venusaur'])
+
+    @patch('pokemon.bulk.retrieve_abilities_for_pokemons')
+    def test_bulk_create_reports_names_taken_concurrently(self, api_call):
+        def retrieve_while_bulbasaur_is_created(names):
+            PokemonFactory(name='bulbasaur')
+            return {name: [] for name in names}
+        api_call.side_effect = retrieve_while_bulbasaur_is_created
+
+        response = self.client.post(path=self.bulk_path, data=self.items, format='json')
+
+        self.assertEqual(207, response.status_code)
+        self.assertEqual([400, 201], [result['status'] for result in response.data['results']])
+        self.assertEqual({'name': ['Pokemon with that name already exists']}, response.data['results'][0]['errors'])
+        self.assertEqual(self.logged_in_user, Pokemon.objects.get(name='ivysaur').creator)
+
+    def test_bulk_create_with_non_list_data(self):
+        response = self.client.post(path=self.bulk_path, data=self.items[0], format='json')
+        self.assertEqual(400, response.status_code)
+
+
 class ExternalPokemonAPIModuleTestSuite(APITestCase):
 
     def setUp(self):
@@ -95,7 +226,7 @@ class ExternalPokemonAPIModuleTestSuite(APITestCase):
             }
         }
 
-    @patch('pokemon.external_pokemon_api.requests.get')
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
     def test_get_pokemon_from_api_using_invalid_pokemon_name(self, mock_get):
         mock_response = Response()
         mock_response.status_code = 404
@@ -104,9 +235,9 @@ class ExternalPokemonAPIModuleTestSuite(APITestCase):
         self.assertRaises(PokemonDoesNotExist, retrieve_pokemon_from_api, 'invalid pokemon name')
 
     @patch('pokemon.external_pokemon_api.get_ability_from_api')
-    def test_create_ability_from_json_creates_ability_object_in_db(self, api_call):
+    def test_create_abilities_from_json_data_creates_ability_object_in_db(self, api_call):
         api_call.return_value = self.mock_ability
-        ability = create_ability_from_json(self.mock_ability_entry)
+        ability, = create_abilities_from_json_data({'abilities': [self.mock_ability_entry]})
         self.assertEqual(1, Ability.objects.count())
         self.assertEqual(self.mock_ability['effect_entries'][0]['effect'], ability.effect)
         self.assertEqual(self.mock_ability['effect_entries'][0]['short_effect'], ability.short_effect)
@@ -114,15 +245,110 @@ class ExternalPokemonAPIModuleTestSuite(APITestCase):
         self.assertEqual(self.mock_ability['id'], ability.api_obj_id)
 
     @patch('pokemon.external_pokemon_api.get_ability_from_api')
-    def test_create_ability_from_json_does_not_create_duplicates(self, api_call):
+    def test_create_abilities_from_json_data_does_not_create_duplicates(self, api_call):
         duplicate_ability = AbilityFactory()
         self.mock_ability['id'] = duplicate_ability.api_obj_id
         api_call.return_value = self.mock_ability
 
-        ability = create_ability_from_json(self.mock_ability_entry)
+        ability, = create_abilities_from_json_data({'abilities': [self.mock_ability_entry]})
         self.assertEqual(ability.api_obj_id, duplicate_ability.api_obj_id)
         self.assertEqual(1, Ability.objects.count())
 
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    def test_fetch_abilities_from_api_keeps_entries_order(self, api_call):
+        def get_ability(entry):
+            # The first entries are the slowest ones to finish.
+            time.sleep(0.05 * (3 - entry['ability']['id']))
+            return {'id': entry['ability']['id']}
+
+        api_call.side_effect = get_ability
+        entries = [{'ability': {'id': ability_id}} for ability_id in range(3)]
+
+        self.assertEqual([{'id': 0}, {'id': 1}, {'id': 2}], fetch_abilities_from_api(entries))
+
+    @override_settings(POKEAPI={'FETCH_DEADLINE': 0.05})
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    def test_fetch_abilities_from_api_exceeding_deadline(self, api_call):
+        api_call.side_effect = lambda entry: time.sleep(0.5)
+        self.assertRaises(PokemonAPITimeout, fetch_abilities_from_api, [self.mock_ability_entry])
+
+    @override_settings(POKEAPI={'FETCH_CONCURRENCY': 2, 'FETCH_CHUNK_SIZE': 2, 'FETCH_DEADLINE': 0.3})
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    def test_fetch_abilities_from_api_chunks_get_their_own_deadline(self, api_call):
+        api_call.side_effect = lambda entry: time.sleep(0.2) or entry
+        entries = [{'ability': {'id': ability_id}} for ability_id in range(4)]
+
+        self.assertEqual(entries, fetch_abilities_from_api(entries))
+
+    @override_settings(POKEAPI={'FETCH_DEADLINE': 0.05})
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    @patch('pokemon.external_pokemon_api.retrieve_pokemon_from_api')
+    def test_retrieve_abilities_for_pokemons_returns_timeouts_per_pokemon(self, pokemon_api_call, ability_api_call):
+        pokemon_api_call.side_effect = lambda name: time.sleep(0.5) if name == 'slowpoke' else {'abilities': []}
+
+        abilities_by_name = retrieve_abilities_for_pokemons(['bulbasaur', 'slowpoke'])
+
+        self.assertEqual([], abilities_by_name['bulbasaur'])
+        self.assertIsInstance(abilities_by_name['slowpoke'], PokemonAPITimeout)
+
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    @patch('pokemon.external_pokemon_api.retrieve_pokemon_from_api')
+    def test_retrieve_abilities_for_pokemons_fetches_shared_abilities_once(self, pokemon_api_call, ability_api_call):
+        pokemons_json = {
+            'bulbasaur': {'abilities': [{'ability': {'url': '/ability/1/'}}, {'ability': {'url': '/ability/2/'}}]},
+            'ivysaur': {'abilities': [{'ability': {'url': '/ability/2/'}}]},
+        }
+
+        def retrieve_pokemon(name):
+            if name not in pokemons_json:
+                raise PokemonDoesNotExist
+            return pokemons_json[name]
+
+        def get_ability(entry):
+            return dict(self.mock_ability, id=int(entry['ability']['url'].split('/')[-2]))
+
+        pokemon_api_call.side_effect = retrieve_pokemon
+        ability_api_call.side_effect = get_ability
+
+        abilities = retrieve_abilities_for_pokemons(['bulbasaur', 'ivysaur', 'missingno'])
+
+        self.assertEqual(2, ability_api_call.call_count)
+        self.assertEqual([1, 2], [ability.api_obj_id for ability in abilities['bulbasaur']])
+        self.assertEqual([2], [ability.api_obj_id for ability in abilities['ivysaur']])
+        self.assertIsInstance(abilities['missingno'], PokemonDoesNotExist)
+
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    def test_create_abilities_from_json_data_only_fetches_missing_abilities(self, api_call):
+        existing_abilities = AbilityFactory.create_batch(2)
+        missing_ability_id = max(ability.api_obj_id for ability in existing_abilities) + 1
+        api_call.return_value = dict(self.mock_ability, id=missing_ability_id)
+        ability_ids = [existing_abilities[0].api_obj_id, missing_ability_id, existing_abilities[1].api_obj_id]
+        pokemon_json = {
+            'abilities': [{'ability': {'url': f'https://pokeapi.co/api/v2/ability/{ability_id}/'}}
+                          for ability_id in ability_ids]
+        }
+
+        with self.assertNumQueries(2):
+            abilities = create_abilities_from_json_data(pokemon_json)
+
+        self.assertEqual(1, api_call.call_count)
+        self.assertEqual(ability_ids, [ability.api_obj_id for ability in abilities])
+        self.assertEqual(3, Ability.objects.count())
+
+    @patch('pokemon.external_pokemon_api.get_ability_from_api')
+    def test_create_abilities_from_json_data_without_network_when_all_exist(self, api_call):
+        existing_abilities = AbilityFactory.create_batch(2)
+        pokemon_json = {
+            'abilities': [{'ability': {'url': f'https://pokeapi.co/api/v2/ability/{ability.api_obj_id}/'}}
+                          for ability in existing_abilities]
+        }
+
+        with self.assertNumQueries(1):
+            abilities = create_abilities_from_json_data(pokemon_json)
+
+        self.assertFalse(api_call.called)
+        self.assertEqual(existing_abilities, list(abilities))
+
     @patch('pokemon.external_pokemon_api.retrieve_pokemon_from_api')
     def test_retrieve_pokemon_abilities_uses_db_instead_of_api_when_pokemon_with_same_name_exists(self, api_call):
         existing_pokemon = PokemonFactory(name='Great Pokemon')
@@ -136,7 +362,7 @@ class ExternalPokemonAPIModuleTestSuite(APITestCase):
         self.assertEqual(len(existing_pokemon.abilities.all()), len(abilities))
         self.assertEqual(existing_pokemon.abilities.first().pk, abilities[0].pk)
 
-    @patch('pokemon.external_pokemon_api.requests.get')
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
     def test_get_pokemon_available_names(self, api_call):
         mock_response = MagicMock()
         mock_response.json = MagicMock(return_value={
@@ -158,6 +384,444 @@ class ExternalPokemonAPIModuleTestSuite(APITestCase):
         self.assertEqual(["bulbasaur", "ivysaur"], result)
 
 
+class PokeAPIClientTestSuite(APITestCase):
+
+    @override_settings(POKEAPI={'POOL_SIZE': 3, 'CONNECT_TIMEOUT': 1, 'READ_TIMEOUT': 2, 'MAX_RETRIES': 5})
+    def test_client_is_configured_from_settings(self):
+        client = get_client()
+
+        self.assertEqual((1, 2), client.timeout)
+        self.assertEqual(3, client.adapter._pool_maxsize)
+        self.assertEqual(5, client.adapter.max_retries.total)
+        self.assertIn(429, client.adapter.max_retries.status_forcelist)
+        self.assertIn(503, client.adapter.max_retries.status_forcelist)
+
+    def test_get_client_is_shared(self):
+        self.assertIs(get_client(), get_client())
+
+    def test_client_is_closed_and_rebuilt_when_settings_change(self):
+        client = get_client()
+        with patch.object(client, 'close') as close, override_settings(POKEAPI={'POOL_SIZE': 3}):
+            close.assert_called_once_with()
+            self.assertIsNot(client, get_client())
+            self.assertEqual(3, get_client().adapter._pool_maxsize)
+
+    def test_threads_share_connection_pool_but_not_sessions(self):
+        client = PokeAPIClient(pool_size=2, connect_timeout=1, read_timeout=1, max_retries=0, retry_backoff_factor=0)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(client.session))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(client.session, sessions[0])
+        self.assertIs(client.session.get_adapter('https://pokeapi.co'), sessions[0].get_adapter('https://pokeapi.co'))
+
+    @patch('requests.Session.get')
+    def test_get_uses_timeouts(self, session_get):
+        client = PokeAPIClient(pool_size=2, connect_timeout=1, read_timeout=4, max_retries=0, retry_backoff_factor=0)
+        client.get('https://pokeapi.co/api/v2/pokemon/bulbasaur/')
+
+        session_get.assert_called_once_with('https://pokeapi.co/api/v2/pokemon/bulbasaur/', timeout=(1, 4))
+
+
+@override_settings(POKEAPI={
+    'RESPONSE_CACHE': {'BACKEND': 'pokemon.response_cache.MemoryResponseCache', 'TIMEOUT': 60, 'MAX_ENTRIES': 10}})
+class ResponseCacheTestSuite(APITestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.location = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
+    def test_retrieve_pokemon_from_api_is_cached(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json = MagicMock(return_value={'name': 'bulbasaur', 'abilities': []})
+        mock_get.return_value = mock_response
+
+        first = retrieve_pokemon_from_api('bulbasaur')
+        second = retrieve_pokemon_from_api('bulbasaur')
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, mock_get.call_count)
+
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
+    def test_not_found_responses_are_not_cached(self, mock_get):
+        mock_response = Response()
+        mock_response.status_code = 404
+        mock_get.return_value = mock_response
+
+        self.assertRaises(PokemonDoesNotExist, retrieve_pokemon_from_api, 'invalid pokemon name')
+        self.assertRaises(PokemonDoesNotExist, retrieve_pokemon_from_api, 'invalid pokemon name')
+        self.assertEqual(2, mock_get.call_count)
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        cache = MemoryResponseCache(timeout=60, max_entries=2)
+        cache.set('a', {'id': 1})
+        cache.set('b', {'id': 2})
+        cache.get('a')
+        cache.set('c', {'id': 3})
+
+        self.assertEqual({'id': 1}, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'hits': 2, 'misses': 1}, cache.stats.as_dict())
+
+    def test_memory_cache_entries_expire(self):
+        cache = MemoryResponseCache(timeout=-1, max_entries=2)
+        cache.set('a', {'id': 1})
+        self.assertIsNone(cache.get('a'))
+
+    def test_sqlite_cache_survives_new_instances(self):
+        SQLiteResponseCache(timeout=60, max_entries=10, location=self.location).set('a', {'id': 1})
+        cache = SQLiteResponseCache(timeout=60, max_entries=10, location=self.location)
+        self.assertEqual({'id': 1}, cache.get('a'))
+
+    def test_sqlite_cache_evicts_least_recently_used(self):
+        cache = SQLiteResponseCache(timeout=60, max_entries=2, location=self.location)
+        cache.access_resolution = 0
+        cache.set('a', {'id': 1})
+        cache.set('b', {'id': 2})
+        cache.get('a')
+        cache.set('c', {'id': 3})
+
+        self.assertEqual({'id': 1}, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'id': 3}, cache.get('c'))
+
+    def test_sqlite_cache_hits_within_access_resolution_are_not_written(self):
+        cache = SQLiteResponseCache(timeout=60, max_entries=2, location=self.location)
+        cache.set('a', {'id': 1})
+        accessed_at_query = "SELECT accessed_at FROM responses WHERE key = 'a'"
+        with closing(sqlite3.connect(self.location)) as connection:
+            set_at = connection.execute(accessed_at_query).fetchone()
+            time.sleep(0.01)
+            self.assertEqual({'id': 1}, cache.get('a'))
+            self.assertEqual(set_at, connection.execute(accessed_at_query).fetchone())
+
+    def test_tiered_cache_fills_memory_from_disk(self):
+        SQLiteResponseCache(timeout=60, max_entries=10, location=self.location).set('a', {'id': 1})
+        cache = TieredResponseCache(timeout=60, max_entries=10, location=self.location, memory_max_entries=5)
+
+        self.assertEqual({'id': 1}, cache.get('a'))
+        self.assertEqual({'id': 1}, cache.memory.get('a'))
+
+
+class PokemonNameRegistryTestSuite(APITestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.snapshot_path = os.path.join(temp_dir.name, 'names.json')
+        settings_override = override_settings(POKEAPI={'NAMES_SNAPSHOT_PATH': self.snapshot_path})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_names_are_loaded_from_snapshot_without_api_call(self, api_call):
+        with open(self.snapshot_path, 'w') as snapshot:
+            snapshot.write('["bulbasaur", "ivysaur"]')
+
+        registry = PokemonNameRegistry()
+
+        self.assertIn('ivysaur', registry)
+        self.assertNotIn('pikachu', registry)
+        self.assertFalse(api_call.called)
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_names_are_loaded_lazily_from_api_without_snapshot(self, api_call):
+        api_call.return_value = ['bulbasaur']
+        registry = PokemonNameRegistry()
+        self.assertFalse(api_call.called)
+
+        self.assertEqual(('bulbasaur',), registry.get_names())
+        self.assertEqual(1, api_call.call_count)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_refresh_replaces_names_and_snapshot(self, api_call):
+        registry = PokemonNameRegistry()
+        registry.set_names(['bulbasaur'])
+        api_call.return_value = ['bulbasaur', 'pikachu']
+
+        registry.refresh()
+
+        self.assertIn('pikachu', registry)
+        self.assertIn('pikachu', PokemonNameRegistry().get_names())
+
+    def test_api_errors_raise_names_unavailable(self):
+        with FakePokeAPI(error_rate=1) as fake_api, override_settings(POKEAPI={
+                'BASE_URL': fake_api.base_url, 'MAX_RETRIES': 0, 'NAMES_SNAPSHOT_PATH': self.snapshot_path}):
+            with self.assertRaises(PokemonNamesUnavailable) as context:
+                PokemonNameRegistry().get_names()
+        self.assertEqual(503, context.exception.status_code)
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_api_timeouts_raise_names_timeout(self, api_call):
+        api_call.side_effect = requests.Timeout
+        with self.assertRaises(PokemonNamesTimeout) as context:
+            PokemonNameRegistry().get_names()
+        self.assertEqual(504, context.exception.status_code)
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_failed_load_is_retried_by_the_next_access(self, api_call):
+        registry = PokemonNameRegistry()
+        api_call.side_effect = requests.ConnectionError
+        with self.assertRaises(PokemonNamesUnavailable):
+            registry.get_names()
+
+        api_call.side_effect = None
+        api_call.return_value = ['bulbasaur']
+        self.assertEqual(('bulbasaur',), registry.get_names())
+
+    @patch('pokemon.names.get_pokemon_available_names')
+    def test_concurrent_first_accesses_share_one_api_call(self, api_call):
+        called = threading.Event()
+        release = threading.Event()
+
+        def get_names():
+            called.set()
+            release.wait(5)
+            return ['bulbasaur']
+        api_call.side_effect = get_names
+        registry = PokemonNameRegistry()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get_names())) for _ in range(3)]
+        threads[0].start()
+        called.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([('bulbasaur',)] * 3, results)
+        self.assertEqual(1, api_call.call_count)
+
+    @patch('pokemon.names.get_pokemon_available_names', side_effect=requests.ConnectionError)
+    def test_requests_needing_unavailable_names_answer_503(self, api_call):
+        self.client.force_authenticate(UserFactory())
+        with patch.object(pokemon_names, '_index', None):
+            names_response = self.client.get(reverse('pokemon-names'), {'prefix': 'bul'})
+            create_response = self.client.post(reverse('pokemon-list'), {'name': 'bulbasaur', 'description': 'Seed',
+                                                                         'weight': 10})
+
+        self.assertEqual(503, names_response.status_code)
+        self.assertEqual(503, create_response.status_code)
+
+
+class PokemonNamesActionTestSuite(APITestCase):
+
+    def setUp(self):
+        self.names_path = reverse('pokemon-names')
+        pokemon_names.set_names(['bulbasaur', 'ivysaur', 'venusaur', 'pikachu', 'pidgey', 'pidgeotto', 'pidgeot'])
+
+    def test_index_search_prefix(self):
+        index = PokemonNameIndex(['pidgeot', 'pidgey', 'pikachu', 'pidgeotto'])
+
+        self.assertEqual(['pidgeot', 'pidgeotto', 'pidgey'], index.search_prefix('pidg', 10))
+        self.assertEqual(['pidgeot'], index.search_prefix('pidg', 1))
+        self.assertEqual([], index.search_prefix('z', 10))
+        self.assertIn('pikachu', index)
+        self.assertNotIn('pika', index)
+
+    def test_names_by_prefix(self):
+        response = self.client.get(path=self.names_path, data={'prefix': 'Pidg'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['pidgeot', 'pidgeotto', 'pidgey'], response.data['results'])
+
+    def test_names_result_limit(self):
+        response = self.client.get(path=self.names_path, data={'prefix': 'pi', 'limit': 2})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['pidgeot', 'pidgeotto'], response.data['results'])
+
+    def test_names_fall_back_to_fuzzy_matches(self):
+        response = self.client.get(path=self.names_path, data={'prefix': 'pickachu'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('pikachu', response.data['results'][0])
+
+    def test_names_with_invalid_limit(self):
+        response = self.client.get(path=self.names_path, data={'prefix': 'pi', 'limit': 1000})
+        self.assertEqual(400, response.status_code)
+
+
+class PokemonOptionsTestSuite(APITestCase):
+
+    def setUp(self):
+        self.list_path = reverse('pokemon-list')
+        pokemon_names.set_names(['bulbasaur', 'ivysaur'])
+
+    def test_options_include_available_names(self):
+        response = self.client.options(path=self.list_path)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['bulbasaur', 'ivysaur'], response.json()['actions']['POST']['name']['choices'])
+
+    @patch('pokemon.views.PokemonViewSetMetaData.determine_metadata', autospec=True,
+           side_effect=PokemonViewSetMetaData.determine_metadata)
+    def test_options_are_rendered_once_per_names_version(self, determine_metadata):
+        first_response = self.client.options(path=self.list_path)
+        second_response = self.client.options(path=self.list_path)
+
+        self.assertEqual(1, determine_metadata.call_count)
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertEqual(first_response['ETag'], second_response['ETag'])
+
+        pokemon_names.set_names(['bulbasaur', 'ivysaur', 'venusaur'])
+        third_response = self.client.options(path=self.list_path)
+
+        self.assertEqual(2, determine_metadata.call_count)
+        self.assertNotEqual(first_response['ETag'], third_response['ETag'])
+        self.assertIn('venusaur', third_response.json()['actions']['POST']['name']['choices'])
+
+    def test_unchanged_options_are_not_modified(self):
+        etag = self.client.options(path=self.list_path)['ETag']
+        response = self.client.options(path=self.list_path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+
+    def test_options_are_cached_per_accepted_media_type(self):
+        compact_response = self.client.options(path=self.list_path)
+        indented_response = self.client.options(path=self.list_path, HTTP_ACCEPT='application/json; indent=4')
+
+        self.assertEqual('application/json; indent=4', indented_response['Content-Type'])
+        self.assertIn(b'\n    ', indented_response.content)
+        self.assertNotIn(b'\n', compact_response.content)
+        self.assertNotEqual(compact_response['ETag'], indented_response['ETag'])
+
+
+class SingleFlightTestSuite(APITestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.location = os.path.join(temp_dir.name, 'locks.sqlite3')
+
+    def run_concurrently(self, func, count):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(func())) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_calls_with_same_key_share_one_call(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return len(calls)
+
+        results = self.run_concurrently(lambda: single_flight.do('key', slow_call), 5)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual([1] * 5, results)
+
+    def test_failed_call_is_not_remembered(self):
+        single_flight = SingleFlight()
+
+        def failing_call():
+            raise ValueError
+
+        self.assertRaises(ValueError, single_flight.do, 'key', failing_call)
+        self.assertEqual(2, single_flight.do('key', lambda: 2))
+
+    @override_settings(POKEAPI={
+        'RESPONSE_CACHE': {'BACKEND': 'pokemon.response_cache.MemoryResponseCache', 'TIMEOUT': 60, 'MAX_ENTRIES': 10}})
+    @patch('pokemon.pokeapi_client.PokeAPIClient.get')
+    def test_fetch_json_coalesces_concurrent_misses(self, mock_get):
+        def slow_get(url):
+            time.sleep(0.2)
+            response = MagicMock()
+            response.json = MagicMock(return_value={'url': url})
+            return response
+
+        mock_get.side_effect = slow_get
+        results = self.run_concurrently(lambda: fetch_json('https://pokeapi.co/api/v2/ability/1/'), 5)
+
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual([{'url': 'https://pokeapi.co/api/v2/ability/1/'}] * 5, results)
+
+    def test_fetch_lock_is_exclusive_across_instances(self):
+        first_worker_lock = SQLiteFetchLock(self.location, timeout=5)
+        second_worker_lock = SQLiteFetchLock(self.location, timeout=0.2)
+
+        with first_worker_lock.hold('key') as first_acquired:
+            with second_worker_lock.hold('key') as second_acquired:
+                self.assertTrue(first_acquired)
+                self.assertFalse(second_acquired)
+        with second_worker_lock.hold('key') as second_acquired:
+            self.assertTrue(second_acquired)
+
+    def test_stale_fetch_lock_is_taken_over(self):
+        dead_worker_lock = SQLiteFetchLock(self.location, timeout=0.1)
+        dead_worker_lock._acquire('key', 'dead worker')
+        time.sleep(0.1)
+
+        with SQLiteFetchLock(self.location, timeout=0.1).hold('key') as acquired:
+            self.assertTrue(acquired)
+
+
+@patch('pokemon.external_pokemon_api.get_ability_from_api')
+@patch('pokemon.management.commands.sync_abilities.retrieve_abilities_page')
+class SyncAbilitiesCommandTestSuite(APITestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.checkpoint = os.path.join(temp_dir.name, 'checkpoint.json')
+        self.pages = {
+            0: {'count': 3, 'next': '/ability/?offset=2', 'results': [
+                {'name': 'stench', 'url': '/ability/1/'}, {'name': 'drizzle', 'url': '/ability/2/'}]},
+            2: {'count': 3, 'next': None, 'results': [{'name': 'speed-boost', 'url': '/ability/3/'}]},
+        }
+
+    @staticmethod
+    def get_ability(entry):
+        ability_id = int(entry['ability']['url'].split('/')[-2])
+        return {
+            'id': ability_id,
+            'name': entry['ability']['name'],
+            'effect_entries': [
+                {'effect': 'Wirkung', 'short_effect': 'Kurz', 'language': {'name': 'de'}},
+                {'effect': f'Effect {ability_id}', 'short_effect': 'Short', 'language': {'name': 'en'}},
+            ],
+        }
+
+    def sync(self, page_api_call, ability_api_call, **options):
+        page_api_call.side_effect = lambda offset, limit: self.pages[offset]
+        ability_api_call.side_effect = self.get_ability
+        call_command('sync_abilities', page_size=2, stdout=StringIO(), **options)
+
+    def test_sync_upserts_all_abilities(self, page_api_call, ability_api_call):
+        AbilityFactory(api_obj_id=1, name='outdated')
+        self.sync(page_api_call, ability_api_call)
+
+        self.assertEqual(3, Ability.objects.count())
+        self.assertEqual('stench', Ability.objects.get(pk=1).name)
+        self.assertEqual('Effect 3', Ability.objects.get(pk=3).effect)
+
+    def test_sync_dry_run_does_not_write(self, page_api_call, ability_api_call):
+        self.sync(page_api_call, ability_api_call, dry_run=True)
+        self.assertEqual(0, Ability.objects.count())
+
+    def test_sync_resumes_from_checkpoint(self, page_api_call, ability_api_call):
+        with open(self.checkpoint, 'w') as checkpoint:
+            checkpoint.write('{"offset": 2}')
+
+        self.sync(page_api_call, ability_api_call, checkpoint=self.checkpoint)
+
+        self.assertEqual([3], list(Ability.objects.values_list('pk', flat=True)))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
 class ListPokemonActionTestSuite(APITestCase):
 
     def setUp(self):
@@ -168,7 +832,7 @@ class ListPokemonActionTestSuite(APITestCase):
         response = self.client.get(path=self.list_path)
 
         self.assertEqual(200, response.status_code)
-        self.assertEqual(Pokemon.objects.count(), len(response.data))
+        self.assertEqual(Pokemon.objects.count(), len(response.data['results']))
 
     def test_list_as_authenticated_user(self):
         PokemonFactory.create_batch(5)
@@ -176,7 +840,136 @@ class ListPokemonActionTestSuite(APITestCase):
         response = self.client.get(path=self.list_path)
 
         self.assertEqual(200, response.status_code)
-        self.assertEqual(Pokemon.objects.count(), len(response.data))
+        self.assertEqual(Pokemon.objects.count(), len(response.data['results']))
+
+    def test_list_pages_are_ordered_by_pk(self):
+        pokemons = PokemonFactory.create_batch(5)
+        response = self.client.get(path=self.list_path, data={'page_size': 3})
+
+        self.assertEqual([pokemon.pk for pokemon in pokemons[:3]], [item['pk'] for item in response.data['results']])
+        self.assertIsNone(response.data['previous'])
+
+        PokemonFactory()
+        response = self.client.get(path=response.data['next'])
+
+        self.assertEqual([pokemon.pk for pokemon in pokemons[3:]] + [Pokemon.objects.last().pk],
+                         [item['pk'] for item in response.data['results']])
+        self.assertIsNone(response.data['next'])
+
+    @override_settings(MAX_PAGE_SIZE=2)
+    def test_list_page_size_is_capped(self):
+        PokemonFactory.create_batch(3)
+        response = self.client.get(path=self.list_path, data={'page_size': 100})
+
+        self.assertEqual(2, len(response.data['results']))
+        self.assertIsNotNone(response.data['next'])
+
+    def test_unchanged_list_is_not_modified(self):
+        PokemonFactory.create_batch(3)
+        etag = self.client.get(path=self.list_path)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(path=self.list_path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+    def test_unchanged_list_page_is_served_from_cache(self):
+        PokemonFactory.create_batch(3)
+        first_response = self.client.get(path=self.list_path, data={'page_size': 2})
+
+        with self.assertNumQueries(1):
+            second_response = self.client.get(path=self.list_path, data={'page_size': 2})
+
+        self.assertEqual(first_response.data, second_response.data)
+        self.assertEqual(first_response['ETag'], second_response['ETag'])
+
+    @staticmethod
+    def bulk_create_pokemon():
+        pokemon_names.set_names(['bulbasaur'])
+        with patch('pokemon.bulk.retrieve_abilities_for_pokemons', return_value={'bulbasaur': []}):
+            bulk_create_pokemons([{'name': 'bulbasaur', 'description': 'Mighty Pokemon', 'weight': 59}], creator=None)
+
+    def test_writes_change_list_etag(self):
+        pokemon = PokemonFactory()
+        writes = [
+            ('create', lambda: PokemonFactory()),
+            ('update', lambda: Pokemon.objects.get(pk=pokemon.pk).save()),
+            ('bulk create', self.bulk_create_pokemon),
+            ('delete', lambda: Pokemon.objects.filter(pk=pokemon.pk).delete()),
+        ]
+        for write_name, write in writes:
+            with self.subTest(write=write_name):
+                etag = self.client.get(path=self.list_path)['ETag']
+                write()
+                response = self.client.get(path=self.list_path, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(200, response.status_code)
+                self.assertNotEqual(etag, response['ETag'])
+                self.assertEqual(Pokemon.objects.count(), len(response.data['results']))
+
+
+class FilterPokemonsTestSuite(APITestCase):
+
+    def setUp(self):
+        self.list_path = reverse('pokemon-list')
+        self.ability = AbilityFactory()
+        self.pikachu = PokemonFactory(name='pikachu', weight=6, abilities=[self.ability])
+        self.pidgey = PokemonFactory(name='pidgey', weight=1.8)
+        self.snorlax = PokemonFactory(name='snorlax', weight=460, creator=self.pidgey.creator)
+
+    def list_names(self, **params):
+        response = self.client.get(path=self.list_path, data=params)
+        self.assertEqual(200, response.status_code)
+        return [item['name'] for item in response.data['results']]
+
+    def test_filter_by_name(self):
+        self.assertEqual(['pikachu'], self.list_names(name='pikachu'))
+        self.assertEqual(['pikachu', 'pidgey'], self.list_names(name_prefix='pi'))
+
+    def test_filter_by_creator(self):
+        self.assertEqual(['pidgey', 'snorlax'], self.list_names(creator=self.pidgey.creator.pk))
+
+    def test_filter_by_weight_range(self):
+        self.assertEqual(['pikachu', 'pidgey'], self.list_names(weight_max=100))
+        self.assertEqual(['pikachu'], self.list_names(weight_min=5, weight_max=100))
+
+    def test_filter_by_ability(self):
+        self.assertEqual(['pikachu'], self.list_names(ability=self.ability.api_obj_id))
+
+    def test_filter_with_invalid_value(self):
+        response = self.client.get(path=self.list_path, data={'weight_min': 'heavy'})
+        self.assertEqual(400, response.status_code)
+
+
+class ExportPokemonsTestSuite(APITestCase):
+
+    def setUp(self):
+        self.export_path = reverse('pokemon-export')
+        self.abilities = AbilityFactory.create_batch(2)
+        self.pokemons = PokemonFactory.create_batch(5, abilities=self.abilities)
+
+    def test_export_streams_a_line_per_pokemon(self):
+        response = self.client.get(path=self.export_path)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+        self.assertEqual([pokemon.pk for pokemon in self.pokemons], [json.loads(line)['pk'] for line in lines])
+        self.assertEqual(2, len(json.loads(lines[0])['abilities']))
+
+    def test_export_prefetches_abilities_per_chunk(self):
+        with self.assertNumQueries(4):
+            lines = list(iter_pokemons_ndjson(Pokemon.objects.all(), chunk_size=2))
+        self.assertEqual(5, len(lines))
+
+    def test_export_pokemons_command(self):
+        output = StringIO()
+        call_command('export_pokemons', chunk_size=2, stdout=output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertEqual(self.pokemons[0].name, json.loads(lines[0])['name'])
 
 
 class UpdatePokemonActionTestSuite(APITestCase):
@@ -230,3 +1023,624 @@ class UpdatePokemonActionTestSuite(APITestCase):
         Ability.objects.all().delete()
         self.client.patch(path=self.update_path, data=data)
         self.assertEqual(0, self.pokemon_to_update.abilities.count())
+
+
+class PokemonQueryCountTestSuite(APITestCase):
+    """Pins the number of queries of each action, so they don't grow with the number of pokemons or abilities"""
+
+    def setUp(self):
+        self.list_path = reverse('pokemon-list')
+        self.abilities = AbilityFactory.create_batch(3)
+        self.creator = UserFactory()
+
+    def create_pokemons(self, count):
+        pokemons = Pokemon.objects.bulk_create([
+            Pokemon(creator=self.creator, name=f'pokemon-{number}', description='Mighty Pokemon', weight=10)
+            for number in range(count)
+        ])
+        PokemonAbility = Pokemon.abilities.through
+        PokemonAbility.objects.bulk_create([
+            PokemonAbility(pokemon_id=pokemon.pk, ability_id=ability.pk)
+            for pokemon in pokemons
+            for ability in self.abilities
+        ])
+        # Bulk inserts don't send signals, pages cached by other tests under the same version must not be served.
+        CollectionVersion.bump(Pokemon.COLLECTION)
+        return pokemons
+
+    def test_list_query_count(self):
+        for count in [1, 100, 10000]:
+            with self.subTest(count=count):
+                Pokemon.objects.all().delete()
+                self.create_pokemons(count)
+
+                # The collection version, the page of pokemons and their abilities.
+                with self.assertNumQueries(3):
+                    response = self.client.get(path=self.list_path)
+
+                self.assertEqual(200, response.status_code)
+
+    def test_update_query_count(self):
+        for count in [1, 100, 10000]:
+            with self.subTest(count=count):
+                Pokemon.objects.all().delete()
+                pokemon = self.create_pokemons(count)[0]
+                self.client.force_authenticate(self.creator)
+                update_path = reverse('pokemon-detail', kwargs={'pk': pokemon.pk})
+
+                # Includes bumping the collection version.
+                with self.assertNumQueries(5):
+                    response = self.client.patch(path=update_path, data={'weight': 52})
+
+                self.assertEqual(200, response.status_code)
+
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_create_query_count(self, api_call):
+        pokemon_names.set_names(['bulbasaur'])
+        api_call.return_value = self.abilities
+        self.client.force_authenticate(self.creator)
+        for count in [1, 100, 10000]:
+            with self.subTest(count=count):
+                Pokemon.objects.all().delete()
+                self.create_pokemons(count)
+                data = {'name': 'bulbasaur', 'description': 'Mighty Pokemon', 'weight': 59}
+
+                # Includes the savepoint pair that replaced the name uniqueness query, outside of the test transaction
+                # it merges with the transaction that links the abilities, and bumping the collection version.
+                with self.assertNumQueries(7):
+                    response = self.client.post(path=self.list_path, data=data)
+
+                self.assertEqual(201, response.status_code)
+
+
+class AsyncPokemonsViewTestSuite(APITestCase):
+
+    def setUp(self):
+        self.path = reverse('async-pokemon-list')
+        self.valid_creation_data = {'name': 'bulbasaur', 'description': 'Mighty Pokemon', 'weight': 59}
+        pokemon_names.set_names(['bulbasaur', 'ivysaur'])
+
+        self.logged_in_user = UserFactory()
+        self.client.force_login(self.logged_in_user)
+
+    def test_user_is_not_authenticated(self):
+        self.client.logout()
+        response = self.client.post(path=self.path, data=self.valid_creation_data, format='json')
+        self.assertEqual(401, response.status_code)
+
+    @patch('pokemon.async_views.aretrieve_pokemon_abilities')
+    def test_create_pokemon(self, api_call_func):
+        abilities = [AbilityFactory() for _ in range(2)]
+        api_call_func.return_value = abilities
+        response = self.client.post(path=self.path, data=self.valid_creation_data, format='json')
+
+        self.assertEqual(201, response.status_code)
+        pokemon = Pokemon.objects.get()
+        self.assertEqual(self.logged_in_user, pokemon.creator)
+        self.assertCountEqual(abilities, pokemon.abilities.all())
+        self.assertEqual(2, len(response.json()['abilities']))
+
+    def test_name_not_in_available_names(self):
+        response = self.client.post(path=self.path, data={**self.valid_creation_data, 'name': 'agumon'}, format='json')
+        self.assertEqual(400, response.status_code)
+        self.assertIn('name', response.json())
+
+    @patch('pokemon.async_views.aretrieve_pokemon_abilities')
+    def test_external_api_errors(self, api_call_func):
+        for error, status_code in [(PokemonDoesNotExist, 400), (PokemonAPITimeout, 504)]:
+            with self.subTest(error=error):
+                api_call_func.side_effect = error
+                response = self.client.post(path=self.path, data=self.valid_creation_data, format='json')
+                self.assertEqual(status_code, response.status_code)
+        self.assertFalse(Pokemon.objects.exists())
+
+    @patch('pokemon.async_views.aretrieve_pokemon_abilities')
+    def test_duplicate_name(self, api_call_func):
+        api_call_func.return_value = []
+        PokemonFactory(name='bulbasaur')
+        response = self.client.post(path=self.path, data=self.valid_creation_data, format='json')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(['Pokemon with that name already exists'], response.json()['name'])
+
+    def test_list_is_paginated(self):
+        pokemons = [PokemonFactory() for _ in range(3)]
+
+        first_page = self.client.get(path=self.path, data={'page_size': 2}).json()
+        second_page = self.client.get(path=first_page['next']).json()
+
+        self.assertEqual([pokemon.name for pokemon in pokemons[:2]], [item['name'] for item in first_page['results']])
+        self.assertEqual([pokemons[2].name], [item['name'] for item in second_page['results']])
+        self.assertIsNone(second_page['next'])
+
+
+class AsyncExternalPokemonAPIModuleTestSuite(APITestCase):
+
+    def setUp(self):
+        self.fake_api = FakePokeAPI(pokemons_count=10, abilities_count=4).start()
+        self.addCleanup(self.fake_api.stop)
+        settings_override = override_settings(POKEAPI={
+            'BASE_URL': self.fake_api.base_url,
+            'RESPONSE_CACHE': {'BACKEND': 'pokemon.response_cache.MemoryResponseCache', 'TIMEOUT': 60,
+                               'MAX_ENTRIES': 100}})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_async_clients_are_closed_when_settings_change(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def get_loop_client():
+            return get_async_client()
+
+        client = loop.run_until_complete(get_loop_client())
+        with override_settings(POKEAPI={'ASYNC_POOL_SIZE': 3}):
+            self.assertTrue(client.client.is_closed)
+            self.assertIsNot(client, loop.run_until_complete(get_loop_client()))
+
+    async def test_async_client_of_the_running_loop_is_closed_when_settings_change(self):
+        client = get_async_client()
+        with override_settings(POKEAPI={'ASYNC_POOL_SIZE': 3}):
+            await asyncio.sleep(0.01)
+            self.assertTrue(client.client.is_closed)
+
+    async def test_retrieve_pokemon_abilities_creates_missing_abilities(self):
+        abilities = await aretrieve_pokemon_abilities('fake-pokemon-0')
+
+        self.assertEqual(['fake-ability-1', 'fake-ability-2'], [ability.name for ability in abilities])
+        self.assertEqual(2, await Ability.objects.acount())
+
+    async def test_abilities_in_db_are_not_fetched(self):
+        await aretrieve_pokemon_abilities('fake-pokemon-0')
+        requests_count = self.fake_api.requests_count
+
+        # fake-pokemon-2 has the same abilities as fake-pokemon-0, so only the pokemon itself is fetched.
+        abilities = await aretrieve_pokemon_abilities('fake-pokemon-2')
+
+        self.assertEqual(1, self.fake_api.requests_count - requests_count)
+        self.assertEqual(['fake-ability-1', 'fake-ability-2'], [ability.name for ability in abilities])
+
+    async def test_concurrent_retrievals_share_api_calls(self):
+        await asyncio.gather(*[aretrieve_pokemon_abilities('fake-pokemon-1') for _ in range(5)])
+        self.assertEqual(3, self.fake_api.requests_count)
+
+    async def test_pokemon_does_not_exist(self):
+        with self.assertRaises(PokemonDoesNotExist):
+            await aretrieve_pokemon_abilities('agumon')
+
+    @override_settings(POKEAPI={'FETCH_DEADLINE': 0.05})
+    async def test_fetch_concurrently_deadline(self):
+        with self.assertRaises(PokemonAPITimeout):
+            await afetch_concurrently(asyncio.sleep, [1, 0])
+
+    async def test_async_single_flight_forgets_failed_calls(self):
+        single_flight = AsyncSingleFlight()
+
+        async def failing_call():
+            raise ValueError
+
+        async def call():
+            return 2
+
+        with self.assertRaises(ValueError):
+            await single_flight.do('key', failing_call)
+        self.assertEqual(2, await single_flight.do('key', call))
+
+    async def test_async_single_flight_outlives_a_cancelled_first_caller(self):
+        single_flight = AsyncSingleFlight()
+
+        async def slow_call():
+            await asyncio.sleep(0.05)
+            return 2
+
+        first_caller = asyncio.ensure_future(single_flight.do('key', slow_call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do('key', slow_call))
+        await asyncio.sleep(0)
+        first_caller.cancel()
+
+        self.assertEqual(2, await follower)
+        self.assertTrue(first_caller.cancelled())
+
+
+@override_settings(POKEAPI={'ASYNC_ENRICHMENT': True, 'ENRICHMENT_MAX_ATTEMPTS': 3, 'ENRICHMENT_RETRY_BACKOFF': 2})
+class AsyncEnrichmentTestSuite(APITestCase):
+
+    def setUp(self):
+        self.list_path = reverse('pokemon-list')
+        self.valid_creation_data = {'name': 'bulbasaur', 'description': 'Mighty Pokemon', 'weight': 59}
+        pokemon_names.set_names(['bulbasaur', 'ivysaur'])
+        self.client.force_authenticate(UserFactory())
+
+    def create_pending_pokemon(self):
+        pokemon = PokemonFactory(abilities_status=Pokemon.ABILITIES_PENDING)
+        return EnrichmentJob.objects.create(pokemon=pokemon)
+
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_create_returns_before_abilities_are_fetched(self, api_call_func):
+        response = self.client.post(path=self.list_path, data=self.valid_creation_data)
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual('pending', response.data['abilities_status'])
+        self.assertEqual([], response.data['abilities'])
+        api_call_func.assert_not_called()
+        self.assertTrue(EnrichmentJob.objects.filter(pokemon__name='bulbasaur').exists())
+
+    @override_settings(POKEAPI={'ASYNC_ENRICHMENT': False})
+    @patch('pokemon.views.retrieve_pokemon_abilities')
+    def test_create_fetches_abilities_when_disabled(self, api_call_func):
+        api_call_func.return_value = [AbilityFactory()]
+        response = self.client.post(path=self.list_path, data=self.valid_creation_data)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual('ready', response.data['abilities_status'])
+        self.assertFalse(EnrichmentJob.objects.exists())
+
+    @patch('pokemon.enrichment.create_abilities_from_json_data')
+    @patch('pokemon.enrichment.retrieve_pokemon_from_api')
+    def test_job_links_abilities(self, retrieve_pokemon, create_abilities):
+        job = self.create_pending_pokemon()
+        abilities = [AbilityFactory() for _ in range(2)]
+        create_abilities.return_value = abilities
+
+        [claimed_job] = claim_jobs(limit=10)
+        self.assertTrue(run_job(claimed_job))
+
+        pokemon = Pokemon.objects.get(pk=job.pokemon_id)
+        self.assertEqual(Pokemon.ABILITIES_READY, pokemon.abilities_status)
+        self.assertCountEqual(abilities, pokemon.abilities.all())
+        self.assertFalse(EnrichmentJob.objects.exists())
+
+    @patch('pokemon.enrichment.retrieve_pokemon_from_api')
+    def test_failed_job_is_retried_with_backoff(self, retrieve_pokemon):
+        retrieve_pokemon.side_effect = PokemonAPITimeout
+        job = self.create_pending_pokemon()
+
+        for attempt, backoff in [(1, 2), (2, 4)]:
+            with self.subTest(attempt=attempt):
+                [claimed_job] = claim_jobs(limit=10)
+                self.assertEqual([], claim_jobs(limit=10))
+                started_at = timezone.now()
+                self.assertFalse(run_job(claimed_job))
+
+                job.refresh_from_db()
+                self.assertEqual((EnrichmentJob.PENDING, attempt), (job.status, job.attempts))
+                self.assertAlmostEqual(backoff, (job.run_after - started_at).total_seconds(), delta=0.5)
+                self.assertEqual([], claim_jobs(limit=10))
+                EnrichmentJob.objects.update(run_after=timezone.now())
+
+        [claimed_job] = claim_jobs(limit=10)
+        run_job(claimed_job)
+        job.refresh_from_db()
+        self.assertEqual(EnrichmentJob.FAILED, job.status)
+        self.assertEqual(Pokemon.ABILITIES_FAILED, Pokemon.objects.get(pk=job.pokemon_id).abilities_status)
+
+    @patch('pokemon.enrichment.retrieve_pokemon_from_api')
+    def test_job_of_unknown_pokemon_fails_right_away(self, retrieve_pokemon):
+        retrieve_pokemon.side_effect = PokemonDoesNotExist
+        job = self.create_pending_pokemon()
+
+        run_job(claim_jobs(limit=10)[0])
+
+        job.refresh_from_db()
+        self.assertEqual((EnrichmentJob.FAILED, 1), (job.status, job.attempts))
+
+    def test_abandoned_job_is_claimed_again(self):
+        self.create_pending_pokemon()
+        claim_jobs(limit=10)
+        EnrichmentJob.objects.update(locked_at=timezone.now() - timedelta(seconds=301))
+
+        [claimed_job] = claim_jobs(limit=10)
+        self.assertEqual(2, claimed_job.attempts)
+
+
+class RunEnrichmentWorkerCommandTestSuite(APITransactionTestCase):
+
+    @patch('pokemon.enrichment.create_abilities_from_json_data')
+    @patch('pokemon.enrichment.retrieve_pokemon_from_api')
+    def test_worker_runs_due_jobs(self, retrieve_pokemon, create_abilities):
+        create_abilities.side_effect = lambda pokemon_json: [AbilityFactory()]
+        for _ in range(5):
+            EnrichmentJob.objects.create(pokemon=PokemonFactory(abilities_status=Pokemon.ABILITIES_PENDING))
+        output = StringIO()
+
+        # A single worker thread, concurrent writers fail on the table locks of the in-memory test database.
+        call_command('run_enrichment_worker', '--once', '--workers', '1', stdout=output)
+
+        self.assertIn('Ran 5 enrichment jobs', output.getvalue())
+        self.assertFalse(EnrichmentJob.objects.exists())
+        self.assertEqual(5, Pokemon.objects.filter(abilities_status=Pokemon.ABILITIES_READY).count())
+
+
+class BenchmarksTestSuite(APITestCase):
+
+    def test_fake_api_injects_errors(self):
+        with FakePokeAPI(pokemons_count=2, error_rate=1) as fake_api:
+            response = requests.get(f'{fake_api.base_url}/pokemon/fake-pokemon-0/')
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(1, fake_api.errors_count)
+
+    def test_summarize(self):
+        summary = summarize([200] * 98 + [400, 503], [0.001 * number for number in range(1, 101)], duration=2)
+
+        self.assertEqual(100, summary['requests'])
+        self.assertEqual(2, summary['errors'])
+        self.assertEqual(50, summary['throughput'])
+        self.assertEqual(50.5, summary['latency_p50'])
+        self.assertLess(summary['latency_p95'], summary['latency_p99'])
+
+    def test_seed_database(self):
+        creator = UserFactory()
+        seed_database(pokemons_count=5, abilities_count=3, digimons_count=4, creator=creator)
+
+        self.assertEqual(5, Pokemon.objects.filter(creator=creator).count())
+        self.assertEqual([1, 2, 3], sorted(Ability.objects.values_list('api_obj_id', flat=True)))
+        self.assertEqual(4, Digimon.objects.count())
+        self.assertEqual(10, Pokemon.abilities.through.objects.count())
+
+
+@override_settings(REQUEST_PROFILING=True)
+class RequestProfilingTestSuite(APITestCase):
+
+    def setUp(self):
+        self.fake_api = FakePokeAPI(pokemons_count=4, abilities_count=4).start()
+        self.addCleanup(self.fake_api.stop)
+        settings_override = override_settings(POKEAPI={
+            'BASE_URL': self.fake_api.base_url,
+            'RESPONSE_CACHE': {'BACKEND': 'pokemon.response_cache.MemoryResponseCache', 'TIMEOUT': 60,
+                               'MAX_ENTRIES': 100}})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        pokemon_names.set_names(self.fake_api.get_pokemon_names())
+        self.client.force_authenticate(UserFactory())
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+
+    def get_server_timings(self, response):
+        return {timing.split(';')[0]: timing.split(';')[1:] for timing in response['Server-Timing'].split(', ')}
+
+    def test_create_reports_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('pokemon-list'), {'name': 'fake-pokemon-0', 'description': 'Fake',
+                                                                  'weight': 10})
+
+        self.assertEqual(201, response.status_code)
+        timings = self.get_server_timings(response)
+        self.assertEqual(['desc="3 calls"'], timings['pokeapi'][1:])
+        self.assertEqual([f'desc="{len(queries)} queries"'], timings['db'][1:])
+        self.assertIn('serialization', timings)
+        self.assertIn('total', timings)
+
+    async def test_async_views_are_profiled(self):
+        await sync_to_async(PokemonFactory.create_batch)(2)
+        # The test db connection was opened before the middleware was loaded, and in another thread.
+        await sync_to_async(metrics.install_query_recorder)(connection)
+        response = await self.async_client.get(reverse('async-pokemon-list'))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(['desc="2 queries"'], self.get_server_timings(response)['db'][1:])
+
+    def test_metrics_aggregate_requests(self):
+        PokemonFactory.create_batch(2)
+        self.client.get(reverse('pokemon-list'))
+        self.client.get(reverse('pokemon-list'))
+
+        response = self.client.get(reverse('internal-metrics'))
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        content = response.content.decode()
+        self.assertIn('# TYPE pokemon_world_request_duration_seconds histogram', content)
+        self.assertIn('pokemon_world_request_db_queries_count{view="pokemon-list",method="GET"} 2', content)
+        self.assertIn('pokemon_world_request_pokeapi_calls_bucket{view="pokemon-list",method="GET",le="0"} 2', content)
+
+    def test_metrics_are_internal(self):
+        response = self.client.get(reverse('internal-metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(404, response.status_code)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_profiling_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('pokemon-list')))
+        self.assertEqual(404, self.client.get(reverse('internal-metrics')).status_code)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('calls', 'Calls.', ['view'], buckets=[1, 5])
+        for value in [0, 1, 3, 8]:
+            histogram.observe(('a"b',), value)
+
+        self.assertEqual([
+            '# HELP calls Calls.',
+            '# TYPE calls histogram',
+            'calls_bucket{view="a\\"b",le="1"} 2',
+            'calls_bucket{view="a\\"b",le="5"} 3',
+            'calls_bucket{view="a\\"b",le="+Inf"} 4',
+            'calls_sum{view="a\\"b"} 12.0',
+            'calls_count{view="a\\"b"} 4',
+        ], histogram.render())
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'create': '2/min'}},
+                   RATE_LIMIT_STORE={'BACKEND': 'pokemon.rate_limit.MemoryTokenBucketStore'})
+class CreateThrottleTestSuite(APITestCase):
+
+    def setUp(self):
+        self.list_path = reverse('pokemon-list')
+        self.user = UserFactory()
+        self.client.force_authenticate(self.user)
+
+    def create_pokemon(self, **kwargs):
+        # Invalid pokemons are throttled like valid ones, and don't need the external api.
+        return self.client.post(self.list_path, {}, **kwargs)
+
+    def test_create_is_throttled_with_retry_after(self):
+        self.assertEqual([400, 400, 429], [self.create_pokemon().status_code for _ in range(3)])
+        response = self.create_pokemon()
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('30', response['Retry-After'])
+
+    def test_user_bucket_is_shared_by_ips(self):
+        statuses = [self.create_pokemon(REMOTE_ADDR=f'10.0.0.{number}').status_code for number in range(3)]
+        self.assertEqual([400, 400, 429], statuses)
+
+    def test_ip_bucket_is_shared_by_users(self):
+        statuses = []
+        for _ in range(3):
+            self.client.force_authenticate(UserFactory())
+            statuses.append(self.create_pokemon().status_code)
+        self.assertEqual([400, 400, 429], statuses)
+
+    def test_refused_requests_do_not_spend_tokens_of_other_buckets(self):
+        self.create_pokemon()
+        self.create_pokemon()
+        self.client.force_authenticate(UserFactory())
+        self.assertEqual(429, self.create_pokemon().status_code)
+
+        self.assertEqual(400, self.create_pokemon(REMOTE_ADDR='10.0.0.1').status_code)
+        self.assertEqual(400, self.create_pokemon(REMOTE_ADDR='10.0.0.1').status_code)
+
+    def test_other_actions_are_not_throttled(self):
+        for _ in range(3):
+            self.assertEqual(200, self.client.get(self.list_path).status_code)
+
+    def test_bulk_create_is_throttled(self):
+        bulk_path = reverse('pokemon-bulk-create')
+        statuses = [self.client.post(bulk_path, {}, format='json').status_code for _ in range(3)]
+        self.assertEqual([400, 400, 429], statuses)
+
+    def test_bulk_create_takes_a_token_per_item(self):
+        response = self.client.post(reverse('pokemon-bulk-create'), [{}, {}], format='json')
+
+        self.assertEqual(207, response.status_code)
+        self.assertEqual(429, self.create_pokemon().status_code)
+
+    def test_bulk_create_above_the_capacity_is_refused(self):
+        response = self.client.post(reverse('pokemon-bulk-create'), [{}, {}, {}], format='json')
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual('request_cost_exceeded', response.data['detail'].code)
+        self.assertEqual(201, self.client.post(reverse('pokemon-bulk-create'), [], format='json').status_code)
+
+    def test_async_create_is_throttled(self):
+        self.client.force_login(self.user)
+        path = reverse('async-pokemon-list')
+        statuses = [self.client.post(path, {}, format='json').status_code for _ in range(3)]
+
+        self.assertEqual([400, 400, 429], statuses)
+        self.assertEqual('30', self.client.post(path, {}, format='json')['Retry-After'])
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}})
+    def test_scope_without_rate_is_not_throttled(self):
+        self.assertEqual([400] * 3, [self.create_pokemon().status_code for _ in range(3)])
+
+
+class TokenBucketStoreTestSuite(APITestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.stores = [MemoryTokenBucketStore(),
+                       SQLiteTokenBucketStore(location=os.path.join(directory.name, 'rate_limits.sqlite3'))]
+
+    def test_parse_rate(self):
+        self.assertEqual((30, 0.5), parse_rate('30/min'))
+        self.assertEqual((5, 5), parse_rate('5/s'))
+
+    def test_take_until_empty(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual([0, 0], [store.take(['a'], capacity=2, rate=0.5) for _ in range(2)])
+                self.assertAlmostEqual(2, store.take(['a'], capacity=2, rate=0.5), delta=0.1)
+
+    def test_buckets_refill(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.take(['a'], capacity=1, rate=50)
+                time.sleep(0.05)
+                self.assertEqual(0, store.take(['a'], capacity=1, rate=50))
+
+    def test_take_is_all_or_nothing(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.take(['a'], capacity=1, rate=0.1)
+                self.assertGreater(store.take(['b', 'a'], capacity=1, rate=0.1), 0)
+                self.assertEqual(0, store.take(['b'], capacity=1, rate=0.1))
+
+    def test_sqlite_buckets_are_shared(self):
+        location = self.stores[1].location
+        self.stores[1].take(['a'], capacity=1, rate=0.1)
+        self.assertGreater(SQLiteTokenBucketStore(location=location).take(['a'], capacity=1, rate=0.1), 0)
+
+    def test_full_buckets_are_purged(self):
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                store.purge_interval = 0
+                store.take(['a'], capacity=1, rate=50)
+                time.sleep(0.05)
+                store.take(['b'], capacity=1, rate=0.1)
+                self.assertEqual(0, store.take(['a'], capacity=1, rate=0.1))
+                self.assertGreater(store.take(['b'], capacity=1, rate=0.1), 0)
+
+
+@override_settings(RATE_LIMIT_STORE={'BACKEND': 'pokemon.rate_limit.MemoryTokenBucketStore'})
+class EgressRateLimitTestSuite(APITestCase):
+
+    def setUp(self):
+        self.fake_api = FakePokeAPI(pokemons_count=4, abilities_count=4).start()
+        self.addCleanup(self.fake_api.stop)
+        pokemon_names.set_names(self.fake_api.get_pokemon_names())
+        self.client.force_authenticate(UserFactory())
+
+    def override_pokeapi(self, **limits):
+        settings_override = override_settings(POKEAPI={
+            'BASE_URL': self.fake_api.base_url,
+            'RESPONSE_CACHE': {'BACKEND': 'pokemon.response_cache.MemoryResponseCache', 'TIMEOUT': 60,
+                               'MAX_ENTRIES': 100},
+            **limits})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_calls_wait_for_a_token(self):
+        self.override_pokeapi(EGRESS_RATE=20, EGRESS_BURST=1, EGRESS_MAX_WAIT=1)
+        started_at = time.monotonic()
+        for _ in range(3):
+            acquire_egress_token()
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.09)
+
+    def test_calls_are_shed_past_max_wait(self):
+        self.override_pokeapi(EGRESS_RATE=1, EGRESS_BURST=1, EGRESS_MAX_WAIT=0.1)
+        acquire_egress_token()
+        with self.assertRaises(PokemonAPIRateLimited) as context:
+            acquire_egress_token()
+        self.assertAlmostEqual(1, context.exception.retry_after, delta=0.1)
+
+    def test_async_calls_are_shed_past_max_wait(self):
+        self.override_pokeapi(EGRESS_RATE=1, EGRESS_BURST=1, EGRESS_MAX_WAIT=0.1)
+        asyncio.run(aacquire_egress_token())
+        with self.assertRaises(PokemonAPIRateLimited):
+            asyncio.run(aacquire_egress_token())
+
+    def test_retries_take_tokens(self):
+        self.override_pokeapi(EGRESS_RATE=0.5, EGRESS_BURST=2, EGRESS_MAX_WAIT=0, MAX_RETRIES=3,
+                              RETRY_BACKOFF_FACTOR=0)
+        self.fake_api.error_rate = 1
+
+        with self.assertRaises(PokemonAPIRateLimited):
+            get_client().get(f'{self.fake_api.base_url}/pokemon/fake-pokemon-0/')
+        self.assertEqual(2, self.fake_api.requests_count)
+
+    def test_create_responds_429_when_the_api_calls_are_shed(self):
+        self.override_pokeapi(EGRESS_RATE=0.5, EGRESS_BURST=1, EGRESS_MAX_WAIT=0)
+        response = self.client.post(reverse('pokemon-list'), {'name': 'fake-pokemon-0', 'description': 'Fake',
+                                                              'weight': 10})
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('2', response['Retry-After'])
+        self.assertFalse(Pokemon.objects.exists())
+        self.assertEqual(1, self.fake_api.requests_count)
+
+    def test_no_limit_by_default(self):
+        self.override_pokeapi()
+        response = self.client.post(reverse('pokemon-list'), {'name': 'fake-pokemon-0', 'description': 'Fake',
+                                                              'weight': 10})
+        self.assertEqual(201, response.status_code)
@@ -1,14 +1,11 @@
-from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from authentication.views import login, logout, register
+from authentication.views import bulk_register, login, logout, refresh, register
 from digimon.views import DigimonViewSet
-from pokemon.external_pokemon_api import get_pokemon_available_names
-from pokemon.views import PokemonViewSet
-
-settings.AVAILABLE_POKEMON_NAMES = get_pokemon_available_names()
+from pokemon.async_views import pokemons as async_pokemons
+from pokemon.views import PokemonViewSet, metrics
 
 PokemonRouter = DefaultRouter()
 PokemonRouter.register('api/pokemons', PokemonViewSet, basename='pokemon')
@@ -20,7 +17,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include(PokemonRouter.urls)),
     path('', include(DigimonRouter.urls)),
+    path('api/async/pokemons', async_pokemons, name='async-pokemon-list'),
     path('api/auth/login', login, name='auth-login'),
     path('api/auth/logout', logout, name='auth-logout'),
+    path('api/auth/refresh', refresh, name='auth-refresh'),
     path('api/auth/register', register, name='auth-register'),
+    path('api/auth/register/bulk', bulk_register, name='auth-register-bulk'),
+    path('internal/metrics', metrics, name='internal-metrics'),
 ]
@@ -1,18 +1,35 @@
 from typing import List, Any, Dict, Type
 
 from django.conf import settings
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled
 from rest_framework.metadata import SimpleMetadata
 from rest_framework.mixins import CreateModelMixin, ListModelMixin, UpdateModelMixin
 from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
+from rest_framework.throttling import BaseThrottle
 from rest_framework.viewsets import GenericViewSet
 
-from pokemon.exceptions import PokemonDoesNotExist
+from pokemon.bulk import MAX_BULK_CREATE_ITEMS, bulk_create_pokemons
+from pokemon.conditional import ConditionalListMixin, RenderedResponseCache
+from pokemon.conf import pokeapi_setting
+from pokemon.enrichment import save_pokemon_for_enrichment
+from pokemon.exceptions import PokemonAPIRateLimited, PokemonAPITimeout, PokemonDoesNotExist
+from pokemon.export import iter_pokemons_ndjson
+from pokemon.filters import QueryParamsFilterBackend
 from pokemon.external_pokemon_api import retrieve_pokemon_abilities
+from pokemon.metrics import render_metrics
 from pokemon.models import Pokemon
-from pokemon.serializers import ReadCreatePokemonSerializer, UpdatePokemonSerializer
+from pokemon.names import pokemon_names
+from pokemon.pagination import KeysetPagination
+from pokemon.rate_limit import CreateRateThrottle
+from pokemon.serializers import ReadCreatePokemonSerializer, UpdatePokemonSerializer, PokemonNameSearchSerializer, \
+    PokemonFilterSerializer
 
 
 class PokemonViewSetMetaData(SimpleMetadata):
@@ -20,24 +37,65 @@ class PokemonViewSetMetaData(SimpleMetadata):
 
     def get_serializer_info(self, serializer: BaseSerializer) -> Dict[str, Dict[str, Any]]:
         info = super().get_serializer_info(serializer)
-        info['name']['choices'] = settings.AVAILABLE_POKEMON_NAMES
+        info['name']['choices'] = pokemon_names.get_names()
         return info
 
 
-class PokemonViewSet(GenericViewSet, CreateModelMixin, ListModelMixin, UpdateModelMixin):
+class PokemonViewSet(ConditionalListMixin, GenericViewSet, CreateModelMixin, ListModelMixin, UpdateModelMixin):
+    collection_name = Pokemon.COLLECTION
     queryset = Pokemon.objects.all()
     serializer_class = ReadCreatePokemonSerializer
     metadata_class = PokemonViewSetMetaData
+    pagination_class = KeysetPagination
+    filter_backends = [QueryParamsFilterBackend]
+    filter_serializer_class = PokemonFilterSerializer
+    filter_lookups = {
+        'name': 'name',
+        'name_prefix': 'name__startswith',
+        'creator': 'creator_id',
+        'weight_min': 'weight__gte',
+        'weight_max': 'weight__lte',
+        'ability': 'abilities__api_obj_id',
+    }
+
+    options_cache = RenderedResponseCache()
+
+    def options(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        """
+        The metadata of the list embeds all the pokemon names, so its rendered json is cached until the names or the
+        serializer change, with an ETag that lets clients revalidate it.
+        """
+        if kwargs or request.accepted_renderer.format != 'json':
+            return super().options(request, *args, **kwargs)
+        key = (pokemon_names.version, self.get_serializer_class(), request.user.is_authenticated,
+               request.accepted_renderer.format, request.accepted_media_type)
+        return self.options_cache.get_response(
+            request, key, render=lambda: self.render_metadata(request), content_type=request.accepted_media_type)
+
+    def render_metadata(self, request: Request) -> bytes:
+        metadata = self.metadata_class().determine_metadata(request, self)
+        return request.accepted_renderer.render(metadata, request.accepted_media_type, {'request': request})
 
     def perform_create(self, serializer: BaseSerializer) -> None:
+        if pokeapi_setting('ASYNC_ENRICHMENT'):
+            save_pokemon_for_enrichment(serializer)
+            return
         abilities = retrieve_pokemon_abilities(serializer.validated_data['name'])
         serializer.save(abilities=abilities)
 
     def create(self, request: Request, *args: list, **kwargs: dict) -> Response:
+        """Responds 202 in async enrichment mode, as the abilities of the pokemon are fetched by a worker later"""
         try:
-            return super().create(request, args, kwargs)
+            response = super().create(request, args, kwargs)
         except PokemonDoesNotExist:
             return Response({'detail': 'That name does not match any Pokemon'}, status=400)
+        except PokemonAPITimeout:
+            return Response({'detail': 'Pokemon abilities could not be retrieved in time, try again later'}, status=504)
+        except PokemonAPIRateLimited as error:
+            raise Throttled(error.retry_after, 'Too many pokemons are being retrieved right now, try again later')
+        if pokeapi_setting('ASYNC_ENRICHMENT'):
+            response.status_code = 202
+        return response
 
     def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """
@@ -48,12 +106,67 @@ class PokemonViewSet(GenericViewSet, CreateModelMixin, ListModelMixin, UpdateMod
             return Response(status=403, data={'detail': 'Weight can only be updated by pokemon creator'})
         return super().update(request, *args, **kwargs)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request: Request) -> Response:
+        """
+        Creates a list of pokemons at once. Every item gets its own result, so invalid items don't fail the whole
+        batch, and the response status is 207 unless all the items were created.
+        """
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of pokemons'}, status=400)
+        if len(request.data) > MAX_BULK_CREATE_ITEMS:
+            return Response({'detail': f'At most {MAX_BULK_CREATE_ITEMS} pokemons can be created at once'}, status=400)
+        try:
+            results = bulk_create_pokemons(request.data, creator=request.user)
+        except PokemonAPITimeout:
+            return Response({'detail': 'Pokemons could not be retrieved in time, try again later'}, status=504)
+        except PokemonAPIRateLimited as error:
+            raise Throttled(error.retry_after, 'Too many pokemons are being retrieved right now, try again later')
+        all_created = all(result['status'] == 201 for result in results)
+        return Response({'results': results}, status=201 if all_created else 207)
+
+    @action(detail=False, methods=['get'], url_path='export.ndjson')
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Streams all pokemons with their abilities as newline delimited json, one pokemon per line"""
+        lines = iter_pokemons_ndjson(self.filter_queryset(self.get_queryset()))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+    @action(detail=False, methods=['get'])
+    def names(self, request: Request) -> Response:
+        """Autocompletes pokemon names, so clients don't need to download all of them through OPTIONS"""
+        serializer = PokemonNameSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        results = pokemon_names.search(serializer.validated_data['prefix'], serializer.validated_data['limit'])
+        return Response({'results': results})
+
+    def get_queryset(self) -> 'QuerySet[Pokemon]':
+        """Listing prefetches abilities of all pokemons in one query, and skips the columns it does not serialize"""
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            serialized_fields = ('pk', 'name', 'description', 'weight', 'abilities_status')
+            return queryset.only(*serialized_fields).prefetch_related('abilities')
+        return queryset
+
     def get_permissions(self) -> List[BasePermission]:
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_create']:
             return [IsAuthenticated()]
         return []
 
+    def get_throttles(self) -> List[BaseThrottle]:
+        if self.action in ['create', 'bulk_create']:
+            return [CreateRateThrottle()]
+        return []
+
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action in ['partial_update', 'update']:
             return UpdatePokemonSerializer
         return ReadCreatePokemonSerializer
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Serves the request profiling histograms of this process to INTERNAL_IPS, see REQUEST_PROFILING"""
+    is_internal = request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+    if not getattr(settings, 'REQUEST_PROFILING', False) or not is_internal:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')